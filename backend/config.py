@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,44 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./sql_app.db"
     CORS_ORIGINS: str = ""
 
+    # Background scheduler leader election (one worker owns cron jobs)
+    SCHEDULER_LEASE_TTL_SECONDS: int = 60
+
+    # Authenticated identity cache in get_current_user (0 disables); bounds staleness across workers
+    IDENTITY_CACHE_TTL_SECONDS: float = 30
+    IDENTITY_CACHE_MAX_SIZE: int = 1024
+
+    # bcrypt process pool (unset: one per core, up to 4; 0 hashes inline) and its queue bound
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Photo transcoding process pool (unset: one per core, up to 2; 0 transcodes in a thread),
+    # its queue bound, and whether to archive a full-resolution copy next to the variants
+    PHOTO_TRANSCODE_WORKERS: Optional[int] = None
+    PHOTO_TRANSCODE_MAX_PENDING: int = 16
+    PHOTO_KEEP_ORIGINAL: bool = False
+    # Uploads accepted with 202 (?background=true) waiting for the transcoder, per worker
+    PHOTO_JOB_MAX_QUEUED: int = 64
+    # Hourly cleanup of photos no task instance references: files deleted per run, minimum age
+    PHOTO_GC_BATCH_SIZE: int = 500
+    PHOTO_GC_GRACE_HOURS: int = 24
+
+    # slowapi counters: database:// shares them across workers, memory:// counts per process
+    RATE_LIMIT_STORAGE_URI: str = "database://"
+
+    # GET /sync change-log entries older than this are pruned nightly; older clients get a snapshot
+    CHANGE_LOG_RETENTION_DAYS: int = 7
+
+    # Server-Sent Events: per-client queue bound and what happens when a client falls behind
+    # (drop_oldest | coalesce | disconnect)
+    SSE_QUEUE_MAXSIZE: int = 100
+    SSE_OVERFLOW_POLICY: str = "drop_oldest"
+    # Recent events kept for Last-Event-ID replay after a reconnect
+    SSE_REPLAY_BUFFER_SIZE: int = 500
+    # How events reach SSE clients connected to other workers (memory | postgres | polling)
+    EVENT_BUS_BACKEND: str = "memory"
+    EVENT_BUS_POLL_INTERVAL_SECONDS: float = 0.5
+
     # SMTP Settings
     SMTP_SERVER: str = ""
     SMTP_PORT: int = 587
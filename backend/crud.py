@@ -1,7 +1,12 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import ColumnElement, Integer, and_, column, or_, select, text
+from sqlalchemy.orm import Query, Session, joinedload
 from datetime import datetime, timezone
 from typing import Optional, List
 from . import models, schemas, security
+from .identity_cache import identity_cache
+from .pagination import decode_cursor
+from .services.activity_rollup import delete_user_activity, forget_completed_instances
+from .services.change_log import record_changes
 from .services.transaction_service import delete_user_transactions, detach_instance_references
 
 # --- User CRUD ---
@@ -12,7 +17,7 @@ def get_user(db: Session, user_id: int) -> Optional[models.User]:
 
 
 def get_user_by_nickname(db: Session, nickname: str) -> Optional[models.User]:
-    return db.query(models.User).filter(
+    return db.query(models.User).options(joinedload(models.User.role)).filter(
         models.User.nickname == nickname).first()
 
 
@@ -48,6 +53,7 @@ def update_user(db: Session, user_id: int,
         setattr(db_user, field, value)
 
     db.commit()
+    identity_cache.invalidate(user_id)
     db.refresh(db_user)
     return db_user
 
@@ -71,16 +77,24 @@ def delete_user(db: Session, user_id: int) -> bool:
         return False
 
     # Delete related records explicitly
+    instance_ids: List[int] = list(db.scalars(
+        select(models.TaskInstance.id).where(models.TaskInstance.user_id == user_id)))
+    notification_ids: List[int] = list(db.scalars(
+        select(models.Notification.id).where(models.Notification.user_id == user_id)))
     db.query(models.TaskInstance).filter(
         models.TaskInstance.user_id == user_id).delete()
     delete_user_transactions(db, user_id)
+    delete_user_activity(db, user_id)
     db.query(models.Notification).filter(
         models.Notification.user_id == user_id).delete()
+    record_changes(db, "task_instances", instance_ids, deleted=True)
+    record_changes(db, "notifications", notification_ids, deleted=True, user_id=user_id)
     # PushSubscription is covered by cascade="all, delete-orphan" on User.push_subscriptions
 
     # Finally delete the user
     db.delete(db_user)
     db.commit()
+    identity_cache.invalidate(user_id)
     return True
 
 
@@ -109,6 +123,7 @@ def update_role_multiplier(db: Session, role_id: int,
     if db_role:
         db_role.multiplier_value = multiplier
         db.commit()
+        identity_cache.invalidate_role(role_id)
         db.refresh(db_role)
     return db_role
 
@@ -160,10 +175,13 @@ def delete_task(db: Session, task_id: int) -> bool:
     # B2: Null-out Transaction references to prevent orphaned foreign keys
     if instance_ids:
         detach_instance_references(db, instance_ids)
+        # Dashboards read the rollup; drop the completions that disappear with the task
+        forget_completed_instances(db, instance_ids)
 
     # Delete related task instances
     db.query(models.TaskInstance).filter(
         models.TaskInstance.task_id == task_id).delete()
+    record_changes(db, "task_instances", instance_ids, deleted=True)
 
     # Delete the task
     db.delete(db_task)
@@ -261,9 +279,12 @@ def delete_reward(db: Session, reward_id: int) -> bool:
         return False
 
     # Clear goal from any users that have this reward set as their current goal
+    goal_user_ids: List[int] = list(db.scalars(
+        select(models.User.id).where(models.User.current_goal_reward_id == reward_id)))
     db.query(models.User).filter(
         models.User.current_goal_reward_id == reward_id
     ).update({"current_goal_reward_id": None}, synchronize_session="fetch")
+    record_changes(db, "users", goal_user_ids)
 
     # Delete the reward
     db.delete(db_reward)
@@ -293,10 +314,55 @@ def get_reward(db: Session, reward_id: int) -> Optional[models.Reward]:
 # --- Transaction CRUD ---
 
 
+# Trigram FTS cannot match substrings shorter than one trigram
+_FTS_MIN_TERM_LENGTH = 3
+
+
+def _description_matches(db: Session, search: str) -> ColumnElement[bool]:
+    """
+    Case-insensitive substring filter on ``Transaction.description``.
+
+    On SQLite it is answered by the ``transactions_fts`` trigram index; on
+    Postgres the pg_trgm GIN index serves the ILIKE directly. Terms shorter
+    than a trigram fall back to the plain ILIKE.
+    """
+    if db.get_bind().dialect.name == "sqlite" and len(search) >= _FTS_MIN_TERM_LENGTH:
+        phrase = '"' + search.replace('"', '""') + '"'
+        matches = text(
+            f"SELECT rowid FROM {models.TRANSACTIONS_FTS_TABLE} "
+            f"WHERE {models.TRANSACTIONS_FTS_TABLE} MATCH :phrase"
+        ).bindparams(phrase=phrase).columns(column("rowid", Integer))
+        return models.Transaction.id.in_(matches)
+    return models.Transaction.description.ilike(f"%{search}%")
+
+
+def _page_transactions(
+        query: Query, skip: int, limit: int, cursor: Optional[str]
+) -> List[models.Transaction]:
+    """
+    Newest-first page of transactions ordered by (timestamp, id).
+
+    With ``cursor`` the page seeks past the encoded key (keyset pagination);
+    otherwise the legacy ``skip`` offset is applied.
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        txn = models.Transaction.__table__
+        query = query.filter(
+            txn.c.timestamp <= ts,
+            or_(txn.c.timestamp < ts, and_(txn.c.timestamp == ts, txn.c.id < row_id)),
+        )
+    query = query.order_by(models.Transaction.timestamp.desc(), models.Transaction.id.desc())
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
 def get_user_transactions(
         db: Session, user_id: int, skip: int = 0, limit: int = 100,
         txn_type: Optional[str] = None, search: Optional[str] = None,
-        start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+        start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None
 ) -> List[models.Transaction]:
     """Get transaction history for a specific user with filters."""
     query = db.query(models.Transaction).filter(
@@ -305,21 +371,20 @@ def get_user_transactions(
     if txn_type:
         query = query.filter(models.Transaction.type == txn_type)
     if search:
-        query = query.filter(
-            models.Transaction.description.ilike(f"%{search}%"))
+        query = query.filter(_description_matches(db, search))
     if start_date:
         query = query.filter(models.Transaction.timestamp >= start_date)
     if end_date:
         query = query.filter(models.Transaction.timestamp <= end_date)
 
-    return query.order_by(models.Transaction.timestamp.desc()
-                          ).offset(skip).limit(limit).all()
+    return _page_transactions(query, skip, limit, cursor)
 
 
 def get_all_transactions(
         db: Session, skip: int = 0, limit: int = 100,
         user_id: Optional[int] = None, txn_type: Optional[str] = None, search: Optional[str] = None,
-        start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+        start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None
 ) -> List[models.Transaction]:
     """Get global transaction history with filters."""
     query = db.query(models.Transaction)
@@ -329,15 +394,13 @@ def get_all_transactions(
     if txn_type:
         query = query.filter(models.Transaction.type == txn_type)
     if search:
-        query = query.filter(
-            models.Transaction.description.ilike(f"%{search}%"))
+        query = query.filter(_description_matches(db, search))
     if start_date:
         query = query.filter(models.Transaction.timestamp >= start_date)
     if end_date:
         query = query.filter(models.Transaction.timestamp <= end_date)
 
-    return query.order_by(models.Transaction.timestamp.desc()
-                          ).offset(skip).limit(limit).all()
+    return _page_transactions(query, skip, limit, cursor)
 
 
 # --- Settings & Language ---
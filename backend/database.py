@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
 
@@ -13,13 +14,16 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args=connect_args
 )
 
+
+def _set_sqlite_pragma(dbapi_conn, _):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 # SQLite does not enforce FK constraints by default — enable them per connection
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    @event.listens_for(engine, "connect")
-    def _set_sqlite_pragma(dbapi_conn, _):
-        cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+    event.listen(engine, "connect", _set_sqlite_pragma)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -31,3 +35,43 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# --- Async access path (for `async def` route handlers) ---
+
+
+def to_async_database_url(database_url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (aiosqlite / asyncpg)."""
+    scheme, sep, rest = database_url.partition("://")
+    if not sep:
+        return database_url
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return database_url
+
+
+ASYNC_SQLALCHEMY_DATABASE_URL = to_async_database_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+
+if ASYNC_SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragma)
+
+# expire_on_commit=False: attributes must stay readable after commit because
+# lazy refreshes cannot run outside the greenlet bridge.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    Async counterpart of ``get_db``. Queries go through aiosqlite/asyncpg so
+    they never block the event loop. Existing sync services are reused via
+    ``await db.run_sync(service_fn, ...)``, which executes them against the
+    async connection.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,8 +1,9 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from .database import get_db
-from . import crud, security
+from .identity_cache import identity_cache
+from . import models, security
 
 security_scheme = HTTPBearer(auto_error=False)
 
@@ -52,14 +53,20 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = crud.get_user(db, user_id=user_id_int)
+    # Detached user + role snapshot: no query on a hit, one joined query on a miss
+    cached = identity_cache.get(user_id_int)
+    if cached is not None:
+        return cached
+
+    user = db.query(models.User).options(joinedload(models.User.role)).filter(
+        models.User.id == user_id_int).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    return identity_cache.put(user)
 
 
 ADMIN_ROLE_NAME = "Admin"
@@ -0,0 +1,236 @@
+"""
+Cross-process transport for SSE events.
+
+``EventBroadcaster`` delivers events to the SSE clients connected to *this*
+worker. With several uvicorn workers an event must also reach the clients
+of the other workers, so the broadcaster hands each event to an
+``EventBus`` exactly once; the bus carries it to every other worker, which
+delivers it to its own local subscribers. The publishing worker delivers
+locally right away and ignores its own messages when they come back.
+
+Backends (``EVENT_BUS_BACKEND``):
+- ``memory``   single process; nothing leaves the process (default, tests).
+- ``postgres`` Postgres ``LISTEN/NOTIFY`` on a dedicated asyncpg connection.
+- ``polling``  an ``event_bus_messages`` table every worker polls; works on
+  SQLite, so multi-worker setups do not require Postgres.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import models
+from .config import settings
+from .services.leader_lease import make_owner_id
+
+logger = logging.getLogger(__name__)
+
+Envelope = Dict[str, Any]
+Deliver = Callable[[Envelope], None]
+
+
+class EventBus:
+    """In-process bus: every subscriber lives in this process, so publishing is a no-op."""
+
+    backend = "memory"
+
+    def __init__(self) -> None:
+        self.origin = make_owner_id()
+        self._deliver: Optional[Deliver] = None
+        self.published = 0
+        self.received = 0
+
+    async def start(self, deliver: Deliver) -> None:
+        """Begin receiving peer events; ``deliver`` hands them to local subscribers."""
+        self._deliver = deliver
+
+    async def publish(self, envelope: Envelope) -> None:
+        """Send an event (already delivered locally) to the other workers."""
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    def _stamp(self, envelope: Envelope) -> str:
+        self.published += 1
+        return json.dumps({**envelope, "origin": self.origin})
+
+    def _receive(self, payload: str) -> None:
+        try:
+            envelope = json.loads(payload)
+        except ValueError:
+            logger.error(f"Event bus: dropping malformed message: {payload[:200]}")
+            return
+        if envelope.pop("origin", None) == self.origin or self._deliver is None:
+            return
+        self.received += 1
+        self._deliver(envelope)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "origin": self.origin,
+                "published": self.published, "received": self.received}
+
+
+InProcessEventBus = EventBus
+
+
+class PostgresNotifyEventBus(EventBus):
+    """
+    ``LISTEN/NOTIFY`` transport. One asyncpg connection per worker both
+    listens and publishes via ``pg_notify``; Postgres fans the notification
+    out to every listening worker.
+    """
+
+    backend = "postgres"
+    # NOTIFY payloads are limited to 8000 bytes
+    MAX_PAYLOAD_BYTES = 7900
+
+    def __init__(self, dsn: str, channel: str = "chorespec_events") -> None:
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._conn: Any = None
+        self._lock = asyncio.Lock()
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        await self._connect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        self._conn = await asyncpg.connect(self.dsn)
+        await self._conn.add_listener(self.channel, self._on_notify)
+        logger.info(f"Event bus: listening on Postgres channel '{self.channel}'")
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self._receive(payload)
+
+    async def publish(self, envelope: Envelope) -> None:
+        payload = self._stamp(envelope)
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            logger.error(
+                f"Event bus: '{envelope.get('type')}' exceeds the NOTIFY payload limit; "
+                "delivered to this worker only")
+            return
+        async with self._lock:
+            if self._conn is None or self._conn.is_closed():
+                # Notifications sent while disconnected are lost; clients refetch on reconnect
+                await self._connect()
+            await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.remove_listener(self.channel, self._on_notify)
+            await self._conn.close()
+        self._conn = None
+
+
+class PollingEventBus(EventBus):
+    """
+    Table-backed transport. Publishing inserts a row into
+    ``event_bus_messages``; every worker polls for rows newer than the last
+    id it has seen. Rows older than ``retention_seconds`` are pruned.
+
+    Relies on ids becoming visible in increasing order, which holds for
+    SQLite's serialized writers. On Postgres prefer the ``postgres`` backend.
+    """
+
+    backend = "polling"
+
+    def __init__(self, engine: AsyncEngine, poll_interval: float = 0.5,
+                 retention_seconds: int = 300, batch_size: int = 500) -> None:
+        super().__init__()
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self._last_id = 0
+        # The poll loop and explicit poll_once() callers must not read the same rows twice
+        self._poll_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        table = models.EventBusMessage.__table__
+        async with self.engine.connect() as conn:
+            # Start from the current tail: peers' history is not replayed
+            self._last_id = int(await conn.scalar(select(func.coalesce(func.max(table.c.id), 0))) or 0)
+        self._task = asyncio.create_task(self._run())
+
+    async def publish(self, envelope: Envelope) -> None:
+        payload = self._stamp(envelope)
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(models.EventBusMessage.__table__).values(
+                origin=self.origin,
+                payload=payload,
+                created_at=datetime.now(timezone.utc).replace(tzinfo=None),
+            ))
+
+    async def poll_once(self) -> int:
+        """Deliver peer messages published since the last poll. Returns the number read."""
+        table = models.EventBusMessage.__table__
+        async with self._poll_lock:
+            async with self.engine.connect() as conn:
+                rows = (await conn.execute(
+                    select(table.c.id, table.c.payload)
+                    .where(table.c.id > self._last_id)
+                    .order_by(table.c.id)
+                    .limit(self.batch_size)
+                )).all()
+            for row in rows:
+                self._last_id = int(row.id)
+                self._receive(row.payload)
+        return len(rows)
+
+    async def prune(self) -> None:
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.retention_seconds)
+        table = models.EventBusMessage.__table__
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(table).where(table.c.created_at < cutoff))
+
+    async def _run(self) -> None:
+        polls = 0
+        while True:
+            try:
+                # Drain backlogs without sleeping between full batches
+                while await self.poll_once() == self.batch_size:
+                    pass
+                polls += 1
+                if polls % 120 == 0:
+                    await self.prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event bus: poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_event_bus(backend: str, database_url: str) -> EventBus:
+    """Build the bus configured by ``EVENT_BUS_BACKEND``."""
+    if backend == "memory":
+        return InProcessEventBus()
+    if backend == "postgres":
+        scheme, _, rest = database_url.partition("://")
+        if scheme.split("+", 1)[0] not in ("postgresql", "postgres"):
+            raise ValueError("EVENT_BUS_BACKEND=postgres requires a Postgres DATABASE_URL")
+        return PostgresNotifyEventBus(f"postgresql://{rest}")
+    if backend == "polling":
+        from .database import async_engine
+
+        return PollingEventBus(async_engine, poll_interval=settings.EVENT_BUS_POLL_INTERVAL_SECONDS)
+    raise ValueError(f"Unknown EVENT_BUS_BACKEND: {backend!r} (expected memory, postgres or polling)")
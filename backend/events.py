@@ -1,30 +1,372 @@
 import asyncio
+import itertools
+import json
 import logging
-from typing import List, Optional
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union, cast
+
+from .config import settings
+from .event_bus import Envelope, EventBus, InProcessEventBus, create_event_bus
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+# --- Topics ---
+# Every subscriber listens on a set of topics derived from its JWT; events are
+# routed only to subscribers of the topics they are published on.
+FAMILY_FEED = "family-feed"    # shared dashboard: tasks, rewards, imports
+REVIEW_QUEUE = "review-queue"  # photo verifications waiting for / leaving review (admins)
+ADMIN = "admin"                # admin-only oversight events
+USER_TOPIC_ALIAS = "user"      # ?topics=user means "my own user:{id} topic"
+
+
+def user_topic(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def topics_for_user(user_id: int, is_admin: bool) -> FrozenSet[str]:
+    """All topics a user may subscribe to."""
+    topics = {user_topic(user_id), FAMILY_FEED}
+    if is_admin:
+        topics |= {REVIEW_QUEUE, ADMIN}
+    return frozenset(topics)
+
+
+def resolve_topics(user_id: int, is_admin: bool, requested: Optional[str] = None) -> FrozenSet[str]:
+    """
+    Topics for an ``/events`` connection: everything the user may see, or
+    the permitted subset of a comma-separated ``requested`` list. Clients
+    can only name their own user topic (``user`` or ``user:{own id}``).
+    """
+    allowed = topics_for_user(user_id, is_admin)
+    if not requested:
+        return allowed
+    wanted = {name.strip() for name in requested.split(",") if name.strip()}
+    if USER_TOPIC_ALIAS in wanted:
+        wanted.discard(USER_TOPIC_ALIAS)
+        wanted.add(user_topic(user_id))
+    return frozenset(wanted & allowed)
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when a client's queue is full at broadcast time."""
+    # Discard the oldest queued event to make room for the new one
+    DROP_OLDEST = "drop_oldest"
+    # Collapse queued duplicates of the new event (same type and data), then drop oldest if still full
+    COALESCE = "coalesce"
+    # Close the client's stream; the browser's EventSource reconnects and refetches
+    DISCONNECT = "disconnect"
+
+
+@dataclass
+class ClientStats:
+    """Per-client delivery counters, exposed via ``EventBroadcaster.stats``."""
+    client_id: int
+    connected_at: str
+    topics: List[str]
+    queued: int = 0
+    max_queued: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+
+
+def encode_json(payload: Any) -> bytes:
+    """Compact JSON bytes, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+# Deltas larger than this are sent without their row snapshots (ids only; clients refetch).
+# A Postgres NOTIFY payload holds ~8000 bytes including the envelope, so bigger events
+# would only reach clients on the publishing worker.
+MAX_DELTA_BYTES = 6000
+
+
+def within_delta_budget(data: Any) -> bool:
+    """Whether ``data`` is small enough to relay to every worker."""
+    return len(encode_json(data)) <= MAX_DELTA_BYTES
+
+
+def sse_frame(payload: dict, event_id: Optional[str] = None) -> bytes:
+    """A complete ``text/event-stream`` frame for ``payload``."""
+    id_line = f"id: {event_id}\n".encode() if event_id else b""
+    return id_line + b"data: " + encode_json(payload) + b"\n\n"
+
+
+# Keepalive sent after 30 s without events; identical for every connection
+KEEPALIVE_FRAME = sse_frame({"type": "ping"})
+
+
+class EventMessage(dict):
+    """
+    An event as queued for clients: the ``{"id", "type", "data"}`` dict plus
+    its SSE ``frame``, encoded once and shared by every subscriber queue.
+    """
+
+    def __init__(self, event_id: str, event_type: str, data: Optional[dict]):
+        super().__init__(id=event_id, type=event_type, data=data)
+        self.frame = sse_frame(self, event_id)
+
+
+# Queued in place of events after a DISCONNECT overflow; ends the client's stream
+_CLOSE: Dict[str, Any] = {"type": "__close__"}
+
+# Sent instead of a replay the server cannot provide; clients refetch their state
+RESYNC = "resync"
+
+
+@dataclass(eq=False)  # identity semantics: subscriptions live in per-topic sets
+class Subscription:
+    """One connected SSE client: a bounded queue, its topics and its lag counters."""
+    queue: asyncio.Queue[Union[EventMessage, Dict[str, Any]]]  # events, or _CLOSE
+    stats: ClientStats
+    topics: FrozenSet[str] = frozenset()
+    closed: bool = False
+
+    async def get(self) -> Optional[EventMessage]:
+        """Next event for this client, or None once the broadcaster has closed the stream."""
+        message = await self.queue.get()
+        if message is _CLOSE:
+            return None
+        self.stats.delivered += 1
+        self.stats.queued = self.queue.qsize()
+        return cast(EventMessage, message)
+
+
 class EventBroadcaster:
-    def __init__(self):
-        self.clients: List[asyncio.Queue] = []
-
-    async def subscribe(self) -> asyncio.Queue:
-        queue: asyncio.Queue = asyncio.Queue()
-        self.clients.append(queue)
-        return queue
-
-    def unsubscribe(self, queue: asyncio.Queue):
-        if queue in self.clients:
-            self.clients.remove(queue)
-
-    async def broadcast(self, event_type: str, data: Optional[dict] = None):
-        """Broadcast event to all connected clients."""
-        message = {"type": event_type, "data": data}
-        for queue in self.clients:
-            await queue.put(message)
+    """
+    Fan-out of SSE events to connected clients.
+
+    Subscribers are indexed by topic, so a broadcast only touches the
+    clients subscribed to its topics (cost scales with interested clients,
+    not with all connections). Each client gets a bounded queue and ``broadcast`` only ever uses
+    ``put_nowait``, so a stalled consumer can neither block the broadcast
+    loop nor grow memory without limit: once its queue is full the
+    configured ``OverflowPolicy`` applies to that client alone.
+
+    With several workers, every broadcast is also published once on the
+    ``EventBus``; events arriving from other workers are delivered to this
+    worker's subscribers the same way.
+
+    Every delivered event gets an id ``"{epoch}:{seq}"`` (``seq`` increases
+    monotonically, ``epoch`` is unique per broadcaster instance) and is kept
+    in a ring buffer of the last ``replay_buffer_size`` events. A client
+    reconnecting with ``Last-Event-ID`` gets the events it missed replayed,
+    or a single ``resync`` event when they are no longer buffered, more than
+    its queue can hold, or the id comes from another worker or an earlier
+    process.
+    """
+
+    def __init__(self, max_queue_size: int = 100,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 bus: Optional[EventBus] = None, replay_buffer_size: int = 500):
+        self.bus = bus or InProcessEventBus()
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        # (seq, message, topics) of recent events, oldest first
+        self._replay: Deque[Tuple[int, EventMessage, Optional[FrozenSet[str]]]] = deque(maxlen=replay_buffer_size)
+        self.replayed_events = 0
+        self.resyncs = 0
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.clients: List[Subscription] = []
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.disconnected_slow_clients = 0
+        self._ids = itertools.count(1)
+
+    async def start(self) -> None:
+        """Start receiving events published by other workers."""
+        await self.bus.start(self._deliver_remote)
+        logger.info(f"SSE event bus started: {self.bus.backend} ({self.bus.origin})")
+
+    async def stop(self) -> None:
+        await self.bus.stop()
+
+    async def subscribe(self, topics: Iterable[str] = (), last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Register a client. With ``last_event_id`` (from a reconnecting
+        EventSource) the events it missed are queued first, or a ``resync``.
+        """
+        topic_set = frozenset(topics)
+        subscription = Subscription(
+            queue=asyncio.Queue(maxsize=self.max_queue_size),
+            stats=ClientStats(
+                client_id=next(self._ids),
+                connected_at=datetime.now(timezone.utc).isoformat(),
+                topics=sorted(topic_set),
+            ),
+            topics=topic_set,
+        )
+        self.clients.append(subscription)
+        for topic in topic_set:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        if last_event_id:
+            self._resume(subscription, last_event_id)
+        return subscription
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self.epoch}:{self._seq}"
+
+    def _parse_event_id(self, event_id: str) -> Optional[int]:
+        """Sequence number of an id issued by this broadcaster, else None."""
+        epoch, _, seq = event_id.strip().partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq_number = int(seq)
+        return seq_number if seq_number <= self._seq else None
+
+    def _resume(self, subscription: Subscription, last_event_id: str) -> None:
+        # Runs before the first await after registration: no broadcast can slip
+        # in between the replay and live delivery.
+        seq = self._parse_event_id(last_event_id)
+        oldest = self._replay[0][0] if self._replay else self._seq + 1
+        missed: List[EventMessage] = []
+        if seq is not None and seq >= oldest - 1:
+            missed = [message for event_seq, message, topics in self._replay
+                      if event_seq > seq and (topics is None or topics & subscription.topics)]
+        if seq is None or seq < oldest - 1 or len(missed) > self.max_queue_size:
+            self.resyncs += 1
+            self._offer(subscription, EventMessage(self.last_event_id, RESYNC, None))
+            logger.info(f"SSE client {subscription.stats.client_id} resync (last event {last_event_id})")
+            return
+        for message in missed:
+            self._offer(subscription, message)
+        self.replayed_events += len(missed)
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self.clients:
+            self.clients.remove(subscription)
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def _recipients(self, topics: Optional[Iterable[str]]) -> List[Subscription]:
+        if topics is None:
+            return list(self.clients)
+        recipients: Set[Subscription] = set()
+        for topic in topics:
+            recipients.update(self._subscribers.get(topic, ()))
+        return list(recipients)
+
+    async def broadcast(self, event_type: str, data: Optional[dict] = None,
+                        topics: Optional[Iterable[str]] = None):
+        """
+        Publish an event to the subscribers of ``topics`` (every client when
+        ``topics`` is None) without waiting on any of them. A client on
+        several of the topics receives the event once.
+        """
+        topic_list = None if topics is None else sorted(set(topics))
+        self._deliver_local(event_type, data, topic_list)
+        try:
+            await self.bus.publish({"type": event_type, "data": data, "topics": topic_list})
+        except Exception as e:
+            # Local clients already have the event; peers' clients resync on reconnect
+            logger.error(f"SSE broadcast: failed to publish {event_type} to the event bus: {e}")
+
+    def _deliver_remote(self, envelope: Envelope) -> None:
+        event_type = envelope.get("type")
+        if not isinstance(event_type, str):
+            logger.error(f"SSE broadcast: dropping event bus message without a type: {str(envelope)[:200]}")
+            return
+        self._deliver_local(event_type, envelope.get("data"), envelope.get("topics"))
+
+    def _deliver_local(self, event_type: str, data: Optional[dict], topics: Optional[Iterable[str]]) -> None:
+        self._seq += 1
+        # Serialized once here; every recipient queues the same frame
+        message = EventMessage(self.last_event_id, event_type, data)
+        self._replay.append((self._seq, message, None if topics is None else frozenset(topics)))
+        recipients = self._recipients(topics)
+        for subscription in recipients:
+            self._offer(subscription, message)
         logger.info(
-            f"SSE broadcast: {event_type} to {len(self.clients)} clients")
+            f"SSE broadcast: {event_type} to {len(recipients)}/{len(self.clients)} clients")
+
+    def _offer(self, subscription: Subscription, message: EventMessage) -> None:
+        queue = subscription.queue
+        stats = subscription.stats
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                self._disconnect(subscription)
+                return
+            if self.overflow_policy == OverflowPolicy.COALESCE:
+                self._coalesce(subscription, message)
+            if queue.full():
+                queue.get_nowait()
+                stats.dropped += 1
+            queue.put_nowait(message)
+
+        stats.queued = queue.qsize()
+        stats.max_queued = max(stats.max_queued, stats.queued)
+
+    def _coalesce(self, subscription: Subscription, message: EventMessage) -> None:
+        """Remove queued events with the same type and data as ``message``; it is re-queued at the tail."""
+        queue = subscription.queue
+        kept: List[dict] = []
+        while not queue.empty():
+            queued = queue.get_nowait()
+            if queued.get("type") == message["type"] and queued.get("data") == message["data"]:
+                subscription.stats.coalesced += 1
+            else:
+                kept.append(queued)
+        for queued in kept:
+            queue.put_nowait(queued)
+
+    def _disconnect(self, subscription: Subscription) -> None:
+        queue = subscription.queue
+        dropped = queue.qsize()
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_CLOSE)
+        subscription.closed = True
+        subscription.stats.dropped += dropped
+        self.disconnected_slow_clients += 1
+        self.unsubscribe(subscription)
+        logger.warning(
+            f"SSE client {subscription.stats.client_id} disconnected: queue full ({self.max_queue_size})")
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of per-client lag counters for the admin stats endpoint."""
+        for subscription in self.clients:
+            subscription.stats.queued = subscription.queue.qsize()
+        return {
+            "overflow_policy": self.overflow_policy.value,
+            "max_queue_size": self.max_queue_size,
+            "connected_clients": len(self.clients),
+            "topics": {topic: len(subs) for topic, subs in self._subscribers.items()},
+            "disconnected_slow_clients": self.disconnected_slow_clients,
+            "bus": self.bus.stats(),
+            "replay": {
+                "buffered": len(self._replay),
+                "buffer_size": self._replay.maxlen,
+                "last_event_id": self.last_event_id,
+                "replayed_events": self.replayed_events,
+                "resyncs": self.resyncs,
+            },
+            "clients": [asdict(s.stats) for s in self.clients],
+        }
 
 
-broadcaster = EventBroadcaster()
+broadcaster = EventBroadcaster(
+    max_queue_size=settings.SSE_QUEUE_MAXSIZE,
+    overflow_policy=OverflowPolicy(settings.SSE_OVERFLOW_POLICY),
+    bus=create_event_bus(settings.EVENT_BUS_BACKEND, settings.DATABASE_URL),
+    replay_buffer_size=settings.SSE_REPLAY_BUFFER_SIZE,
+)
@@ -39,3 +39,13 @@ class DuplicateResourceError(DomainError):
 class AuthorizationError(DomainError):
     def __init__(self, detail: str = "Insufficient permissions"):
         super().__init__(detail=detail, status_code=403)
+
+
+class InvalidCursorError(DomainError):
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(detail=detail, status_code=400)
+
+
+class ServiceBusyError(DomainError):
+    def __init__(self, detail: str = "Server is busy, please retry"):
+        super().__init__(detail=detail, status_code=503)
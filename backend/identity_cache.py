@@ -0,0 +1,117 @@
+"""
+Per-process cache of authenticated identities for ``get_current_user``.
+
+Holds a detached snapshot of each recently seen user and their role, so an
+authenticated request costs no query once the JWT is verified. Entries
+expire after ``IDENTITY_CACHE_TTL_SECONDS`` and the least recently used one
+is evicted beyond ``IDENTITY_CACHE_MAX_SIZE``.
+
+Snapshots are for authorization (``id``, role) only: point balances and
+other frequently changing columns may be stale, so routes that need them
+load the user from their own session. Writes that change identity or role
+invalidate the affected entries; in multi-worker deployments other workers
+see the change once their entry's TTL runs out.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from . import models
+from .config import settings
+
+
+def snapshot_user(user: models.User) -> models.User:
+    """Detached copy of ``user`` and its role, safe to share across sessions and threads."""
+    role = None
+    if user.role is not None:
+        role = models.Role(**{c.key: getattr(user.role, c.key) for c in models.Role.__table__.columns})
+        make_transient_to_detached(role)
+    snapshot = models.User(**{c.key: getattr(user, c.key) for c in models.User.__table__.columns})
+    snapshot.role = role
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+class IdentityCache:
+    """Thread-safe TTL + LRU map of user id -> detached user snapshot."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[int, Tuple[float, models.User]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, user_id: int) -> Optional[models.User]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, user: models.User) -> models.User:
+        """Cache a snapshot of ``user`` and return it."""
+        snapshot = snapshot_user(user)
+        if not self.enabled:
+            return snapshot
+        with self._lock:
+            self._entries[int(snapshot.id)] = (self._clock() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(int(snapshot.id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return snapshot
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_role(self, role_id: int) -> None:
+        """Drop every user holding ``role_id`` (multiplier change, role deletion)."""
+        with self._lock:
+            stale = [uid for uid, (_, user) in self._entries.items() if user.role_id == role_id]
+            for uid in stale:
+                del self._entries[uid]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+identity_cache = IdentityCache(
+    max_size=settings.IDENTITY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.IDENTITY_CACHE_TTL_SECONDS,
+)
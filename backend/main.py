@@ -1,33 +1,46 @@
-from fastapi import Depends, FastAPI, HTTPException, Request, BackgroundTasks
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse, FileResponse
 from contextlib import asynccontextmanager
 import logging
 import asyncio
-import json
 import os
 from pathlib import Path
+from typing import Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from .config import settings
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+from .pagination import NEXT_CURSOR_HEADER
 from .rate_limiter import limiter
 
-from sqlalchemy import inspect
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.exc import StaleDataError
 from alembic.config import Config
 from alembic import command as alembic_command
 
 from . import models, crud
-from .database import engine, SessionLocal
-from .services import scheduler as scheduler_service, notifications
-from .routers import analytics, notifications as notif_router, auth, users, roles, tasks, rewards, transactions, system
+from .database import engine, SessionLocal, get_async_db
+from .services import scheduler as scheduler_service, notifications, change_log, photo_gc
+from .services.leader_lease import LeaderElector
+from .routers import (
+    analytics, notifications as notif_router, auth, users, roles, tasks, rewards, transactions, system, sync,
+)
 from .backup import BackupManager
 from .notifications_service import send_email_sync, send_push_to_user_sync
-from .dependencies import get_current_admin_user, get_current_user
+from .dependencies import get_current_admin_user, get_current_user, is_admin
 from .security import verify_token
-from .events import broadcaster
+from .events import KEEPALIVE_FRAME, broadcaster, resolve_topics, sse_frame
 from .exceptions import DomainError
+from .identity_cache import identity_cache
+from .password_hasher import password_hasher
+from .services.photo_jobs import photo_job_queue, prune_jobs
+from .services.photos import (
+    UPLOAD_CACHE_CONTROL, PhotoSize, content_etag, etag_matches, photo_path, photo_transcoder, variant_filename)
 
 
 # Initialize Tables
@@ -40,6 +53,9 @@ logger = logging.getLogger(__name__)
 # Background scheduler for midnight reset
 scheduler = BackgroundScheduler()
 
+# Only the worker holding the DB lease runs cron jobs (see services/leader_lease.py)
+leader = LeaderElector(SessionLocal, ttl_seconds=settings.SCHEDULER_LEASE_TTL_SECONDS)
+
 
 def scheduled_daily_reset():
     """Scheduled job that runs at midnight to generate daily task instances."""
@@ -124,6 +140,30 @@ def run_backup_job():
         logger.error(f"Backup job failed: {e}")
 
 
+def run_change_log_prune_job():
+    """Drop sync change-log entries past their retention window."""
+    db = SessionLocal()
+    try:
+        change_log.prune_change_log(db, settings.CHANGE_LOG_RETENTION_DAYS)
+    except Exception as e:
+        logger.error(f"Change log prune failed: {e}")
+    finally:
+        db.close()
+
+
+def run_photo_gc_job():
+    """Delete a bounded batch of photos no task instance references any more, and old photo jobs."""
+    db = SessionLocal()
+    try:
+        photo_gc.collect_orphan_photos(
+            db, batch_size=settings.PHOTO_GC_BATCH_SIZE, grace_seconds=settings.PHOTO_GC_GRACE_HOURS * 3600)
+        prune_jobs(db, settings.PHOTO_GC_GRACE_HOURS)
+    except Exception as e:
+        logger.error(f"Photo GC failed: {e}")
+    finally:
+        db.close()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # --- Startup ---
@@ -187,9 +227,18 @@ async def lifespan(app: FastAPI):
     logger.info(f"Configuring scheduler with timezone: {timezone_str}")
     scheduler.configure(timezone=timezone_str)
 
+    # Leader election: every worker heartbeats, only the lease holder runs cron jobs
+    leader.heartbeat()
+    scheduler.add_job(
+        leader.heartbeat,
+        trigger=IntervalTrigger(seconds=leader.heartbeat_interval),
+        id="leader_heartbeat_job",
+        replace_existing=True
+    )
+
     # Start the midnight scheduler
     scheduler.add_job(
-        scheduled_daily_reset,
+        leader.guard(scheduled_daily_reset),
         # Run at midnight local time
         trigger=CronTrigger(hour=0, minute=0, timezone=timezone_str),
         id="daily_reset_job",
@@ -198,15 +247,34 @@ async def lifespan(app: FastAPI):
 
     # Schedule Daily Backup (02:00 AM)
     scheduler.add_job(
-        run_backup_job,
+        leader.guard(run_backup_job),
         trigger=CronTrigger(hour=2, minute=0, timezone=timezone_str),
         id="daily_backup_job",
         replace_existing=True
     )
 
+    # Prune the /sync change log (03:00 AM)
+    scheduler.add_job(
+        leader.guard(run_change_log_prune_job),
+        trigger=CronTrigger(hour=3, minute=0, timezone=timezone_str),
+        id="change_log_prune_job",
+        replace_existing=True
+    )
+
+    # Delete unreferenced photos (hourly, bounded batches)
+    scheduler.add_job(
+        leader.guard(run_photo_gc_job),
+        trigger=CronTrigger(minute=45, timezone=timezone_str),
+        id="photo_gc_job",
+        replace_existing=True
+    )
+
     scheduler.start()
+    await broadcaster.start()
+    await photo_job_queue.start()
     logger.info(
-        "Midnight scheduler started - daily reset will run at 00:00, backups at 02:00")
+        "Midnight scheduler started - daily reset will run at 00:00, backups at 02:00 "
+        f"(leader: {leader.is_leader}, owner: {leader.owner_id})")
 
     yield  # Application runs here
 
@@ -221,6 +289,14 @@ async def lifespan(app: FastAPI):
             logger.info("Scheduler was not running.")
     except Exception as e:
         logger.error(f"Error during scheduler shutdown: {e}")
+    leader.release()
+    try:
+        await broadcaster.stop()
+    except Exception as e:
+        logger.error(f"Error stopping SSE event bus: {e}")
+    await photo_job_queue.stop()
+    password_hasher.shutdown()
+    photo_transcoder.shutdown()
     logger.info("Application shutdown complete.")
 
 
@@ -236,6 +312,16 @@ async def domain_error_handler(request: Request, exc: DomainError):
         content={"success": False, "type": "domain_error", "detail": exc.detail}
     )
 
+
+@app.exception_handler(StaleDataError)
+async def stale_data_error_handler(request: Request, exc: StaleDataError):
+    # A concurrent request updated the same versioned row first
+    return JSONResponse(
+        status_code=409,
+        content={"success": False, "type": "domain_error",
+                 "detail": "The resource was modified concurrently, please retry"}
+    )
+
 # M1: Retrieve CORS internal network origins from environment or default to local Vite/React servers
 cors_origins_env = settings.CORS_ORIGINS
 if cors_origins_env:
@@ -255,6 +341,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Ensure uploads directory exists
@@ -262,14 +349,32 @@ _UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 
 
 @app.get("/uploads/{filename}", tags=["System"])
-def get_uploaded_file(filename: str, current_user: models.User = Depends(get_current_user)):
-    """Serve uploaded files only to authenticated users."""
-    file_path = (_UPLOADS_DIR / filename).resolve()
+def get_uploaded_file(filename: str, size: PhotoSize = "display",
+                      if_none_match: Optional[str] = Header(None),
+                      current_user: models.User = Depends(get_current_user)):
+    """Serve uploaded files only to authenticated users.
+
+    ``size`` picks a photo variant (``thumb``, ``display``, ``original``); photos
+    without that variant (older uploads, originals not archived) fall back to the file itself.
+
+    Uploads are immutable, so responses carry a content-hash ``ETag`` and a one-year
+    ``immutable`` ``Cache-Control``; a matching ``If-None-Match`` gets ``304`` without
+    a body, and ``Range`` requests get ``206`` partial content.
+    """
+    file_path = photo_path(filename, _UPLOADS_DIR).resolve()
     if not str(file_path).startswith(str(_UPLOADS_DIR) + os.sep):
         raise HTTPException(status_code=400, detail="Invalid filename")
-    if not file_path.exists():
+    if size != "display":
+        variant_path = photo_path(variant_filename(filename, size), _UPLOADS_DIR)
+        if variant_path.exists():
+            file_path = variant_path
+    if not file_path.is_file():
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(file_path)
+
+    headers = {"ETag": content_etag(file_path), "Cache-Control": UPLOAD_CACHE_CONTROL}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(file_path, headers=headers)
 
 
 # Include Routers
@@ -282,6 +387,7 @@ app.include_router(transactions.router)
 app.include_router(system.router)
 app.include_router(analytics.router)
 app.include_router(notif_router.router)
+app.include_router(sync.router)
 
 
 @app.post("/backups/run", tags=["System"], dependencies=[Depends(get_current_admin_user)])
@@ -293,12 +399,23 @@ def trigger_manual_backup(background_tasks: BackgroundTasks):
 
 # --- SSE Endpoint ---
 @app.get("/events", tags=["System"])
-async def sse_events(token: str = ""):
+async def sse_events(token: str = "", topics: str = "",
+                     last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+                     db: AsyncSession = Depends(get_async_db)):
     """Server-Sent Events endpoint for real-time updates.
 
     Accepts JWT via ?token= query param because the native EventSource API
     cannot send Authorization headers.
 
+    The stream carries only events for the topics derived from the token's
+    user: ``user:{id}`` and ``family-feed`` for everyone, plus
+    ``review-queue`` and ``admin`` for admins. ``?topics=`` (comma-separated,
+    ``user`` meaning the caller's own topic) narrows that set.
+
+    Events carry an SSE ``id``. A reconnecting EventSource sends it back as
+    ``Last-Event-ID`` and receives the events it missed, or a single
+    ``resync`` event when they can no longer be replayed.
+
     NOTE: Passing JWT in query strings means tokens may appear in server access
     logs, browser history, and proxy logs. Sanitise production logs accordingly.
     """
@@ -309,22 +426,42 @@ async def sse_events(token: str = ""):
     if payload is None:
         return JSONResponse(status_code=401, content={"detail": "Invalid or expired token"})
 
+    try:
+        user_id = int(payload.get("sub", ""))
+    except ValueError:
+        return JSONResponse(status_code=401, content={"detail": "Invalid user id format"})
+
+    user = await db.scalar(
+        select(models.User).options(joinedload(models.User.role)).where(models.User.id == user_id))
+    # Release the connection now; the stream may stay open for hours
+    await db.close()
+    if user is None:
+        return JSONResponse(status_code=401, content={"detail": "User not found"})
+
+    subscribed_topics = resolve_topics(user_id, is_admin(user), topics)
+    if not subscribed_topics:
+        return JSONResponse(status_code=403, content={"detail": "No permitted topics requested"})
+
     async def event_stream():
-        queue = await broadcaster.subscribe()
+        subscription = await broadcaster.subscribe(subscribed_topics, last_event_id=last_event_id)
         try:
             # Send initial connection confirmation
-            yield f"data: {json.dumps({'type': 'connected'})}\n\n"
+            yield sse_frame({"type": "connected", "topics": sorted(subscribed_topics)})
 
             while True:
                 # Wait for new events (with timeout for keepalive)
                 try:
-                    message = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(message)}\n\n"
+                    message = await asyncio.wait_for(subscription.get(), timeout=30.0)
                 except asyncio.TimeoutError:
                     # Send keepalive ping
-                    yield f"data: {json.dumps({'type': 'ping'})}\n\n"
+                    yield KEEPALIVE_FRAME
+                    continue
+                if message is None:
+                    # Fell too far behind under the "disconnect" policy; the client reconnects
+                    break
+                yield message.frame
         finally:
-            broadcaster.unsubscribe(queue)
+            broadcaster.unsubscribe(subscription)
 
     return StreamingResponse(
         event_stream(),
@@ -337,6 +474,30 @@ async def sse_events(token: str = ""):
     )
 
 
+@app.get("/events/stats", tags=["System"], dependencies=[Depends(get_current_admin_user)])
+def sse_stats():
+    """Per-client SSE queue depth and drop/coalesce counters."""
+    return broadcaster.stats()
+
+
+@app.get("/identity-cache/stats", tags=["System"], dependencies=[Depends(get_current_admin_user)])
+def identity_cache_stats():
+    """Hit/miss/eviction counters of the authenticated-identity cache."""
+    return identity_cache.stats()
+
+
+@app.get("/password-hasher/stats", tags=["System"], dependencies=[Depends(get_current_admin_user)])
+def password_hasher_stats():
+    """bcrypt pool queue depth (pending = queued + running) and rejection counters."""
+    return password_hasher.stats()
+
+
+@app.get("/photo-transcoder/stats", tags=["System"], dependencies=[Depends(get_current_admin_user)])
+def photo_transcoder_stats():
+    """Photo transcoding pool queue depth and rejection counters, plus the background photo jobs."""
+    return {**photo_transcoder.stats(), "jobs": photo_job_queue.stats()}
+
+
 @app.get("/", tags=["System"])
 def read_root():
     return {"message": "Welcome to ChoreSpec API"}
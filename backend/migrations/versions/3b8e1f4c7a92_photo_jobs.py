@@ -0,0 +1,43 @@
+"""photo_jobs
+
+Add the photo_jobs table: photo uploads accepted with 202 and transcoded
+by a background worker.
+
+Revision ID: 3b8e1f4c7a92
+Revises: 9d2e5a7b3c61
+Create Date: 2026-10-17 18:22:40.517309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3b8e1f4c7a92'
+down_revision: Union[str, Sequence[str], None] = '9d2e5a7b3c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('photo_jobs',
+                    sa.Column('id', sa.String(), nullable=False),
+                    sa.Column('instance_id', sa.Integer(), nullable=False),
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('status', sa.String(), nullable=False),
+                    sa.Column('staged_path', sa.String(), nullable=True),
+                    sa.Column('photo_url', sa.String(), nullable=True),
+                    sa.Column('error', sa.String(), nullable=True),
+                    sa.Column('created_at', sa.DateTime(), nullable=False),
+                    sa.Column('updated_at', sa.DateTime(), nullable=False),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    op.create_index('ix_photo_jobs_status_updated_at', 'photo_jobs', ['status', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_photo_jobs_status_updated_at', table_name='photo_jobs')
+    op.drop_table('photo_jobs')
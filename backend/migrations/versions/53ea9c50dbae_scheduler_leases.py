@@ -0,0 +1,37 @@
+"""scheduler_leases
+
+Add the scheduler_leases table used to elect a single worker that owns
+the APScheduler cron jobs.
+
+Revision ID: 53ea9c50dbae
+Revises: f014dcfd4fb3
+Create Date: 2026-10-16 10:04:17.221904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '53ea9c50dbae'
+down_revision: Union[str, Sequence[str], None] = 'f014dcfd4fb3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scheduler_leases',
+                    sa.Column('name', sa.String(), nullable=False),
+                    sa.Column('owner_id', sa.String(), nullable=False),
+                    sa.Column('acquired_at', sa.DateTime(), nullable=False),
+                    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+                    sa.Column('expires_at', sa.DateTime(), nullable=False),
+                    sa.PrimaryKeyConstraint('name')
+                    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scheduler_leases')
@@ -0,0 +1,40 @@
+"""hot_query_indexes
+
+Add composite indexes for the hot query shapes: the daily task view,
+completion analytics, per-user transaction history and the
+notification inbox.
+
+Revision ID: 8c2e41d7a9b3
+Revises: 53ea9c50dbae
+Create Date: 2026-10-16 11:37:52.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '8c2e41d7a9b3'
+down_revision: Union[str, Sequence[str], None] = '53ea9c50dbae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_task_instances_user_status_due_time', 'task_instances',
+                    ['user_id', 'status', 'due_time'], unique=False)
+    op.create_index('ix_task_instances_status_completed_at', 'task_instances',
+                    ['status', 'completed_at'], unique=False)
+    op.create_index('ix_transactions_user_timestamp', 'transactions',
+                    ['user_id', 'timestamp'], unique=False)
+    op.create_index('ix_notifications_user_read_created_at', 'notifications',
+                    ['user_id', 'read', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_read_created_at', table_name='notifications')
+    op.drop_index('ix_transactions_user_timestamp', table_name='transactions')
+    op.drop_index('ix_task_instances_status_completed_at', table_name='task_instances')
+    op.drop_index('ix_task_instances_user_status_due_time', table_name='task_instances')
@@ -0,0 +1,37 @@
+"""rate_limit_counters
+
+Add the rate_limit_counters table: per-window request counters shared by
+all workers for slowapi's sliding-window limits.
+
+Revision ID: 9d2e5a7b3c61
+Revises: f58d3b7c2e10
+Create Date: 2026-10-17 16:05:12.418803
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '9d2e5a7b3c61'
+down_revision: Union[str, Sequence[str], None] = 'f58d3b7c2e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rate_limit_counters',
+                    sa.Column('key', sa.String(), nullable=False),
+                    sa.Column('count', sa.Integer(), nullable=False),
+                    sa.Column('expires_at', sa.Float(), nullable=False),
+                    sa.PrimaryKeyConstraint('key')
+                    )
+    op.create_index('ix_rate_limit_counters_expires_at', 'rate_limit_counters', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rate_limit_counters_expires_at', table_name='rate_limit_counters')
+    op.drop_table('rate_limit_counters')
@@ -0,0 +1,39 @@
+"""event_bus_messages
+
+Add the event_bus_messages table that relays SSE events between workers
+when EVENT_BUS_BACKEND=polling.
+
+Revision ID: a93e6d0c4f51
+Revises: e7f3a1c95d28
+Create Date: 2026-10-17 09:12:36.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a93e6d0c4f51'
+down_revision: Union[str, Sequence[str], None] = 'e7f3a1c95d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('event_bus_messages',
+                    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+                    sa.Column('origin', sa.String(), nullable=False),
+                    sa.Column('payload', sa.Text(), nullable=False),
+                    sa.Column('created_at', sa.DateTime(), nullable=False),
+                    sa.PrimaryKeyConstraint('id'),
+                    sqlite_autoincrement=True
+                    )
+    op.create_index('ix_event_bus_messages_created_at', 'event_bus_messages', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_event_bus_messages_created_at', table_name='event_bus_messages')
+    op.drop_table('event_bus_messages')
@@ -0,0 +1,63 @@
+"""daily_user_activity
+
+Add the daily_user_activity rollup (one row per user per day) read by the
+analytics endpoints, and backfill it from task_instances and transactions.
+
+Revision ID: b5d07e9c3f12
+Revises: 8c2e41d7a9b3
+Create Date: 2026-10-16 14:21:05.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b5d07e9c3f12'
+down_revision: Union[str, Sequence[str], None] = '8c2e41d7a9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_user_activity',
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('local_date', sa.Date(), nullable=False),
+                    sa.Column('completed_count', sa.Integer(), nullable=False),
+                    sa.Column('points_earned', sa.Integer(), nullable=False),
+                    sa.Column('penalty_points', sa.Integer(), nullable=False),
+                    sa.Column('redeemed_points', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+                    sa.PrimaryKeyConstraint('user_id', 'local_date')
+                    )
+    op.create_index('ix_daily_user_activity_local_date', 'daily_user_activity', ['local_date'], unique=False)
+
+    # Backfill from history (same buckets as activity_rollup.rebuild_daily_activity)
+    if op.get_bind().dialect.name == "sqlite":
+        completed_day, txn_day = "date(completed_at)", "date(timestamp)"
+    else:
+        completed_day, txn_day = "CAST(completed_at AS DATE)", "CAST(timestamp AS DATE)"
+    op.execute(
+        "INSERT INTO daily_user_activity "
+        "(user_id, local_date, completed_count, points_earned, penalty_points, redeemed_points) "
+        "SELECT user_id, day, SUM(completed), SUM(earned), SUM(penalty), SUM(redeemed) FROM ("
+        f"SELECT user_id, {completed_day} AS day, COUNT(*) AS completed, "
+        "0 AS earned, 0 AS penalty, 0 AS redeemed "
+        "FROM task_instances WHERE status = 'COMPLETED' AND completed_at IS NOT NULL "
+        f"GROUP BY user_id, {completed_day} "
+        "UNION ALL "
+        f"SELECT user_id, {txn_day} AS day, 0, "
+        "SUM(CASE WHEN type = 'EARN' THEN awarded_points ELSE 0 END), "
+        "-SUM(CASE WHEN type = 'PENALTY' THEN awarded_points ELSE 0 END), "
+        "-SUM(CASE WHEN type = 'REDEEM' THEN awarded_points ELSE 0 END) "
+        f"FROM transactions GROUP BY user_id, {txn_day}"
+        ") AS activity GROUP BY user_id, day"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_daily_user_activity_local_date', table_name='daily_user_activity')
+    op.drop_table('daily_user_activity')
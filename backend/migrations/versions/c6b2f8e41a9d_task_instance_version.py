@@ -0,0 +1,31 @@
+"""task_instance_version
+
+Add task_instances.version, a row version bumped on every update so SSE
+delta payloads can be applied in order by clients.
+
+Revision ID: c6b2f8e41a9d
+Revises: a93e6d0c4f51
+Create Date: 2026-10-17 11:40:05.613982
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c6b2f8e41a9d'
+down_revision: Union[str, Sequence[str], None] = 'a93e6d0c4f51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task_instances', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('task_instances') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,29 @@
+"""transactions_timestamp_index
+
+Index transactions.timestamp so keyset pages of the global history feed
+seek instead of sorting the whole table.
+
+Revision ID: d41a6c8e2b07
+Revises: b5d07e9c3f12
+Create Date: 2026-10-16 16:02:48.175530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'd41a6c8e2b07'
+down_revision: Union[str, Sequence[str], None] = 'b5d07e9c3f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_timestamp', 'transactions', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_timestamp', table_name='transactions')
@@ -0,0 +1,62 @@
+"""transaction_description_search
+
+Full-text index for transaction description search: an FTS5 trigram table
+kept in sync by triggers on SQLite, a pg_trgm GIN index on Postgres.
+
+Revision ID: e7f3a1c95d28
+Revises: d41a6c8e2b07
+Create Date: 2026-10-16 17:45:12.904316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'e7f3a1c95d28'
+down_revision: Union[str, Sequence[str], None] = 'd41a6c8e2b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+            "description, content='transactions', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN "
+            "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN "
+            "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+            "VALUES ('delete', old.id, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description ON transactions BEGIN "
+            "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+            "VALUES ('delete', old.id, old.description); "
+            "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); END"
+        )
+        # Index existing history
+        op.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+    else:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_transactions_description_trgm "
+            "ON transactions USING gin (description gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS transactions_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS transactions_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS transactions_fts_ai")
+        op.execute("DROP TABLE IF EXISTS transactions_fts")
+    else:
+        op.execute("DROP INDEX IF EXISTS ix_transactions_description_trgm")
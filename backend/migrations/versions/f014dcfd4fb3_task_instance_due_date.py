@@ -0,0 +1,49 @@
+"""task_instance_due_date
+
+Add a per-day ``due_date`` key to task_instances and enforce
+(task_id, user_id, due_date) uniqueness so concurrent daily resets
+cannot create duplicate instances.
+
+Revision ID: f014dcfd4fb3
+Revises: 3994ea1ef68c
+Create Date: 2026-10-16 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f014dcfd4fb3'
+down_revision: Union[str, Sequence[str], None] = '3994ea1ef68c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task_instances', sa.Column('due_date', sa.Date(), nullable=True))
+
+    # Backfill only the oldest row of each (task, user, day) group so that any
+    # historic duplicates keep a NULL key and do not block the unique index.
+    if op.get_bind().dialect.name == "sqlite":
+        day_expr = "date(due_time)"
+    else:
+        day_expr = "CAST(due_time AS DATE)"
+    op.execute(
+        f"UPDATE task_instances SET due_date = {day_expr} "
+        "WHERE id IN ("
+        "SELECT MIN(id) FROM task_instances "
+        f"GROUP BY task_id, user_id, {day_expr})"
+    )
+
+    op.create_index('uq_task_instances_task_user_due_date', 'task_instances',
+                    ['task_id', 'user_id', 'due_date'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_task_instances_task_user_due_date', table_name='task_instances')
+    with op.batch_alter_table('task_instances') as batch_op:
+        batch_op.drop_column('due_date')
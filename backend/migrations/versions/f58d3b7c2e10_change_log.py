@@ -0,0 +1,39 @@
+"""change_log
+
+Add the change_log table: one versioned row per insert/update/delete of a
+synced entity, read by GET /sync.
+
+Revision ID: f58d3b7c2e10
+Revises: c6b2f8e41a9d
+Create Date: 2026-10-17 14:21:57.302846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f58d3b7c2e10'
+down_revision: Union[str, Sequence[str], None] = 'c6b2f8e41a9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_log',
+                    sa.Column('version', sa.Integer(), autoincrement=True, nullable=False),
+                    sa.Column('entity', sa.String(), nullable=False),
+                    sa.Column('entity_id', sa.Integer(), nullable=False),
+                    sa.Column('deleted', sa.Boolean(), nullable=False),
+                    sa.Column('user_id', sa.Integer(), nullable=True),
+                    sa.Column('changed_at', sa.DateTime(), nullable=False),
+                    sa.PrimaryKeyConstraint('version'),
+                    sqlite_autoincrement=True
+                    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('change_log')
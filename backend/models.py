@@ -1,6 +1,6 @@
 import datetime
 from datetime import timezone
-from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, DateTime, Date, Text
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, DateTime, Date, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -112,27 +112,55 @@ class Task(Base):
 # 1.4 Task_Instances (Task Execution & Reporting)
 class TaskInstance(Base):
     __tablename__ = "task_instances"
+    __table_args__ = (
+        # Per-day idempotency key for scheduler-generated instances. Ad-hoc rows
+        # leave due_date NULL, which never conflicts.
+        Index("uq_task_instances_task_user_due_date", "task_id", "user_id", "due_date", unique=True),
+        # Daily task view: user's pending tasks due from today onward
+        Index("ix_task_instances_user_status_due_time", "user_id", "status", "due_time"),
+        # Analytics: completed tasks within a completion window
+        Index("ix_task_instances_status_completed_at", "status", "completed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     due_time = Column(DateTime, nullable=False)
+    due_date = Column(Date, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     status = Column(String, nullable=False, default="PENDING")
 
     completion_photo_url = Column(String, nullable=True)
 
+    # Bumped by the ORM on every UPDATE; lets clients order deltas pushed over SSE
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     # Relationships
     task = relationship("Task", back_populates="instances")
     user = relationship("User", back_populates="task_instances")
     transaction = relationship(
         "Transaction", back_populates="reference_instance", uselist=False)
 
+    __mapper_args__ = {"version_id_col": version}
+
+
+@event.listens_for(TaskInstance.due_time, "set")
+def _sync_due_date(target, value, oldvalue, initiator):
+    """Keep the per-day key aligned when a generated instance is rescheduled."""
+    if target.due_date is not None and value is not None:
+        target.due_date = value.date()
+
 
 # 2.1 Transactions (Audit & Reporting)
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Per-user history, newest first
+        Index("ix_transactions_user_timestamp", "user_id", "timestamp"),
+        # Global history feed (keyset pages walk this index)
+        Index("ix_transactions_timestamp", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -156,9 +184,47 @@ class Transaction(Base):
         "TaskInstance", back_populates="transaction")
 
 
+# 2.2 Full-text search over transaction descriptions (search-as-you-type)
+# SQLite: external-content FTS5 table with the trigram tokenizer, kept in sync
+# by triggers; a quoted trigram MATCH is a case-insensitive substring match,
+# like ILIKE '%term%'. Postgres: a pg_trgm GIN index, which ILIKE uses directly.
+# Neither object is part of the ORM metadata (see migrations/env.py).
+TRANSACTIONS_FTS_TABLE = "transactions_fts"
+
+_SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TRANSACTIONS_FTS_TABLE} USING fts5("
+    "description, content='transactions', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {TRANSACTIONS_FTS_TABLE}_ai AFTER INSERT ON transactions BEGIN "
+    f"INSERT INTO {TRANSACTIONS_FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TRANSACTIONS_FTS_TABLE}_ad AFTER DELETE ON transactions BEGIN "
+    f"INSERT INTO {TRANSACTIONS_FTS_TABLE}({TRANSACTIONS_FTS_TABLE}, rowid, description) "
+    "VALUES ('delete', old.id, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TRANSACTIONS_FTS_TABLE}_au AFTER UPDATE OF description ON transactions BEGIN "
+    f"INSERT INTO {TRANSACTIONS_FTS_TABLE}({TRANSACTIONS_FTS_TABLE}, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    f"INSERT INTO {TRANSACTIONS_FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END",
+)
+_POSTGRES_TRGM_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_transactions_description_trgm "
+    "ON transactions USING gin (description gin_trgm_ops)",
+)
+
+for _stmt in _SQLITE_FTS_DDL:
+    event.listen(Transaction.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in _POSTGRES_TRGM_DDL:
+    event.listen(Transaction.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+event.listen(Transaction.__table__, "before_drop",
+             DDL(f"DROP TABLE IF EXISTS {TRANSACTIONS_FTS_TABLE}").execute_if(dialect="sqlite"))
+
+
 # 3.0 Notifications (System & User Alerts)
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Per-user inbox, optionally unread only, newest first
+        Index("ix_notifications_user_read_created_at", "user_id", "read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -194,3 +260,101 @@ class PushSubscription(Base):
 
     # Relationships
     user = relationship("User", back_populates="push_subscriptions")
+
+
+# 4.0 Scheduler Leases (cluster-wide ownership of background jobs)
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    # e.g., "scheduler" — one row per independently elected job group
+    name = Column(String, primary_key=True)
+    owner_id = Column(String, nullable=False)  # "<hostname>:<pid>:<nonce>"
+
+    acquired_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+# 5.0 Daily Activity Rollup (pre-aggregated analytics, one row per user per day)
+class DailyUserActivity(Base):
+    __tablename__ = "daily_user_activity"
+    __table_args__ = (
+        # Dashboard windows scan a date range across all users
+        Index("ix_daily_user_activity_local_date", "local_date"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # Calendar day the activity is attributed to; same UTC day buckets as completed_at
+    local_date = Column(Date, primary_key=True)
+
+    completed_count = Column(Integer, nullable=False, default=0)
+    points_earned = Column(Integer, nullable=False, default=0)
+    # Stored as positive magnitudes
+    penalty_points = Column(Integer, nullable=False, default=0)
+    redeemed_points = Column(Integer, nullable=False, default=0)
+
+
+# 6.0 Event Bus Messages (cross-worker SSE relay for EVENT_BUS_BACKEND=polling)
+class EventBusMessage(Base):
+    __tablename__ = "event_bus_messages"
+    __table_args__ = (
+        # Pruning deletes by age
+        Index("ix_event_bus_messages_created_at", "created_at"),
+        # Never reuse ids after pruning empties the table: peers only read ids above the last one seen
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    origin = Column(String, nullable=False)  # publishing worker, "<hostname>:<pid>:<nonce>"
+    payload = Column(Text, nullable=False)  # JSON event envelope
+    created_at = Column(DateTime, nullable=False)
+
+
+# 7.0 Change Log (versioned feed of row changes served by GET /sync)
+class ChangeLogEntry(Base):
+    __tablename__ = "change_log"
+    # Never reuse versions after pruning (plain SQLite rowids restart at max + 1)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # Monotonic sync version; clients ask for everything after the last one they saw
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)  # e.g., "task_instances"
+    entity_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    # Owner of per-user rows (notifications); NULL for family-wide entities
+    user_id = Column(Integer, nullable=True)
+    changed_at = Column(DateTime, nullable=False)
+
+
+# 8.0 Rate Limit Counters (slowapi storage shared by all workers)
+class RateLimitCounter(Base):
+    __tablename__ = "rate_limit_counters"
+    __table_args__ = (
+        # Sweeping deletes expired windows
+        Index("ix_rate_limit_counters_expires_at", "expires_at"),
+    )
+
+    # "<limit key>/<window number>", e.g. "LIMITER/10.0.0.5/login/10/1/minute/29485312"
+    key = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    expires_at = Column(Float, nullable=False)  # Unix timestamp; the row is dead afterwards
+
+
+# 9.0 Photo Jobs (uploads accepted with 202 and transcoded in the background)
+class PhotoJob(Base):
+    __tablename__ = "photo_jobs"
+    __table_args__ = (
+        # Startup recovery looks up pending jobs; pruning deletes finished ones by age
+        Index("ix_photo_jobs_status_updated_at", "status", "updated_at"),
+    )
+
+    id = Column(String, primary_key=True)  # uuid4 hex, returned to the uploader
+    # No foreign keys: a job must not block deleting its instance or user
+    instance_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)  # uploader
+    status = Column(String, nullable=False, default="pending")  # pending, processing, done, failed
+    staged_path = Column(String, nullable=True)  # raw upload in uploads/.staging until processed
+    photo_url = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
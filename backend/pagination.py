@@ -0,0 +1,31 @@
+"""
+Opaque keyset cursors for newest-first history endpoints.
+
+A cursor encodes the (timestamp, id) of the last row on a page. The next
+page continues strictly after that key, so the database seeks through the
+index instead of skipping ``OFFSET`` rows. Clients treat cursors as opaque
+strings and pass them back verbatim.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+
+from .exceptions import InvalidCursorError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Return the (timestamp, id) key encoded in ``cursor``; raises InvalidCursorError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError()
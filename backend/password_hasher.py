@@ -0,0 +1,57 @@
+"""
+Bounded process pool for bcrypt PIN hashing and verification.
+
+bcrypt burns 100-300 ms of CPU per call by design. Run inline, a burst of
+logins occupies the request threadpool and the GIL, and every other
+endpoint queues behind it. Hashing therefore runs in a dedicated
+``BoundedProcessPool`` of ``PASSWORD_HASH_WORKERS`` processes (default:
+up to 4, one per core), so bursts spread across cores while the workers
+serving requests only wait on a future.
+
+At most ``PASSWORD_HASH_MAX_PENDING`` calls may be queued or running;
+beyond that callers get ``ServiceBusyError`` (503). ``PASSWORD_HASH_WORKERS=0``
+hashes in the calling thread (async callers: the default executor).
+"""
+from typing import cast
+
+from passlib.context import CryptContext
+
+from .config import settings
+from .process_pool import BoundedProcessPool, default_workers
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return cast(str, pwd_context.hash(password))
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return cast(bool, pwd_context.verify(plain_password, hashed_password))
+
+
+class PasswordHasher(BoundedProcessPool):
+    """bcrypt in a lazily started, size-limited process pool."""
+
+    def __init__(self, workers: int, max_pending: int = 64):
+        super().__init__("Password hasher", workers, max_pending,
+                         busy_detail="Too many logins at once, please retry")
+
+    def hash(self, password: str) -> str:
+        """Hash in the pool, blocking the calling thread (not the GIL) until done."""
+        return cast(str, self.call(_hash, password))
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return cast(bool, self.call(_verify, plain_password, hashed_password))
+
+    async def hash_async(self, password: str) -> str:
+        return cast(str, await self.call_async(_hash, password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return cast(bool, await self.call_async(_verify, plain_password, hashed_password))
+
+
+password_hasher = PasswordHasher(
+    workers=default_workers() if settings.PASSWORD_HASH_WORKERS is None else settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,122 @@
+"""
+Bounded process pools for CPU-heavy work (bcrypt, image transcoding).
+
+Each pool is a lazily started ``ProcessPoolExecutor`` with a cap on calls
+queued or running; beyond it callers get ``ServiceBusyError`` (503) instead
+of waiting behind a queue that cannot drain in time. Request threads and
+the event loop only wait on a future, so one kind of CPU work cannot
+starve the rest of the API. ``workers=0`` runs calls in the calling thread
+(async callers: the default executor).
+
+Workers are started with ``spawn`` and only import the module that defines
+the submitted function, so they never inherit the application's threads,
+sockets or database connections. Submitted functions must be module-level
+and their modules cheap to import.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .exceptions import ServiceBusyError
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers(limit: int = 4) -> int:
+    """One process per core, at most ``limit``."""
+    return max(1, min(limit, os.cpu_count() or 1))
+
+
+class BoundedProcessPool:
+    """Size-limited process pool that counts queue depth."""
+
+    def __init__(self, name: str, workers: int, max_pending: int = 64,
+                 busy_detail: str = "Server is busy, please retry"):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.busy_detail = busy_detail
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self._total_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+                logger.info(f"{self.name}: started pool with up to {self.workers} processes")
+            return self._executor
+
+    def _acquire(self) -> float:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ServiceBusyError(self.busy_detail)
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        return time.monotonic()
+
+    def _release(self, started: float) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self._total_seconds += time.monotonic() - started
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+        started = self._acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(started)
+            raise
+        future.add_done_callback(lambda _: self._release(started))
+        return future
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in the pool, blocking the calling thread (not the GIL) until done."""
+        if self.workers <= 0:
+            started = self._acquire()
+            try:
+                return fn(*args)
+            finally:
+                self._release(started)
+        return self._submit(fn, *args).result()
+
+    async def call_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in the pool without blocking the event loop."""
+        if self.workers <= 0:
+            return await asyncio.get_running_loop().run_in_executor(None, self.call, fn, *args)
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; the next call starts a fresh pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "started": self._executor is not None,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_ms": round(self._total_seconds * 1000 / self.completed, 1) if self.completed else 0.0,
+            }
@@ -1,6 +1,201 @@
+"""
+Request rate limiting (slowapi) with counters shared by all workers.
+
+slowapi's default storage counts in process memory, so with several
+uvicorn workers ``10/minute`` really allows ``10 × workers`` per minute,
+and counters are only dropped when touched again. ``DatabaseStorage``
+keeps them in the application database (``rate_limit_counters``) instead:
+
+- Limits use the sliding-window-counter strategy. Each key has one counter
+  row per fixed window; a hit is allowed while the previous window's count,
+  weighted by how much of it still overlaps the sliding window, plus the
+  current count stays within the limit.
+- Every increment is a single atomic upsert (``INSERT ... ON CONFLICT DO
+  UPDATE ... RETURNING``), so concurrent workers never lose a hit.
+- A row is dead once its window and the following one have passed; expired
+  rows are swept every ``sweep_interval`` seconds, so the table only holds
+  the clients seen in the last two windows.
+
+``RATE_LIMIT_STORAGE_URI=memory://`` restores slowapi's per-process counters.
+"""
 import os
+import threading
+import time
+from math import floor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+from limits.storage.base import TimestampedSlidingWindow
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from sqlalchemy import case, delete, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import models
+from .config import settings
+
+
+class DatabaseStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """``limits`` storage backed by the ``rate_limit_counters`` table (``database://``)."""
+
+    STORAGE_SCHEME = ["database"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False,
+                 engine: Optional[Engine] = None, sweep_interval: float = 60,
+                 clock: Callable[[], float] = time.time, **options: Any):
+        self._engine = engine
+        self.sweep_interval = float(sweep_interval)
+        # Wall clock: expiry timestamps are compared across processes
+        self._clock = clock
+        self._next_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+        self.swept = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            # Resolved on first use: the limiter is built at import time
+            from .database import engine
+
+            self._engine = engine
+        return self._engine
+
+    @property
+    def base_exceptions(self) -> Type[Exception]:
+        return SQLAlchemyError
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        """Atomically add ``amount`` to ``key``, restarting it if expired. Returns the new count."""
+        now = self._clock()
+        table = models.RateLimitCounter.__table__
+        dialect = self.engine.dialect.name
+        if dialect == "sqlite":
+            stmt = sqlite_insert(table)
+        elif dialect == "postgresql":
+            stmt = pg_insert(table)
+        else:
+            raise NotImplementedError(f"DatabaseStorage does not support the {dialect} dialect")
+
+        expired = table.c.expires_at <= now
+        stmt = stmt.values(key=key, count=amount, expires_at=now + expiry).on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                "count": case((expired, amount), else_=table.c.count + amount),
+                "expires_at": case((expired, now + expiry), else_=table.c.expires_at),
+            },
+        ).returning(table.c.count)
+        with self.engine.begin() as conn:
+            count = int(conn.execute(stmt).scalar_one())
+        self._maybe_sweep(now)
+        return count
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        table = models.RateLimitCounter.__table__
+        now = self._clock()
+        with self.engine.begin() as conn:
+            count = conn.execute(
+                update(table)
+                .where(table.c.key == key, table.c.expires_at > now)
+                .values(count=case((table.c.count > amount, table.c.count - amount), else_=0))
+                .returning(table.c.count)
+            ).scalar()
+        return int(count or 0)
+
+    def get(self, key: str) -> int:
+        return self._counts([key], self._clock()).get(key, 0)
+
+    def get_expiry(self, key: str) -> float:
+        table = models.RateLimitCounter.__table__
+        now = self._clock()
+        with self.engine.connect() as conn:
+            expires_at = conn.scalar(
+                select(table.c.expires_at).where(table.c.key == key, table.c.expires_at > now))
+        return float(expires_at) if expires_at is not None else now
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self.engine.begin() as conn:
+            return int(conn.execute(delete(models.RateLimitCounter.__table__)).rowcount)
+
+    def clear(self, key: str) -> None:
+        table = models.RateLimitCounter.__table__
+        with self.engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.key == key))
+
+    def _counts(self, keys: List[str], now: float) -> Dict[str, int]:
+        table = models.RateLimitCounter.__table__
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.key, table.c.count).where(table.c.key.in_(keys), table.c.expires_at > now))
+            return {key: int(count) for key, count in rows}
+
+    def _window(self, key: str, expiry: int, now: float) -> Tuple[str, int, float, int, float]:
+        """Current window key plus (previous count, previous TTL, current count, current TTL)."""
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        counts = self._counts([previous_key, current_key], now)
+        previous_count = counts.get(previous_key, 0)
+        current_count = counts.get(current_key, 0)
+        # Share of the previous window still inside the sliding window, in seconds
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return current_key, previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        current_key, previous_count, previous_ttl, current_count, _ = self._window(key, expiry, self._clock())
+        weighted_previous = previous_count * previous_ttl / expiry
+        if floor(weighted_previous + current_count) + amount > limit:
+            return False
+        # The counter must outlive its own window: it is the next window's "previous"
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if floor(weighted_previous + current_count) > limit:
+            # Another worker took the last slot between the read and the increment
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        return self._window(key, expiry, self._clock())[1:]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, self._clock())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now < self._next_sweep or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sweep = now + self.sweep_interval
+            self.sweep(now)
+        finally:
+            self._sweep_lock.release()
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete expired counters. Returns the number removed."""
+        table = models.RateLimitCounter.__table__
+        with self.engine.begin() as conn:
+            removed = int(conn.execute(delete(table).where(table.c.expires_at <= (now or self._clock()))).rowcount)
+        self.swept += removed
+        return removed
+
 
 _enabled = os.getenv("TESTING", "False") != "True"
-limiter = Limiter(key_func=get_remote_address, enabled=_enabled)
+limiter = Limiter(
+    key_func=get_remote_address,
+    enabled=_enabled,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy="sliding-window-counter",
+)
@@ -0,0 +1,16 @@
+from backend.database import SessionLocal
+from backend.services.activity_rollup import rebuild_daily_activity
+
+
+def rebuild_activity():
+    print("Rebuilding daily activity rollup...")
+    db = SessionLocal()
+    try:
+        count = rebuild_daily_activity(db)
+    finally:
+        db.close()
+    print(f"Daily activity rollup rebuilt ({count} rows).")
+
+
+if __name__ == "__main__":
+    rebuild_activity()
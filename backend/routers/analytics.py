@@ -1,12 +1,13 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date as date_type, datetime, time, timedelta, timezone
 from typing import List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import and_, func, select
+from sqlalchemy.sql.elements import ColumnElement
 
 from ..database import get_db
 from ..dependencies import get_current_user
-from ..models import User, Task, TaskInstance
+from ..models import DailyUserActivity, User, Task, TaskInstance
 from ..schemas import (
     HeatmapDay, UserHeatmap, HeatmapResponse,
     HeatmapTaskDetail, HeatmapDayDetails,
@@ -22,6 +23,20 @@ router = APIRouter(
 )
 
 
+def _completed_during(start: date_type, days: int = 1) -> ColumnElement[bool]:
+    """
+    ``completed_at`` within the half-open ``[start, start + days)`` range.
+
+    Filtering ``completed_at`` against plain bounds (instead of wrapping it in
+    ``date()``) keeps the predicate sargable, so the (status, completed_at)
+    index narrows the scan to the window. Bounds are naive UTC, like the
+    stored timestamps.
+    """
+    range_start = datetime.combine(start, time.min)
+    completed_at = TaskInstance.__table__.c.completed_at
+    return and_(completed_at >= range_start, completed_at < range_start + timedelta(days=days))
+
+
 @router.get("/weekly", response_model=List[Dict[str, Any]], dependencies=[Depends(get_current_user)])
 def get_weekly_activity(db: Session = Depends(get_db)):
     """
@@ -41,20 +56,16 @@ def get_weekly_activity(db: Session = Depends(get_db)):
     today = datetime.now(timezone.utc).date()
     seven_days_ago = today - timedelta(days=6)
 
-    # Query completed tasks in the last 7 days
-    results = (
-        db.query(
-            func.date(TaskInstance.completed_at).label("date"),
-            User.nickname,
-            func.count(TaskInstance.id).label("count")
+    # Read the pre-aggregated rollup: cost is days x users, not total completions
+    activity, users = DailyUserActivity.__table__, User.__table__
+    results = db.execute(
+        select(activity.c.local_date, users.c.nickname, activity.c.completed_count)
+        .join_from(activity, users, activity.c.user_id == users.c.id)
+        .where(
+            activity.c.local_date >= seven_days_ago,
+            activity.c.local_date <= today,
+            activity.c.completed_count > 0,
         )
-        .join(User, TaskInstance.user_id == User.id)
-        .filter(
-            TaskInstance.status == "COMPLETED",
-            func.date(TaskInstance.completed_at) >= seven_days_ago
-        )
-        .group_by(func.date(TaskInstance.completed_at), User.nickname)
-        .all()
     )
 
     # Initialize data structure for the last 7 days
@@ -65,11 +76,10 @@ def get_weekly_activity(db: Session = Depends(get_db)):
         data_map[day_str] = {}
 
     # Fill in the query results
-    for r in results:
-        # r.date might be a string or date object depending on SQLite driver
-        date_str = str(r.date)
+    for local_date, nickname, count in results:
+        date_str = local_date.strftime("%Y-%m-%d")
         if date_str in data_map:
-            data_map[date_str][r.nickname] = r.count
+            data_map[date_str][nickname] = count
 
     # Format for frontend
     formatted_data: List[Dict[str, Any]] = []
@@ -115,27 +125,22 @@ def get_heatmap_data(
     # Pre-build date range
     date_range = [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
 
-    # Query completed tasks in the window
-    results = (
-        db.query(
-            TaskInstance.user_id,
-            func.date(TaskInstance.completed_at).label("date"),
-            func.count(TaskInstance.id).label("count"),
-        )
-        .filter(
-            TaskInstance.status == "COMPLETED",
-            func.date(TaskInstance.completed_at) >= start_date,
+    # Read the pre-aggregated rollup for the window
+    activity = DailyUserActivity.__table__
+    results = db.execute(
+        select(activity.c.user_id, activity.c.local_date, activity.c.completed_count)
+        .where(
+            activity.c.local_date >= start_date,
+            activity.c.local_date <= today,
+            activity.c.completed_count > 0,
         )
-        .group_by(TaskInstance.user_id, func.date(TaskInstance.completed_at))
-        .all()
     )
 
     # Index results by (user_id, date_str)
     counts: Dict[int, Dict[str, int]] = {}
-    for r in results:
-        uid = r.user_id
-        d = str(r.date)
-        counts.setdefault(uid, {})[d] = r.count
+    for uid, local_date, count in results:
+        d = local_date.strftime("%Y-%m-%d")
+        counts.setdefault(uid, {})[d] = count
 
     # Build response for every active user
     users = db.query(User).all()
@@ -159,36 +164,27 @@ def get_analytics_summary(db: Session = Depends(get_db)) -> AnalyticsSummary:
     """
     today = datetime.now(timezone.utc).date()
     week_start = today - timedelta(days=6)
+    activity, users_table = DailyUserActivity.__table__, User.__table__
+    in_week = and_(activity.c.local_date >= week_start, activity.c.local_date <= today)
 
     # Total completed tasks this week
-    week_total: int = (
-        db.query(func.count(TaskInstance.id))
-        .filter(
-            TaskInstance.status == "COMPLETED",
-            func.date(TaskInstance.completed_at) >= week_start,
-        )
-        .scalar()
-    ) or 0
+    week_total: int = db.scalar(select(func.sum(activity.c.completed_count)).where(in_week)) or 0
 
     # Per-user counts this week → top performer
-    per_user = (
-        db.query(
-            User.nickname,
-            func.count(TaskInstance.id).label("cnt"),
-        )
-        .join(TaskInstance, TaskInstance.user_id == User.id)
-        .filter(
-            TaskInstance.status == "COMPLETED",
-            func.date(TaskInstance.completed_at) >= week_start,
-        )
-        .group_by(User.nickname)
-        .order_by(func.count(TaskInstance.id).desc())
-        .all()
-    )
+    week_count = func.sum(activity.c.completed_count)
+    leader = db.execute(
+        select(users_table.c.nickname, week_count)
+        .join_from(users_table, activity, activity.c.user_id == users_table.c.id)
+        .where(in_week)
+        .group_by(users_table.c.nickname)
+        .having(week_count > 0)
+        .order_by(week_count.desc())
+        .limit(1)
+    ).first()
 
     top: TopPerformer | None = None
-    if per_user:
-        top = TopPerformer(nickname=per_user[0].nickname, count=per_user[0].cnt)
+    if leader is not None:
+        top = TopPerformer(nickname=leader[0], count=leader[1])
 
     # Streak leaderboard (all users, sorted desc)
     users = db.query(User).order_by(User.current_streak.desc()).all()
@@ -219,7 +215,7 @@ def get_heatmap_day_details(
     Used when clicking a heatmap cell.
     """
     try:
-        datetime.strptime(date, "%Y-%m-%d")
+        day = datetime.strptime(date, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="date must be in YYYY-MM-DD format")
 
@@ -234,7 +230,7 @@ def get_heatmap_day_details(
         .filter(
             TaskInstance.user_id == user_id,
             TaskInstance.status == "COMPLETED",
-            func.date(TaskInstance.completed_at) == date,
+            _completed_during(day),
         )
         .all()
     )
@@ -15,6 +15,8 @@ router = APIRouter(tags=["Auth"])
 @router.post("/login/", response_model=schemas.Token)
 @limiter.limit("10/minute")
 def login(request: Request, user_credentials: schemas.UserLogin, response: Response, db: Session = Depends(get_db)):
+    # Sync on purpose: slowapi calls the (blocking) DatabaseStorage inline, which must stay off the
+    # event loop. bcrypt still runs in the hashing process pool; the request thread only waits on it.
     logger.info(f"Login attempt for user: {user_credentials.nickname}")
     user = crud.get_user_by_nickname(db, nickname=user_credentials.nickname)
     if not user:
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 import logging
 
 from .. import schemas, crud, models
 from ..services import rewards as rewards_service, notifications
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..dependencies import get_current_user, get_current_admin_user, require_self_or_admin
-from ..events import broadcaster
+from ..events import FAMILY_FEED, broadcaster, user_topic
 
 logger = logging.getLogger(__name__)
 
@@ -62,20 +63,20 @@ def set_user_goal(user_id: int, reward_id: int,
              response_model=schemas.RedemptionResponse)
 async def redeem_reward(reward_id: int,
                         current_user: models.User = Depends(get_current_user),
-                        db: Session = Depends(get_db)):
+                        db: AsyncSession = Depends(get_async_db)):
     """
     Redeem a reward for the currently authenticated user.
     Deducts points, creates a REDEEM transaction, and optionally clears goal.
     """
     user_id = int(current_user.id)
     logger.info(f"Redeeming reward {reward_id} for user {user_id}")
-    result = rewards_service.redeem_reward(db, user_id=user_id, reward_id=reward_id)
+    result = await db.run_sync(rewards_service.redeem_reward, user_id=user_id, reward_id=reward_id)
 
     logger.info(
         f"Redemption successful: {result.reward_name} for {result.points_spent} points")
 
     # Notify User
-    notifications.create_notification(db, schemas.NotificationCreate(
+    await db.run_sync(notifications.create_notification, schemas.NotificationCreate(
         user_id=user_id,
         type="REWARD_REDEEMED",
         title="Reward Redeemed!",
@@ -89,8 +90,8 @@ async def redeem_reward(reward_id: int,
         "reward_name": result.reward_name,
         "points_spent": result.points_spent,
         "remaining_points": result.remaining_points
-    })
-    await broadcaster.broadcast("notification", {"user_id": user_id})
+    }, topics=[FAMILY_FEED, user_topic(user_id)])
+    await broadcaster.broadcast("notification", {"user_id": user_id}, topics=[user_topic(user_id)])
 
     return result
 
@@ -101,7 +102,7 @@ async def redeem_reward(reward_id: int,
 async def redeem_reward_split(
     reward_id: int,
     request: schemas.SplitRedemptionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Redeem a reward by pooling points from multiple users.
@@ -114,8 +115,8 @@ async def redeem_reward_split(
     contributions = [{"user_id": c.user_id, "points": c.points}
                      for c in request.contributions]
 
-    result = rewards_service.redeem_reward_split(
-        db, reward_id=reward_id, contributions=contributions)
+    result = await db.run_sync(
+        rewards_service.redeem_reward_split, reward_id=reward_id, contributions=contributions)
 
     logger.info(
         f"Split redemption successful: {result.reward_name} for {result.total_points} points")
@@ -127,16 +128,16 @@ async def redeem_reward_split(
         "total_points": result.total_points,
         "contributors": [t.model_dump() for t in result.transactions] if result.transactions else [],
         "is_split": True
-    })
+    }, topics=[FAMILY_FEED, *(user_topic(t.user_id) for t in result.transactions or [])])
 
     # Notify all contributors
     for tx in (result.transactions or []):
-        notifications.create_notification(db, schemas.NotificationCreate(
+        await db.run_sync(notifications.create_notification, schemas.NotificationCreate(
             user_id=tx.user_id,
             type="REWARD_REDEEMED",
             title="Group Reward Redeemed!",
             message=f"You contributed {tx.points} points to '{result.reward_name}'."
         ))
-        await broadcaster.broadcast("notification", {"user_id": tx.user_id})
+        await broadcaster.broadcast("notification", {"user_id": tx.user_id}, topics=[user_topic(tx.user_id)])
 
     return result
@@ -6,6 +6,7 @@ import logging
 from .. import schemas, crud, models
 from ..database import get_db
 from ..dependencies import get_current_user, get_current_admin_user
+from ..identity_cache import identity_cache
 
 logger = logging.getLogger(__name__)
 
@@ -112,6 +113,8 @@ def delete_role(role_id: int, reassign_to_role_id: int = None, db: Session = Dep
     # Delete the role
     db.delete(db_role)
     db.commit()
+    # Cached identities of reassigned users still reference the deleted role
+    identity_cache.invalidate_role(role_id)
     logger.info(f"Role deleted: {role_id}")
 
     return {
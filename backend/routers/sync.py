@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from .. import schemas, models
+from ..database import get_db
+from ..dependencies import get_current_user
+from ..services import change_log
+
+router = APIRouter(tags=["Sync"])
+
+
+@router.get("/sync", response_model=schemas.SyncResponse)
+def sync_changes(
+    since: int = Query(0, ge=0, description="Last `version` applied by the client; 0 for a full snapshot"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum change-log entries to read"),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Rows of tasks, task instances, users, rewards and the caller's own
+    notifications changed after version ``since``. Keep the returned
+    ``version`` and pass it as ``since`` next time; ``reset`` means the
+    response is a full snapshot that replaces the local replica.
+    """
+    return change_log.get_changes(db, int(current_user.id), since, limit=limit)
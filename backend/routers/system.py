@@ -3,14 +3,15 @@ from datetime import timezone
 import logging
 
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import schemas, crud, models
 from ..services import scheduler, notifications
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..dependencies import get_current_user, get_current_admin_user, require_self_or_admin
 from ..notifications_service import send_email_background
-from ..events import broadcaster
+from ..events import FAMILY_FEED, broadcaster
 
 logger = logging.getLogger(__name__)
 
@@ -51,12 +52,12 @@ def export_tasks(db: Session = Depends(get_db)):
 
 @router.post("/tasks/import", response_model=schemas.TaskImportResponse,
              dependencies=[Depends(get_current_admin_user)])
-async def import_tasks(import_data: schemas.TasksImport, db: Session = Depends(get_db)):
+async def import_tasks(import_data: schemas.TasksImport, db: AsyncSession = Depends(get_async_db)):
     """Import tasks from a structured format. Uses role names instead of IDs."""
     logger.info(f"Importing {len(import_data.tasks)} tasks...")
 
     # Build role name to ID lookup
-    roles = {r.name.lower(): r.id for r in crud.get_roles(db)}
+    roles = {r.name.lower(): r.id for r in await db.run_sync(crud.get_roles)}
 
     # Add localized aliases (German -> English System Roles)
     role_aliases = {
@@ -75,7 +76,7 @@ async def import_tasks(import_data: schemas.TasksImport, db: Session = Depends(g
             roles[alias] = roles[target]
 
     # Get existing task names for duplicate detection
-    existing_names = {t.name.lower() for t in crud.get_tasks(db)}
+    existing_names = {t.name.lower() for t in await db.run_sync(crud.get_tasks)}
 
     created = []
     skipped = []
@@ -114,7 +115,7 @@ async def import_tasks(import_data: schemas.TasksImport, db: Session = Depends(g
                 recurrence_max_days=task_item.recurrence_max_days,
                 requires_photo_verification=task_item.requires_photo_verification,
             )
-            new_task = crud.create_task(db=db, task=task_create)
+            new_task = await db.run_sync(crud.create_task, task_create)
             created.append(str(new_task.name))
             # Prevent duplicates within import
             existing_names.add(task_item.name.lower())
@@ -125,7 +126,7 @@ async def import_tasks(import_data: schemas.TasksImport, db: Session = Depends(g
 
     # Broadcast SSE event if any tasks were created
     if created:
-        await broadcaster.broadcast("tasks_imported", {"count": len(created)})
+        await broadcaster.broadcast("tasks_imported", {"count": len(created)}, topics=[FAMILY_FEED])
 
     logger.info(
         f"Import complete: {len(created)} created, {len(skipped)} skipped, {len(errors)} errors")
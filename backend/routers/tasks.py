@@ -1,22 +1,21 @@
-import io
-import os
-import uuid
-from pathlib import Path
 
 from typing import List, Optional
+import asyncio
 import logging
 
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, File, UploadFile
-from fastapi.concurrency import run_in_threadpool
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, File, Query, UploadFile
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
 from .. import schemas, crud, models
-from ..services import tasks as tasks_service, scheduler, notifications
-from ..database import get_db
+from ..services import tasks as tasks_service, scheduler, notifications, photos, photo_jobs
+from ..database import get_db, get_async_db
 from ..dependencies import get_current_user, get_current_admin_user, is_admin, require_self_or_admin
-from ..events import broadcaster
+from ..events import FAMILY_FEED, REVIEW_QUEUE, broadcaster, user_topic, within_delta_budget
 from ..notifications_service import send_email_background, send_push_to_user_background
 
 logger = logging.getLogger(__name__)
@@ -24,29 +23,93 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Tasks"])
 
 
-MAX_THUMBNAIL_DIM = 1280  # px — longest edge; preserves aspect ratio
+async def _load_instance(db: AsyncSession, instance_id: int) -> Optional[models.TaskInstance]:
+    """Fetch an instance with the relationships its response schema serialises."""
+    result = await db.execute(
+        select(models.TaskInstance)
+        .options(
+            joinedload(models.TaskInstance.task),
+            joinedload(models.TaskInstance.user).joinedload(models.User.role),
+        )
+        .where(models.TaskInstance.id == instance_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def _load_instances(db: AsyncSession, instance_ids: List[int]) -> List[models.TaskInstance]:
+    """``_load_instance`` for several ids, returned in the given order."""
+    result = await db.execute(
+        select(models.TaskInstance)
+        .options(
+            joinedload(models.TaskInstance.task),
+            joinedload(models.TaskInstance.user).joinedload(models.User.role),
+        )
+        .where(models.TaskInstance.id.in_(instance_ids))
+        .execution_options(populate_existing=True)
+    )
+    by_id = {instance.id: instance for instance in result.scalars()}
+    return [by_id[instance_id] for instance_id in instance_ids if instance_id in by_id]
+
 
+async def _instance_delta(db: AsyncSession, instance_id: int) -> dict:
+    """
+    SSE payload for a changed instance: the row as ``schemas.TaskInstance``,
+    its version and the assignee's balance, so clients update in place
+    instead of refetching.
+    """
+    instance = await _load_instance(db, instance_id)
+    if instance is None:
+        # Deleted concurrently: clients refetch
+        return {"instance_id": instance_id}
+    return {
+        "instance_id": instance_id,
+        "user_id": instance.user_id,
+        "version": instance.version,
+        "instance": schemas.TaskInstance.model_validate(instance).model_dump(mode="json"),
+        "balance": schemas.UserBalance.model_validate(instance.user).model_dump(mode="json"),
+    }
 
-def _compress_and_save(buf: io.BytesIO, path: str, max_dim: int = MAX_THUMBNAIL_DIM) -> None:
-    """Resize and convert image to WebP. Runs in a threadpool to avoid blocking the event loop."""
-    with Image.open(buf) as img:
-        img = img.convert("RGB")  # Normalises RGBA, palette, and CMYK to 3-channel
-        img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
-        img.save(path, format="WEBP", quality=82, optimize=True)
+
+def _notification_delta(user_id: int, notification: Optional[models.Notification]) -> dict:
+    """SSE payload for a user's notification feed; carries the new row when there is one."""
+    return {
+        "user_id": user_id,
+        "notification": (schemas.Notification.model_validate(notification).model_dump(mode="json")
+                         if notification is not None else None),
+    }
 
 
 @router.post("/tasks/", response_model=schemas.Task, dependencies=[Depends(get_current_admin_user)])
-async def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
     logger.info(
         f"Creating task: {task.name} with {task.base_points} base points")
-    created_task = crud.create_task(db=db, task=task)
+    created_task = await db.run_sync(crud.create_task, task)
     # Auto-generate instances for the new task so it appears on Family Dashboard immediately
-    scheduler.generate_instances_for_task(db, created_task)
+    await db.run_sync(scheduler.generate_instances_for_task, created_task)
     logger.info(
         f"Task created successfully: {created_task.name} (ID: {created_task.id})")
 
-    # Broadcast SSE event for real-time updates
-    await broadcaster.broadcast("task_created", {"task_id": created_task.id, "name": created_task.name})
+    # Broadcast SSE event for real-time updates, with the generated instances
+    generated = await db.execute(
+        select(models.TaskInstance)
+        .options(
+            joinedload(models.TaskInstance.task),
+            joinedload(models.TaskInstance.user).joinedload(models.User.role),
+        )
+        .where(models.TaskInstance.task_id == created_task.id)
+    )
+    created = {
+        "task_id": created_task.id,
+        "name": created_task.name,
+        "task": schemas.Task.model_validate(created_task).model_dump(mode="json"),
+    }
+    instances = [schemas.TaskInstance.model_validate(i).model_dump(mode="json")
+                 for i in generated.scalars().unique()]
+    if within_delta_budget({**created, "instances": instances}):
+        created["instances"] = instances
+    # Otherwise (one instance per family member adds up) clients refetch the task list
+    await broadcaster.broadcast("task_created", created, topics=[FAMILY_FEED])
 
     return created_task
 
@@ -72,17 +135,17 @@ def update_task(task_id: int, task_update: schemas.TaskUpdate, db: Session = Dep
 
 
 @router.delete("/tasks/{task_id}", dependencies=[Depends(get_current_admin_user)])
-async def delete_task(task_id: int, db: Session = Depends(get_db)):
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a task and all its instances."""
     logger.info(f"Deleting task: {task_id}")
-    success = crud.delete_task(db, task_id=task_id)
+    success = await db.run_sync(crud.delete_task, task_id)
     if not success:
         logger.error(f"Task not found: {task_id}")
         raise HTTPException(status_code=404, detail="Task not found")
     logger.info(f"Task deleted successfully: {task_id}")
 
     # Broadcast SSE event for real-time updates
-    await broadcaster.broadcast("task_deleted", {"task_id": task_id})
+    await broadcaster.broadcast("task_deleted", {"task_id": task_id}, topics=[FAMILY_FEED])
 
     return {"message": f"Task {task_id} deleted successfully"}
 
@@ -112,13 +175,12 @@ async def complete_task(
     background_tasks: BackgroundTasks,
     actual_user_id: Optional[int] = None,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(
         f"Attempting to complete task instance: {instance_id} by user {current_user.id}")
 
-    orm_instance = db.query(models.TaskInstance).filter(
-        models.TaskInstance.id == instance_id).first()
+    orm_instance = await _load_instance(db, instance_id)
     if not orm_instance:
         raise HTTPException(status_code=404, detail="Task instance not found")
 
@@ -135,36 +197,38 @@ async def complete_task(
             raise HTTPException(status_code=403, detail="Not authorized to complete this task")
         completing_user_id = int(current_user.id)
 
-    instance = tasks_service.complete_task_instance(
-        db, instance_id=instance_id, actual_user_id=completing_user_id,
+    instance = await db.run_sync(
+        tasks_service.complete_task_instance, instance_id=instance_id, actual_user_id=completing_user_id,
         skip_ownership_check=user_is_admin)
 
     logger.info(
         f"Task completed successfully: instance {instance_id} by user {instance.user_id}")
 
     # Notify User if completed
+    notification: Optional[models.Notification] = None
     if instance.status == "COMPLETED":
         # Look up awarded points from the transaction record
-        txn = db.query(models.Transaction).filter(
-            models.Transaction.reference_instance_id == instance_id
-        ).first()
-        awarded_points = txn.awarded_points if txn else 0
+        awarded_points = await db.scalar(
+            select(models.Transaction.awarded_points).where(
+                models.Transaction.reference_instance_id == instance_id
+            ).limit(1)
+        ) or 0
 
-        notifications.create_notification(db, schemas.NotificationCreate(
+        notification = await db.run_sync(notifications.create_notification, schemas.NotificationCreate(
             user_id=int(instance.user_id),
             type="TASK_COMPLETED",
             title="Task Completed!",
             message=f"You earned {awarded_points} points for '{task_name}'."
         ))
     elif instance.status == "IN_REVIEW":
-        notifications.create_notification(db, schemas.NotificationCreate(
+        notification = await db.run_sync(notifications.create_notification, schemas.NotificationCreate(
             user_id=int(instance.user_id),
             type="SYSTEM",
             title="Task In Review",
             message=f"Your photo for '{task_name}' is pending admin review."
         ))
         # Send notifications to Admins
-        admins = notifications.get_notifiable_admins(db)
+        admins = await db.run_sync(notifications.get_notifiable_admins)
         for admin in admins:
             send_push_to_user_background(
                 background_tasks,
@@ -185,31 +249,113 @@ async def complete_task(
                 )
 
     # Broadcast SSE event for real-time updates
-    await broadcaster.broadcast("task_completed", {"instance_id": instance_id, "user_id": instance.user_id})
-    # Broadcast notification event so frontend refreshes list
-    await broadcaster.broadcast("notification", {"user_id": instance.user_id})
+    completed_topics = [FAMILY_FEED, user_topic(instance.user_id)]
+    if instance.status == "IN_REVIEW":
+        completed_topics.append(REVIEW_QUEUE)
+    await broadcaster.broadcast(
+        "task_completed", await _instance_delta(db, instance_id), topics=completed_topics)
+    # Notification feed update for the assignee only
+    await broadcaster.broadcast(
+        "notification", _notification_delta(instance.user_id, notification), topics=[user_topic(instance.user_id)])
 
     return instance
 
 
+@router.post("/tasks/complete-batch",
+             response_model=List[schemas.TaskInstance])
+async def complete_tasks_batch(
+    request: schemas.TaskBatchCompleteRequest,
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Complete several task instances in one transaction.
+
+    Same rules as ``POST /tasks/{instance_id}/complete``; if any instance cannot
+    be completed nothing is. Each assignee gets one notification, and the family
+    feed one ``tasks_completed`` event carrying every changed instance and balance.
+    Returns the requested instances in order.
+    """
+    user_is_admin = is_admin(current_user)
+    logger.info(f"Attempting to complete {len(request.instance_ids)} task instances by user {current_user.id}")
+
+    result = await db.run_sync(
+        tasks_service.complete_task_instances, request.instance_ids, actual_user_id=int(current_user.id),
+        skip_ownership_check=user_is_admin)
+    instances = await _load_instances(db, result.instance_ids)
+    changed = [instance for instance in instances
+               if instance.id in result.completed or instance.id in result.in_review]
+    logger.info(f"Batch completion: {len(result.completed)} completed, {len(result.in_review)} sent to review")
+
+    if result.in_review:
+        task_names = ", ".join(sorted({instance.task.name for instance in changed if instance.id in result.in_review}))
+        admins = await db.run_sync(notifications.get_notifiable_admins)
+        for admin in admins:
+            send_push_to_user_background(
+                background_tasks,
+                int(admin.id),
+                "Approval Required",
+                f"{len(result.in_review)} photo(s) require your approval: {task_names}."
+            )
+            if admin.email:
+                send_email_background(
+                    background_tasks,
+                    to_email=str(admin.email),
+                    subject="Approval Required",
+                    body=(
+                        f"Hi {admin.nickname},\n\n"
+                        f"Photos for the following tasks require your approval: {task_names}.\n"
+                        "Please review them at the God Mode Family Dashboard."
+                    )
+                )
+
+    if changed:
+        # One event for the whole batch instead of one per instance
+        users = {int(instance.user_id): instance.user for instance in changed}
+        topics = [FAMILY_FEED, *(user_topic(user_id) for user_id in users)]
+        if result.in_review:
+            topics.append(REVIEW_QUEUE)
+        completed = {
+            "instance_ids": [instance.id for instance in changed],
+            "balances": [schemas.UserBalance.model_validate(user).model_dump(mode="json")
+                         for user in users.values()],
+        }
+        instances_json = [schemas.TaskInstance.model_validate(instance).model_dump(mode="json")
+                          for instance in changed]
+        # A large batch would exceed the NOTIFY limit; without the instances clients refetch
+        if within_delta_budget({**completed, "instances": instances_json}):
+            completed["instances"] = instances_json
+        await broadcaster.broadcast("tasks_completed", completed, topics=topics)
+    for notification in result.notifications:
+        await broadcaster.broadcast(
+            "notification", _notification_delta(int(notification.user_id), notification),
+            topics=[user_topic(int(notification.user_id))])
+
+    return instances
+
+
 @router.post("/tasks/{instance_id}/upload-photo",
-             response_model=schemas.TaskInstance)
+             response_model=schemas.TaskInstance,
+             responses={202: {"model": schemas.PhotoJob, "description": "Accepted for background processing"}})
 async def upload_task_photo(
     instance_id: int,
     file: UploadFile = File(...),
+    background: bool = Query(False, description="Return 202 with a photo job instead of waiting for the transcode"),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Upload a photo for task verification using multipart/form-data.
 
-    Accepts any image format supported by Pillow. The file is streamed into memory
-    then compressed to WebP (max 1280×1280 px, quality=82) in a threadpool before
-    being written to disk. This avoids serving raw 10 MB uploads.
-    """
-    MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
+    Accepts any image format supported by Pillow. The already spooled upload is
+    transcoded in the photo process pool into WebP variants (display: max 1280×1280 px,
+    quality=82; thumb: 320 px) before being written to disk. This avoids serving raw
+    10 MB uploads; ``GET /uploads/{filename}?size=thumb`` serves the thumbnail.
 
-    instance = db.query(models.TaskInstance).filter(
-        models.TaskInstance.id == instance_id).first()
+    With ``background=true`` the upload is only staged and the response is ``202``
+    with a photo job; ``completion_photo_url`` is set later and announced with a
+    ``photo_ready`` event (see ``GET /tasks/photo-jobs/{job_id}``).
+    """
+    instance = await _load_instance(db, instance_id)
     if not instance:
         raise HTTPException(status_code=404, detail="Task instance not found")
 
@@ -219,43 +365,61 @@ async def upload_task_photo(
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
-    # Phase 1: Stream upload into an in-memory buffer (async — no disk I/O here)
-    buf = io.BytesIO()
-    total_size = 0
-    while content := await file.read(1024 * 1024):  # 1 MB chunks
-        total_size += len(content)
-        if total_size > MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large. Maximum upload size is {MAX_UPLOAD_SIZE // (1024 * 1024)} MB."
-            )
-        buf.write(content)
-    buf.seek(0)
+    # Phase 1: The multipart parser already spooled the upload; check its length without reading it
+    total_size = file.size if file.size is not None else photos.file_size(file.file)
+    if total_size > photos.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum upload size is {photos.MAX_UPLOAD_SIZE // (1024 * 1024)} MB."
+        )
 
-    # Phase 2: Compress and save to disk via Pillow in a threadpool (non-blocking)
-    # Output is always .webp regardless of input format.
-    unique_filename = f"{uuid.uuid4().hex}.webp"
-    uploads_dir = Path(__file__).resolve().parent.parent.parent / "uploads"
-    uploads_dir.mkdir(parents=True, exist_ok=True)
-    file_path = str(uploads_dir / unique_filename)
+    if background:
+        # Phase 2 (background): stage the raw upload and let the photo job queue transcode it
+        photo_jobs.photo_job_queue.check_capacity()
+        staged = await asyncio.to_thread(photos.stage_upload, file.file)
+        job = await db.run_sync(photo_jobs.create_job, instance_id, int(current_user.id), staged)
+        photo_jobs.photo_job_queue.submit(str(job.id))
+        return JSONResponse(
+            status_code=202,
+            content=schemas.PhotoJob.model_validate(job).model_dump(mode="json"),
+            headers={"Location": f"/tasks/photo-jobs/{job.id}"},
+        )
 
+    # Phase 2: Transcode into WebP variants in the photo process pool (non-blocking)
+    # Output is always .webp regardless of input format.
+    # Files are named by content hash, so identical photos share one set of files.
+    photos.UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
     try:
-        await run_in_threadpool(_compress_and_save, buf, file_path)
+        variants = await photos.photo_transcoder.transcode_upload(file.file, photos.UPLOADS_DIR)
     except UnidentifiedImageError:
-        if os.path.exists(file_path):
-            os.remove(file_path)
         raise HTTPException(
             status_code=400,
             detail="Cannot process image. Format may be unsupported (e.g. HEIC without plugin)."
         )
 
-    instance.completion_photo_url = f"/uploads/{unique_filename}"
-    db.commit()
-    db.refresh(instance)
+    instance.completion_photo_url = f"/uploads/{variants['display']}"
+    # An older background upload finishing later must not replace this photo
+    await db.run_sync(photo_jobs.supersede_jobs, instance_id)
+    await db.commit()
 
     return instance
 
 
+@router.get("/tasks/photo-jobs/{job_id}", response_model=schemas.PhotoJob)
+async def get_photo_job(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """State of a photo upload accepted with ``background=true``."""
+    job = await db.run_sync(photo_jobs.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Photo job not found")
+    if not is_admin(current_user) and int(job.user_id) != int(current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized to view this photo job")
+    return job
+
+
 @router.get("/tasks/review-queue",
             response_model=List[schemas.TaskInstance],
             dependencies=[Depends(get_current_admin_user)])
@@ -271,35 +435,35 @@ async def review_task(
     instance_id: int,
     review: schemas.TaskReviewRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin endpoint to approve or reject a task."""
     logger.info(
         f"Reviewing task instance {instance_id}: approved={review.is_approved}")
 
     # Pre-fetch task name for notification messages
-    orm_instance = db.query(models.TaskInstance).filter(
-        models.TaskInstance.id == instance_id).first()
+    orm_instance = await _load_instance(db, instance_id)
     task_name = orm_instance.task.name if orm_instance and orm_instance.task else "Unknown"
 
-    instance = tasks_service.review_task_instance(
-        db, instance_id=instance_id, review=review)
+    outcome = await db.run_sync(tasks_service.review_task, instance_id=instance_id, review=review)
+    instance = outcome.instance
 
-    # Real-time update
+    # Real-time update; a rejection carries the notice the service filed for the assignee
     await broadcaster.broadcast("task_reviewed", {
-        "instance_id": instance_id,
-        "user_id": instance.user_id,
+        **await _instance_delta(db, instance_id),
         "is_approved": review.is_approved
-    })
-    await broadcaster.broadcast("notification", {"user_id": instance.user_id})
+    }, topics=[FAMILY_FEED, REVIEW_QUEUE, user_topic(instance.user_id)])
+    await broadcaster.broadcast(
+        "notification", _notification_delta(instance.user_id, outcome.notification),
+        topics=[user_topic(instance.user_id)])
 
     # Send push notification for review outcome
-    outcome = "approved" if review.is_approved else "rejected"
+    verdict = "approved" if review.is_approved else "rejected"
     send_push_to_user_background(
         background_tasks,
         int(instance.user_id),
-        f"Task {outcome.title()}",
-        f"Your task '{task_name}' was {outcome}."
+        f"Task {verdict.title()}",
+        f"Your task '{task_name}' was {verdict}."
     )
 
     return instance
@@ -1,42 +1,61 @@
 import datetime
-from typing import List, Optional
+from typing import List, Optional, cast
 import logging
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import schemas, crud, models
 from ..database import get_db
 from ..dependencies import get_current_user, get_current_admin_user, require_self_or_admin
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Transactions"])
 
+_CURSOR_DESCRIPTION = (
+    f"Opaque cursor from the previous page's {NEXT_CURSOR_HEADER} header. "
+    "When given, `skip` is ignored."
+)
+
+
+def _set_next_cursor(response: Response, page: List[models.Transaction], limit: int) -> None:
+    """Advertise the key after the last row when the page is full (more rows may follow)."""
+    if page and len(page) == limit:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(cast(datetime.datetime, last.timestamp), int(last.id))
+
 
 @router.get("/users/{user_id}/transactions",
             response_model=List[schemas.Transaction])
 def read_user_transactions(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     txn_type: Optional[str] = None,
     search: Optional[str] = Query(default=None, max_length=200),
     start_date: Optional[datetime.datetime] = None,
     end_date: Optional[datetime.datetime] = None,
+    cursor: Optional[str] = Query(default=None, max_length=200, description=_CURSOR_DESCRIPTION),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get history for a specific user."""
+    """Get history for a specific user, newest first."""
     require_self_or_admin(current_user, user_id)
-    return crud.get_user_transactions(
+    page = crud.get_user_transactions(
         db, user_id=user_id, skip=skip, limit=limit,
-        txn_type=txn_type, search=search, start_date=start_date, end_date=end_date
+        txn_type=txn_type, search=search, start_date=start_date, end_date=end_date,
+        cursor=cursor,
     )
+    _set_next_cursor(response, page, limit)
+    return page
 
 
 @router.get("/transactions", response_model=List[schemas.Transaction], dependencies=[Depends(get_current_admin_user)])
 def read_all_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     user_id: Optional[int] = None,
@@ -44,10 +63,14 @@ def read_all_transactions(
     search: Optional[str] = Query(default=None, max_length=200),
     start_date: Optional[datetime.datetime] = None,
     end_date: Optional[datetime.datetime] = None,
+    cursor: Optional[str] = Query(default=None, max_length=200, description=_CURSOR_DESCRIPTION),
     db: Session = Depends(get_db)
 ):
-    """Get global history (for Admin/Family Dashboard)."""
-    return crud.get_all_transactions(
+    """Get global history (for Admin/Family Dashboard), newest first."""
+    page = crud.get_all_transactions(
         db, skip=skip, limit=limit,
-        user_id=user_id, txn_type=txn_type, search=search, start_date=start_date, end_date=end_date
+        user_id=user_id, txn_type=txn_type, search=search, start_date=start_date, end_date=end_date,
+        cursor=cursor,
     )
+    _set_next_cursor(response, page, limit)
+    return page
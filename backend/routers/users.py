@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 import logging
 
 from .. import schemas, crud, models
 from ..services import users as users_service, notifications
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..dependencies import get_current_user, get_current_admin_user, is_admin, require_self_or_admin
-from ..events import broadcaster
+from ..events import ADMIN, broadcaster, user_topic
 from ..notifications_service import send_push_to_user_background
 
 logger = logging.getLogger(__name__)
@@ -79,15 +80,15 @@ async def penalize_user(
     user_id: int,
     penalty: schemas.PenaltyRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin endpoint to deduct points from a user."""
     logger.info(
         f"Penalizing user {user_id} for {penalty.points} points: {penalty.reason}")
-    result = users_service.apply_penalty(db, user_id=user_id, penalty=penalty)
+    result = await db.run_sync(users_service.apply_penalty, user_id=user_id, penalty=penalty)
 
     # Notify User in-app
-    notifications.create_notification(db, schemas.NotificationCreate(
+    await db.run_sync(notifications.create_notification, schemas.NotificationCreate(
         user_id=user_id,
         type="SYSTEM",
         title="Points Deducted",
@@ -108,7 +109,7 @@ async def penalize_user(
         "points_deducted": result.points_deducted,
         "remaining_points": result.remaining_points,
         "reason": penalty.reason
-    })
-    await broadcaster.broadcast("notification", {"user_id": user_id})
+    }, topics=[ADMIN, user_topic(user_id)])
+    await broadcaster.broadcast("notification", {"user_id": user_id}, topics=[user_topic(user_id)])
 
     return result
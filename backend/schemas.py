@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Generic, List, Optional, TypeVar
 from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator, ConfigDict
 from datetime import datetime, date
 
@@ -107,6 +107,16 @@ class User(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserBalance(BaseModel):
+    """Point totals pushed with task events so dashboards update balances in place."""
+    id: int
+    current_points: int
+    lifetime_points: int
+    current_streak: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -240,6 +250,7 @@ class TaskInstance(TaskInstanceBase):
     id: int
     completed_at: Optional[datetime] = None
     completion_photo_url: Optional[str] = None
+    version: int = 1  # Row version; higher wins when applying SSE deltas
     task: Optional[Task] = None  # Include task details for Family Dashboard
     user: Optional[User] = None  # Include user details
 
@@ -250,6 +261,24 @@ class TaskReviewRequest(BaseModel):
     is_approved: bool
     reject_reason: Optional[str] = None
 
+
+class TaskBatchCompleteRequest(BaseModel):
+    instance_ids: List[int] = Field(..., min_length=1, max_length=100,
+                                    description="Instances to complete in one transaction")
+
+
+class PhotoJob(BaseModel):
+    """A photo upload accepted with 202 and transcoded in the background."""
+    id: str
+    instance_id: int
+    status: str  # pending, processing, done, failed
+    photo_url: Optional[str] = None  # Set once done; also sent as the photo_ready event
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
 # --- Reward Schemas ---
 
 
@@ -608,3 +637,28 @@ class HeatmapDayDetails(BaseModel):
     nickname: str
     date: str
     tasks: List[HeatmapTaskDetail]
+
+
+# --- Sync (change feed) Schemas ---
+
+EntityT = TypeVar("EntityT")
+
+
+class EntityChanges(BaseModel, Generic[EntityT]):
+    """Rows of one entity type inserted/updated (current state) or deleted (ids) since a version."""
+    upserted: List[EntityT] = []
+    deleted: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    """Changes since the requested version; pass ``version`` as ``since`` on the next call."""
+    version: int
+    # True when this is a full snapshot: replace the local replica instead of patching it
+    reset: bool = False
+    # More changes are waiting; call again with ``since=version``
+    has_more: bool = False
+    tasks: EntityChanges[Task] = EntityChanges[Task]()
+    task_instances: EntityChanges[TaskInstance] = EntityChanges[TaskInstance]()
+    users: EntityChanges[User] = EntityChanges[User]()
+    rewards: EntityChanges[Reward] = EntityChanges[Reward]()
+    notifications: EntityChanges[Notification] = EntityChanges[Notification]()
@@ -1,15 +1,14 @@
 import os
 import secrets
 from pathlib import Path
-from passlib.context import CryptContext
 from typing import cast, Optional, Dict, Any
 import jwt
 import logging
 from datetime import datetime, timedelta, timezone
 
-logger = logging.getLogger(__name__)
+from .password_hasher import password_hasher, pwd_context  # noqa: F401
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
 
 _BACKEND_DIR = Path(__file__).resolve().parent
 _ENV_PATH = _BACKEND_DIR / ".env"
@@ -48,13 +47,13 @@ ACCESS_TOKEN_EXPIRE_DAYS = 7
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password/PIN using bcrypt."""
-    return cast(str, pwd_context.hash(password))
+    """Hash a password/PIN using bcrypt (in the hashing process pool)."""
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plaintext password/PIN against its hashed version."""
-    return cast(bool, pwd_context.verify(plain_password, hashed_password))
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,173 @@
+"""
+Incrementally maintained per-user, per-day activity rollup.
+
+``daily_user_activity`` holds one row per (user, day) with completion counts
+and point movements, so the analytics dashboards read ``days x users`` rows
+instead of rescanning ``task_instances``. Rows are bumped by the services
+that produce the activity, inside the caller's transaction:
+
+- ``gamification.award_points_for_task`` -> ``completed_count``
+- ``crud.delete_task`` -> ``completed_count`` of its deleted instances
+- ``transaction_service.record_earn`` / ``record_redeem`` / ``record_penalty``
+  -> ``points_earned`` / ``redeemed_points`` / ``penalty_points``
+
+``rebuild_daily_activity`` recomputes the table from history (run
+``python -m backend.rebuild_activity`` after bulk imports or manual fixes).
+
+Design contract:
+- ``record_activity`` does **NOT** commit — the caller owns the transaction.
+- ``rebuild_daily_activity`` owns its transaction and commits.
+"""
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Union
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("completed_count", "points_earned", "penalty_points", "redeemed_points")
+
+
+def activity_day(timestamp: datetime) -> date:
+    """Day bucket for an activity timestamp (matches ``date(completed_at)``)."""
+    return timestamp.date()
+
+
+def record_activity(
+    db: Session,
+    user_id: int,
+    day: date,
+    completed_count: int = 0,
+    points_earned: int = 0,
+    penalty_points: int = 0,
+    redeemed_points: int = 0,
+) -> None:
+    """
+    Add the given deltas to the user's row for ``day``, creating it if needed.
+
+    Uses an atomic upsert on SQLite/Postgres so concurrent completions for
+    the same user and day never lose increments.
+    Does **not** commit — caller must commit.
+    """
+    deltas = {
+        "completed_count": completed_count,
+        "points_earned": points_earned,
+        "penalty_points": penalty_points,
+        "redeemed_points": redeemed_points,
+    }
+    if not any(deltas.values()):
+        return
+
+    table = models.DailyUserActivity.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        ins = sqlite_insert(table) if dialect == "sqlite" else pg_insert(table)
+        ins = ins.values(user_id=user_id, local_date=day, **deltas)
+        db.execute(ins.on_conflict_do_update(
+            index_elements=["user_id", "local_date"],
+            set_={name: table.c[name] + ins.excluded[name] for name in COUNTERS},
+        ))
+        return
+
+    result = db.execute(update(table).where(
+        table.c.user_id == user_id, table.c.local_date == day,
+    ).values({name: table.c[name] + delta for name, delta in deltas.items()}))
+    if not getattr(result, "rowcount", 0):
+        db.execute(insert(table).values(user_id=user_id, local_date=day, **deltas))
+
+
+def _as_date(value: Union[date, str]) -> date:
+    # SQLite's date() returns text, Postgres returns a date
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def rebuild_daily_activity(db: Session) -> int:
+    """
+    Recompute the whole rollup from ``task_instances`` and ``transactions``.
+
+    Returns the number of rollup rows written. Commits.
+    """
+    rows: Dict[tuple, Dict[str, int]] = {}
+
+    def _row(user_id: int, day: Union[date, str]) -> Dict[str, int]:
+        key = (int(user_id), _as_date(day))
+        return rows.setdefault(key, {name: 0 for name in COUNTERS})
+
+    ti = models.TaskInstance
+    completed_day = func.date(ti.completed_at)
+    for r in db.query(
+        ti.user_id, completed_day.label("day"), func.count(ti.id).label("cnt")
+    ).filter(
+        ti.status == "COMPLETED", ti.completed_at.isnot(None)
+    ).group_by(ti.user_id, completed_day).all():
+        _row(r.user_id, r.day)["completed_count"] += int(r.cnt)
+
+    txn = models.Transaction
+    txn_day = func.date(txn.timestamp)
+
+    def _sum_of(txn_type: str):
+        return func.sum(case((txn.type == txn_type, txn.awarded_points), else_=0))
+
+    for r in db.query(
+        txn.user_id, txn_day.label("day"),
+        _sum_of("EARN").label("earned"),
+        _sum_of("PENALTY").label("penalty"),
+        _sum_of("REDEEM").label("redeemed"),
+    ).group_by(txn.user_id, txn_day).all():
+        row = _row(r.user_id, r.day)
+        row["points_earned"] += int(r.earned or 0)
+        row["penalty_points"] += -int(r.penalty or 0)
+        row["redeemed_points"] += -int(r.redeemed or 0)
+
+    values: List[dict] = [
+        {"user_id": user_id, "local_date": day, **counters}
+        for (user_id, day), counters in rows.items()
+    ]
+
+    db.query(models.DailyUserActivity).delete(synchronize_session=False)
+    if values:
+        db.execute(insert(models.DailyUserActivity.__table__), values)
+    db.commit()
+    logger.info(f"Daily activity rollup rebuilt: {len(values)} rows")
+    return len(values)
+
+
+def forget_completed_instances(db: Session, instance_ids: List[int]) -> int:
+    """
+    Subtract completed instances that are about to be deleted (task
+    deletion) from their users' ``completed_count``, so the rollup keeps
+    agreeing with ``task_instances``. Points stay: the transactions remain.
+
+    Call before deleting the rows. Returns the number of instances removed.
+    Does **not** commit — caller must commit.
+    """
+    if not instance_ids:
+        return 0
+    counts: Dict[tuple, int] = {}
+    ti = models.TaskInstance.__table__
+    for user_id, completed_at in db.execute(select(ti.c.user_id, ti.c.completed_at).where(
+        ti.c.id.in_(instance_ids), ti.c.status == "COMPLETED", ti.c.completed_at.isnot(None)
+    )):
+        key = (int(user_id), activity_day(completed_at))
+        counts[key] = counts.get(key, 0) + 1
+    for (user_id, day), count in counts.items():
+        record_activity(db, user_id, day, completed_count=-count)
+    return sum(counts.values())
+
+
+def delete_user_activity(db: Session, user_id: int) -> int:
+    """
+    Delete a user's rollup rows. Used during cascading user deletion.
+
+    Does **not** commit — caller must commit.
+    """
+    count = db.query(models.DailyUserActivity).filter(
+        models.DailyUserActivity.user_id == user_id
+    ).delete()
+    return int(count)
@@ -0,0 +1,211 @@
+"""
+Versioned change feed for client replicas (``GET /sync``).
+
+Every committed change to a synced entity appends a ``change_log`` row whose
+autoincrement ``version`` orders the feed. Clients keep a local replica and
+ask for everything after the last version they applied; unchanged rows are
+never re-sent.
+
+Recording happens in two places:
+
+- ORM writes (``db.add``, attribute changes, ``db.delete``) are captured by
+  an ``after_flush`` listener on every ``Session``, inside the writer's
+  transaction, so services need no extra calls.
+- Bulk statements that bypass the unit of work (``query.update/delete``,
+  the scheduler's conflict-ignoring INSERT) call ``record_changes`` with
+  the affected ids.
+
+Entries older than ``CHANGE_LOG_RETENTION_DAYS`` are pruned; a client whose
+``since`` predates the pruned range gets a full snapshot (``reset``).
+
+Design contract:
+- ``record_changes`` does **NOT** commit — the caller owns the transaction.
+- ``prune_change_log`` owns its transaction and commits.
+- Versions are commit-ordered on SQLite (single writer). On Postgres a
+  sequence value can become visible out of order under concurrent writers;
+  clients should treat ``/sync`` as a cheap poll, not an exactly-once feed.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, insert, or_
+from sqlalchemy.orm import Session, joinedload
+
+from .. import models, schemas
+
+logger = logging.getLogger(__name__)
+
+FLOOR_SETTING_KEY = "change_log_floor"
+NOTIFICATION_SNAPSHOT_LIMIT = 50
+
+# Synced entity name -> model. Names match the ``SyncResponse`` fields.
+ENTITIES = {
+    "tasks": models.Task,
+    "task_instances": models.TaskInstance,
+    "users": models.User,
+    "rewards": models.Reward,
+    "notifications": models.Notification,
+}
+_ENTITY_NAMES = {model: name for name, model in ENTITIES.items()}
+
+_SCHEMAS = {
+    "tasks": schemas.Task,
+    "task_instances": schemas.TaskInstance,
+    "users": schemas.User,
+    "rewards": schemas.Reward,
+    "notifications": schemas.Notification,
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _entry(entity: str, entity_id: int, deleted: bool, user_id: Optional[int], now: datetime) -> dict:
+    return {"entity": entity, "entity_id": entity_id, "deleted": deleted, "user_id": user_id, "changed_at": now}
+
+
+def record_changes(
+    db: Session, entity: str, ids: Iterable[int], deleted: bool = False, user_id: Optional[int] = None
+) -> None:
+    """
+    Log rows changed by a bulk statement the flush listener cannot see.
+    ``user_id`` scopes per-user entities (notifications) to their owner.
+    Does **not** commit — caller must commit.
+    """
+    now = _utcnow()
+    rows = [_entry(entity, int(entity_id), deleted, user_id, now) for entity_id in ids]
+    if rows:
+        db.execute(insert(models.ChangeLogEntry.__table__), rows)
+
+
+def _owner(obj) -> Optional[int]:
+    return int(obj.user_id) if isinstance(obj, models.Notification) else None
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session: Session, flush_context) -> None:
+    """Append a change-log row for every synced object the flush wrote."""
+    now = _utcnow()
+    rows: List[dict] = []
+    for objects, deleted in ((session.new, False), (session.dirty, False), (session.deleted, True)):
+        for obj in objects:
+            entity = _ENTITY_NAMES.get(type(obj))
+            if entity is None:
+                continue
+            if objects is session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            rows.append(_entry(entity, int(obj.id), deleted, _owner(obj), now))
+    if rows:
+        # Same connection and transaction as the flush: the log commits or rolls back with it
+        session.connection().execute(insert(models.ChangeLogEntry.__table__), rows)
+
+
+def current_version(db: Session) -> int:
+    latest = db.query(func.max(models.ChangeLogEntry.version)).scalar()
+    # Everything may have been pruned; the floor is then the latest version
+    return int(latest) if latest is not None else _floor(db)
+
+
+def _floor(db: Session) -> int:
+    """Highest pruned version; feeds starting below it are incomplete."""
+    setting = db.query(models.SystemSettings).filter(models.SystemSettings.key == FLOOR_SETTING_KEY).first()
+    return int(setting.value) if setting else 0
+
+
+def _query(db: Session, entity: str):
+    query = db.query(ENTITIES[entity])
+    if entity == "task_instances":
+        query = query.options(
+            joinedload(models.TaskInstance.task),
+            joinedload(models.TaskInstance.user).joinedload(models.User.role),
+        )
+    elif entity == "users":
+        query = query.options(joinedload(models.User.role))
+    return query
+
+
+def _snapshot(db: Session, user_id: int, version: int) -> schemas.SyncResponse:
+    """Current state of everything a client replicates."""
+    start_of_day = _utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    instances = models.TaskInstance.__table__
+    rows = {
+        "tasks": _query(db, "tasks").all(),
+        # The dashboards show today's and upcoming instances plus the review queue
+        "task_instances": _query(db, "task_instances").filter(
+            or_(instances.c.due_time >= start_of_day, instances.c.status == "IN_REVIEW")).all(),
+        "users": _query(db, "users").all(),
+        "rewards": _query(db, "rewards").all(),
+        "notifications": _query(db, "notifications").filter(
+            models.Notification.user_id == user_id
+        ).order_by(models.Notification.created_at.desc()).limit(NOTIFICATION_SNAPSHOT_LIMIT).all(),
+    }
+    response = schemas.SyncResponse(version=version, reset=True)
+    for entity, entity_rows in rows.items():
+        changes = getattr(response, entity)
+        changes.upserted = [_SCHEMAS[entity].model_validate(row) for row in entity_rows]
+    return response
+
+
+def get_changes(db: Session, user_id: int, since: int, limit: int = 500) -> schemas.SyncResponse:
+    """
+    Everything that changed after version ``since``, as seen by ``user_id``.
+
+    Repeated changes to one row collapse to its current state (or a single
+    delete). ``since=0``, a version older than the pruned range, or one
+    from the future yields a full snapshot with ``reset=True``.
+    """
+    version = current_version(db)
+    if since <= 0 or since < _floor(db) or since > version:
+        return _snapshot(db, user_id, version)
+
+    entry, log = models.ChangeLogEntry, models.ChangeLogEntry.__table__
+    entries = db.query(entry).filter(
+        log.c.version > since,
+        log.c.version <= version,
+        or_(entry.user_id.is_(None), entry.user_id == user_id),
+    ).order_by(entry.version).limit(limit).all()
+
+    has_more = len(entries) == limit
+    response = schemas.SyncResponse(version=entries[-1].version if has_more else version, has_more=has_more)
+
+    latest: Dict[Tuple[str, int], bool] = {}
+    for change in entries:
+        latest[(change.entity, change.entity_id)] = change.deleted
+
+    for entity in ENTITIES:
+        changes = getattr(response, entity)
+        changed_ids = [entity_id for (name, entity_id), deleted in latest.items() if name == entity and not deleted]
+        found = _query(db, entity).filter(ENTITIES[entity].id.in_(changed_ids)).all() if changed_ids else []
+        changes.upserted = [_SCHEMAS[entity].model_validate(row) for row in found]
+        # Rows deleted by a later change past this page read as deletions now
+        found_ids = {row.id for row in found}
+        changes.deleted = sorted(
+            [entity_id for (name, entity_id), deleted in latest.items() if name == entity and deleted]
+            + [entity_id for entity_id in changed_ids if entity_id not in found_ids])
+    return response
+
+
+def prune_change_log(db: Session, retention_days: int, now: Optional[datetime] = None) -> int:
+    """
+    Delete entries older than ``retention_days`` and raise the floor so
+    clients behind it resync from a snapshot. Returns the number deleted.
+    """
+    cutoff = (now or _utcnow()) - timedelta(days=retention_days)
+    entry, log = models.ChangeLogEntry, models.ChangeLogEntry.__table__
+    pruned_up_to = db.query(func.max(entry.version)).filter(log.c.changed_at < cutoff).scalar()
+    if pruned_up_to is None:
+        return 0
+
+    deleted = db.query(entry).filter(entry.version <= pruned_up_to).delete(synchronize_session=False)
+    setting = db.query(models.SystemSettings).filter(models.SystemSettings.key == FLOOR_SETTING_KEY).first()
+    if setting is None:
+        db.add(models.SystemSettings(
+            key=FLOOR_SETTING_KEY, value=str(pruned_up_to),
+            description="Oldest change-log version still available to /sync"))
+    else:
+        setting.value = str(pruned_up_to)
+    db.commit()
+    logger.info(f"Change log: pruned {deleted} entries up to version {pruned_up_to}")
+    return int(deleted)
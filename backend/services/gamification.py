@@ -4,7 +4,7 @@ Gamification orchestrator — thin composition layer.
 Delegates calculation to ``points_policy`` and streak management to
 ``streak_tracker``.  This module's only remaining responsibility is
 **persistence**: creating the Transaction, updating the instance, and
-committing.
+committing (``apply_task_completion`` leaves the commit to batch callers).
 
 AR2.1 / AR2.2 refactor: the hardcoded math and streak state-machine have
 been extracted so that new gamification rules can be added without
@@ -16,6 +16,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
+from .activity_rollup import activity_day, record_activity
 from .points_policy import calculate_points
 from .streak_tracker import update_user_streak
 from .transaction_service import record_earn
@@ -36,7 +37,21 @@ def award_points_for_task(
 
     And then handles only persistence concerns (Transaction, User points, commit).
     """
-    now_dt = current_time or datetime.now(timezone.utc)
+    apply_task_completion(db, instance, current_time or datetime.now(timezone.utc))
+    db.commit()
+    db.refresh(instance)
+    return schemas.TaskInstance.model_validate(instance)
+
+
+def apply_task_completion(db: Session, instance: models.TaskInstance, now_dt: datetime) -> int:
+    """
+    Complete ``instance`` and award its points. Returns the points awarded.
+
+    The streak and first-task-of-the-day bonus read the in-session user row,
+    so several completions for one user in the same transaction (batch
+    completion) advance the streak once per day and get the bonus once.
+    Does **not** commit — caller must commit.
+    """
     task = instance.task
     user = instance.user
     role = user.role
@@ -71,6 +86,8 @@ def award_points_for_task(
         timestamp=now_dt,
     )
 
+    record_activity(db, int(user.id), activity_day(now_dt), completed_count=1)
+
     # Update user totals
     user.current_points += breakdown.total_awarded
     user.lifetime_points += breakdown.total_awarded
@@ -86,7 +103,6 @@ def award_points_for_task(
         for other in other_instances:
             other.status = "COMPLETED"
             other.completed_at = now_dt
+            record_activity(db, int(other.user_id), activity_day(now_dt), completed_count=1)
 
-    db.commit()
-    db.refresh(instance)
-    return schemas.TaskInstance.model_validate(instance)
+    return int(breakdown.total_awarded)
@@ -0,0 +1,182 @@
+"""
+Database-backed leader election for in-process background jobs.
+
+Every uvicorn worker starts its own ``BackgroundScheduler``. To keep cron
+jobs (daily reset, reminders, backups) from running once per worker, the
+workers compete for a named row in ``scheduler_leases``. The holder renews
+the lease with a heartbeat; when it stops renewing, the lease expires and
+the next worker to heartbeat takes over.
+
+Acquisition is a single conditional UPDATE (renew or steal an expired
+lease) followed, if no row exists yet, by an INSERT guarded by the primary
+key. Both are atomic on SQLite and Postgres, so no advisory locks or
+dialect-specific SQL are needed.
+
+Design contract:
+- ``try_acquire_lease`` / ``release_lease`` own their transaction and commit.
+- Timestamps are stored as naive UTC so comparisons are dialect-neutral.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, cast
+
+from sqlalchemy import case, insert, or_, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_NAME = "scheduler"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def make_owner_id() -> str:
+    """Unique identity for this process: host, pid and a random nonce."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def try_acquire_lease(
+    db: Session, name: str, owner_id: str, ttl_seconds: int, now: Optional[datetime] = None
+) -> bool:
+    """
+    Acquire or renew the named lease for ``owner_id``.
+
+    Succeeds when the caller already holds the lease, the lease has expired,
+    or no lease row exists yet. Returns True if ``owner_id`` holds the lease
+    afterwards.
+    """
+    now_dt = now or _utcnow()
+    expires_at = now_dt + timedelta(seconds=ttl_seconds)
+    lease = models.SchedulerLease.__table__
+
+    updated = cast(CursorResult, db.execute(
+        update(lease)
+        .where(lease.c.name == name, or_(lease.c.owner_id == owner_id, lease.c.expires_at < now_dt))
+        .values(
+            acquired_at=case((lease.c.owner_id == owner_id, lease.c.acquired_at), else_=now_dt),
+            owner_id=owner_id,
+            heartbeat_at=now_dt,
+            expires_at=expires_at,
+        )
+    )).rowcount
+
+    if updated:
+        db.commit()
+        return True
+
+    # No renewable row: either nobody has ever held it, or someone else holds it.
+    try:
+        db.execute(insert(models.SchedulerLease.__table__).values(
+            name=name,
+            owner_id=owner_id,
+            acquired_at=now_dt,
+            heartbeat_at=now_dt,
+            expires_at=expires_at,
+        ))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def release_lease(db: Session, name: str, owner_id: str) -> bool:
+    """Give up the lease if ``owner_id`` holds it so another worker can take over immediately."""
+    deleted = db.query(models.SchedulerLease).filter(
+        models.SchedulerLease.name == name,
+        models.SchedulerLease.owner_id == owner_id,
+    ).delete(synchronize_session=False)
+    db.commit()
+    return bool(deleted)
+
+
+def get_lease(db: Session, name: str = DEFAULT_LEASE_NAME) -> Optional[models.SchedulerLease]:
+    return db.query(models.SchedulerLease).filter(
+        models.SchedulerLease.name == name).first()
+
+
+class LeaderElector:
+    """
+    Tracks whether this process currently owns the scheduler lease.
+
+    ``heartbeat`` is meant to run on an interval (well inside the TTL) in
+    every worker; ``guard`` wraps a cron job so it only runs on the leader.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: int = 60,
+        name: str = DEFAULT_LEASE_NAME,
+        owner_id: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.owner_id = owner_id or make_owner_id()
+        self._is_leader = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    @property
+    def heartbeat_interval(self) -> int:
+        """Renew three times per TTL so one missed beat does not lose the lease."""
+        return max(1, self.ttl_seconds // 3)
+
+    def heartbeat(self) -> bool:
+        """Acquire or renew the lease. Returns True if this process is the leader."""
+        with self._lock:
+            db = self.session_factory()
+            try:
+                acquired = try_acquire_lease(db, self.name, self.owner_id, self.ttl_seconds)
+            except Exception as e:
+                logger.error(f"Leader election: heartbeat failed for {self.owner_id}: {e}")
+                acquired = False
+            finally:
+                db.close()
+
+            if acquired and not self._is_leader:
+                logger.info(f"Leader election: {self.owner_id} acquired lease '{self.name}'")
+            elif not acquired and self._is_leader:
+                logger.warning(f"Leader election: {self.owner_id} lost lease '{self.name}'")
+            self._is_leader = acquired
+            return acquired
+
+    def release(self) -> None:
+        """Release the lease on shutdown so a peer can take over without waiting for expiry."""
+        with self._lock:
+            if not self._is_leader:
+                return
+            db = self.session_factory()
+            try:
+                release_lease(db, self.name, self.owner_id)
+                logger.info(f"Leader election: {self.owner_id} released lease '{self.name}'")
+            except Exception as e:
+                logger.error(f"Leader election: failed to release lease: {e}")
+            finally:
+                db.close()
+            self._is_leader = False
+
+    def guard(self, job: Callable[[], None]) -> Callable[[], None]:
+        """Wrap a scheduled job so it renews the lease first and is skipped on followers."""
+        def _guarded() -> None:
+            if not self.heartbeat():
+                logger.info(f"Leader election: skipping {job.__name__} (not the leader)")
+                return
+            job()
+
+        _guarded.__name__ = job.__name__
+        return _guarded
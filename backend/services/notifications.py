@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from .. import models, schemas
+from .change_log import record_changes
 
 
 # --- Notification Service Helpers ---
@@ -75,10 +76,13 @@ def mark_notification_read(db: Session, notification_id: int, user_id: int) -> O
 
 def mark_all_notifications_read(db: Session, user_id: int) -> bool:
     # Update all unread notifications for this user
-    db.query(models.Notification).filter(
+    unread = db.query(models.Notification).filter(
         models.Notification.user_id == user_id,
         models.Notification.read.is_(False)
-    ).update({"read": True})
+    )
+    unread_ids = [row.id for row in unread.with_entities(models.Notification.id)]
+    unread.update({"read": True})
+    record_changes(db, "notifications", unread_ids, user_id=user_id)
     db.commit()
     return True
 
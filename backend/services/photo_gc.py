@@ -0,0 +1,92 @@
+"""
+Garbage collection of task photos no task instance references any more.
+
+Photos are content-addressed and shared, so nothing deletes them when a
+review rejects a photo, a new one replaces it, or its task or user is
+deleted. ``collect_orphan_photos`` (scheduled hourly) compares the files in
+``uploads/`` with ``task_instances.completion_photo_url`` and deletes the
+unreferenced ones together with their variants.
+
+- Work per run is bounded: at most ``batch_size`` files are deleted; the
+  next run continues with what is left.
+- Files younger than ``grace_seconds`` are kept: an upload writes its files
+  before the instance row referencing them commits (and a deduplicated
+  upload refreshes the existing file's mtime).
+- Stale staging copies and interrupted ``.tmp`` writes are removed too,
+  except uploads that a pending or processing photo job still has to read.
+
+Design contract:
+- Read-only on the database; never commits.
+"""
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from .photo_jobs import PENDING, PROCESSING
+from .photos import STAGING_DIR, UPLOADS_DIR, display_filename
+
+logger = logging.getLogger(__name__)
+
+
+def referenced_photos(db: Session) -> Set[str]:
+    """Display filenames referenced by any task instance."""
+    urls: Iterable[str] = db.scalars(select(models.TaskInstance.completion_photo_url).where(
+        models.TaskInstance.completion_photo_url.isnot(None)))
+    return {url.rsplit("/", 1)[-1] for url in urls}
+
+
+def staged_uploads(db: Session) -> Set[str]:
+    """Staging filenames that pending or processing photo jobs still have to read."""
+    job = models.PhotoJob
+    paths: Iterable[str] = db.scalars(select(job.staged_path).where(
+        job.status.in_((PENDING, PROCESSING)), job.staged_path.isnot(None)))
+    return {os.path.basename(path) for path in paths}
+
+
+def _upload_files(uploads_dir: Path) -> Iterator[Tuple[os.DirEntry, bool]]:
+    """(file, is_staged) for flat pre-hash uploads, the two-character shards and the staging area."""
+    with os.scandir(uploads_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and not entry.name.startswith("."):
+                yield entry, False
+            elif entry.is_dir() and len(entry.name) == 2 and not entry.name.startswith("."):
+                with os.scandir(entry.path) as shard:
+                    yield from ((file, False) for file in shard if file.is_file())
+    staging_dir = uploads_dir / STAGING_DIR.name
+    if staging_dir.is_dir():
+        with os.scandir(staging_dir) as staged:
+            yield from ((file, True) for file in staged if file.is_file())
+
+
+def collect_orphan_photos(db: Session, uploads_dir: Path = UPLOADS_DIR, batch_size: int = 500,
+                          grace_seconds: float = 86400, now: Optional[float] = None) -> int:
+    """Delete up to ``batch_size`` unreferenced photo files. Returns the number deleted."""
+    if not uploads_dir.is_dir():
+        return 0
+    cutoff = (now if now is not None else time.time()) - grace_seconds
+    referenced = referenced_photos(db)
+    queued = staged_uploads(db)
+    deleted = 0
+    for entry, is_staged in _upload_files(uploads_dir):
+        if deleted >= batch_size:
+            break
+        if not is_staged and display_filename(entry.name) in referenced:
+            continue
+        if is_staged and entry.name in queued:
+            continue
+        if entry.stat().st_mtime >= cutoff:
+            continue
+        try:
+            os.remove(entry.path)
+            deleted += 1
+        except FileNotFoundError:
+            pass
+    if deleted:
+        logger.info(f"Photo GC: deleted {deleted} unreferenced files")
+    return deleted
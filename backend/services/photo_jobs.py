@@ -0,0 +1,324 @@
+"""
+Background photo processing for uploads accepted with ``202 Accepted``.
+
+``POST /tasks/{id}/upload-photo?background=true`` only validates the upload,
+copies it to ``uploads/.staging`` and records a ``photo_jobs`` row, so the
+request ends as soon as the bytes have arrived. ``photo_job_queue`` then
+transcodes the staged file in ``photo_transcoder``, sets the instance's
+``completion_photo_url`` and broadcasts ``photo_ready`` (``photo_failed``
+when the image cannot be decoded). ``GET /tasks/photo-jobs/{id}`` reports
+a job's state to clients that are not listening for events.
+
+- Jobs live in the database: any worker can report on them, and jobs still
+  pending when a worker stops are picked up at the next startup.
+- Claiming a job is a conditional update (pending -> processing), so a job
+  runs once even when several workers recover it. Jobs left ``processing``
+  by a crashed worker become claimable again after ``stale_seconds``.
+- At most ``max_queued`` jobs wait per worker; further uploads get a 503.
+- A job only attaches its photo to a still pending instance, and only if
+  no newer upload (background or not) replaced it; otherwise it fails as
+  ``superseded``.
+- Finished jobs are pruned by the hourly photo GC.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, cast
+
+from PIL import UnidentifiedImageError
+from sqlalchemy import and_, delete, exists, or_, select, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session, joinedload
+
+from .. import models, schemas
+from ..config import settings
+from ..events import REVIEW_QUEUE, broadcaster, user_topic
+from ..exceptions import ServiceBusyError
+from .photos import UPLOADS_DIR, PhotoTranscoder, photo_transcoder, transcode
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+UNREADABLE_IMAGE = "Cannot process image. Format may be unsupported (e.g. HEIC without plugin)."
+SUPERSEDED = "superseded"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def create_job(db: Session, instance_id: int, user_id: int, staged_path: str) -> models.PhotoJob:
+    """Record an accepted upload. Commits, so the job is visible before it is queued."""
+    now = _utcnow()
+    job = models.PhotoJob(
+        id=uuid.uuid4().hex, instance_id=instance_id, user_id=user_id, status=PENDING,
+        staged_path=staged_path, created_at=now, updated_at=now,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def get_job(db: Session, job_id: str) -> Optional[models.PhotoJob]:
+    return db.get(models.PhotoJob, job_id)
+
+
+def claim_job(db: Session, job_id: str, stale_before: datetime) -> Optional[models.PhotoJob]:
+    """Move a job to ``processing`` unless another worker holds it. Returns it if claimed."""
+    job, jobs = models.PhotoJob, models.PhotoJob.__table__
+    claimed = cast(CursorResult, db.execute(
+        update(jobs)
+        .where(jobs.c.id == job_id, or_(jobs.c.status == PENDING,
+                                        and_(jobs.c.status == PROCESSING, jobs.c.updated_at < stale_before)))
+        .values(status=PROCESSING, updated_at=_utcnow())
+    )).rowcount
+    db.commit()
+    return db.get(job, job_id, populate_existing=True) if claimed else None
+
+
+def supersede_jobs(db: Session, instance_id: int) -> int:
+    """Fail the unfinished jobs of an instance that just got a photo another way. Does not commit."""
+    job = models.PhotoJob
+    return int(cast(CursorResult, db.execute(
+        update(job)
+        .where(job.instance_id == instance_id, job.status.in_((PENDING, PROCESSING)))
+        .values(status=FAILED, error=SUPERSEDED, updated_at=_utcnow())
+    )).rowcount)
+
+
+def _superseded(db: Session, job: models.PhotoJob, instance: models.TaskInstance) -> bool:
+    """Whether the instance moved on (reviewed, or another upload) since ``job`` was accepted."""
+    if job.status != PROCESSING or instance.status != "PENDING":
+        return True
+    newer = exists().where(
+        models.PhotoJob.instance_id == job.instance_id, models.PhotoJob.created_at > job.created_at)
+    return db.scalar(select(newer)) is True
+
+
+def complete_job(db: Session, job_id: str, photo_url: str) -> Optional[models.TaskInstance]:
+    """
+    Attach the transcoded photo to the job's instance and finish the job.
+    Returns the instance, or None (job failed) if it was deleted or superseded meanwhile.
+    """
+    job = db.get(models.PhotoJob, job_id, populate_existing=True)
+    if job is None:
+        return None
+    instance = (
+        db.query(models.TaskInstance)
+        .options(joinedload(models.TaskInstance.task),
+                 joinedload(models.TaskInstance.user).joinedload(models.User.role))
+        .filter(models.TaskInstance.id == job.instance_id)
+        .populate_existing()
+        .first()
+    )
+    job.staged_path = None
+    job.updated_at = _utcnow()
+    if instance is None:
+        job.status = FAILED
+        job.error = "Task instance not found"
+    elif _superseded(db, job, instance):
+        job.status = FAILED
+        job.error = SUPERSEDED
+        instance = None
+    else:
+        instance.completion_photo_url = photo_url
+        job.status = DONE
+        job.photo_url = photo_url
+    db.commit()
+    return instance
+
+
+def fail_job(db: Session, job_id: str, error: str) -> None:
+    job = db.get(models.PhotoJob, job_id)
+    if job is None:
+        return
+    job.status = FAILED
+    job.error = error
+    job.staged_path = None
+    job.updated_at = _utcnow()
+    db.commit()
+
+
+def recoverable_job_ids(db: Session, stale_before: datetime) -> List[str]:
+    """Pending jobs and jobs abandoned mid-processing, oldest first."""
+    jobs = models.PhotoJob.__table__
+    job_ids: List[str] = list(db.scalars(
+        select(jobs.c.id)
+        .where(or_(jobs.c.status == PENDING, and_(jobs.c.status == PROCESSING, jobs.c.updated_at < stale_before)))
+        .order_by(jobs.c.created_at)
+    ))
+    return job_ids
+
+
+def prune_jobs(db: Session, retention_hours: int, now: Optional[datetime] = None) -> int:
+    """Delete jobs finished more than ``retention_hours`` ago. Returns the number deleted."""
+    cutoff = (now or _utcnow()) - timedelta(hours=retention_hours)
+    jobs = models.PhotoJob.__table__
+    deleted = cast(CursorResult, db.execute(
+        delete(jobs).where(jobs.c.status.in_((DONE, FAILED)), jobs.c.updated_at < cutoff)
+    )).rowcount
+    db.commit()
+    return int(deleted)
+
+
+def _remove_staged(path: Optional[str]) -> None:
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class PhotoJobQueue:
+    """Per-worker queue of photo job ids, drained by background tasks on the event loop."""
+
+    def __init__(self, transcoder: PhotoTranscoder = photo_transcoder, uploads_dir=UPLOADS_DIR,
+                 session_factory=None, max_queued: int = 64, concurrency: Optional[int] = None,
+                 stale_seconds: float = 600, retry_seconds: float = 1.0):
+        self.transcoder = transcoder
+        self.uploads_dir = uploads_dir
+        self._session_factory = session_factory
+        self.max_queued = max_queued
+        # One consumer per transcoding process keeps the pool busy without queueing behind it
+        self.concurrency = concurrency if concurrency is not None else max(1, transcoder.workers)
+        self.stale_seconds = stale_seconds
+        self.retry_seconds = retry_seconds
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._consumers: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            # Resolved on first use, like the rate limiter's engine
+            from ..database import AsyncSessionLocal
+
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _stale_before(self) -> datetime:
+        return _utcnow() - timedelta(seconds=self.stale_seconds)
+
+    def check_capacity(self) -> None:
+        """Raise ``ServiceBusyError`` (503) instead of accepting a job that would wait too long."""
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise ServiceBusyError("Too many photos are waiting to be processed, please retry")
+
+    async def start(self) -> None:
+        if self._consumers:
+            return
+        self._queue = asyncio.Queue()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        try:
+            async with self.session_factory() as db:
+                job_ids = await db.run_sync(recoverable_job_ids, self._stale_before())
+        except Exception as e:
+            logger.error(f"Photo jobs: failed to recover pending jobs: {e}")
+            return
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        if job_ids:
+            logger.info(f"Photo jobs: resumed {len(job_ids)} pending jobs")
+
+    async def stop(self) -> None:
+        """Stop the consumers; unfinished jobs stay pending for the next startup."""
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        self._queue = None
+
+    def submit(self, job_id: str) -> bool:
+        """Queue a committed job. Without running consumers it waits for the next startup."""
+        if self._queue is None:
+            return False
+        self._queue.put_nowait(job_id)
+        return True
+
+    async def _consume(self) -> None:
+        queue = self._queue
+        assert queue is not None, "consumers run only between start() and stop()"
+        while True:
+            job_id = await queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception as e:
+                logger.error(f"Photo job {job_id} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def _transcode(self, staged_path: str) -> Dict[str, str]:
+        while True:
+            try:
+                return cast(Dict[str, str], await self.transcoder.call_async(
+                    transcode, staged_path, str(self.uploads_dir), self.transcoder.keep_original))
+            except ServiceBusyError:
+                # Synchronous uploads filled the pool; this job is already accepted, so wait for a slot
+                await asyncio.sleep(self.retry_seconds)
+
+    async def run_job(self, job_id: str) -> Optional[models.PhotoJob]:
+        """Claim, transcode and publish one job. Returns None if another worker has it."""
+        async with self.session_factory() as db:
+            job: Optional[models.PhotoJob] = await db.run_sync(claim_job, job_id, self._stale_before())
+            if job is None:
+                return None
+            staged_path = str(job.staged_path)
+            try:
+                variants = await self._transcode(staged_path)
+            except (UnidentifiedImageError, OSError) as e:
+                # OSError: truncated image, or the staged copy is gone
+                logger.warning(f"Photo job {job_id}: cannot process upload: {e}")
+                await db.run_sync(fail_job, job_id, UNREADABLE_IMAGE)
+                instance = None
+            else:
+                instance = await db.run_sync(complete_job, job_id, f"/uploads/{variants['display']}")
+        _remove_staged(staged_path)
+
+        if instance is None:
+            self.failed += 1
+            await broadcaster.broadcast(
+                "photo_failed",
+                {"job_id": job.id, "instance_id": job.instance_id, "error": job.error},
+                topics=[user_topic(int(job.user_id))],
+            )
+        else:
+            self.processed += 1
+            await broadcaster.broadcast(
+                "photo_ready",
+                {
+                    "job_id": job.id,
+                    "instance_id": instance.id,
+                    "user_id": instance.user_id,
+                    "photo_url": job.photo_url,
+                    "version": instance.version,
+                    "instance": schemas.TaskInstance.model_validate(instance).model_dump(mode="json"),
+                },
+                topics=[user_topic(int(instance.user_id)), user_topic(int(job.user_id)), REVIEW_QUEUE],
+            )
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "consumers": len(self._consumers),
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+photo_job_queue = PhotoJobQueue(max_queued=settings.PHOTO_JOB_MAX_QUEUED)
@@ -0,0 +1,199 @@
+"""
+Task photo transcoding: any Pillow-readable upload -> WebP variants on disk.
+
+One decode yields every variant of a photo (``VARIANTS``):
+
+- ``display``  ``<hash>.webp``, longest edge 1280 px; the URL stored in
+  ``completion_photo_url`` and served by default.
+- ``thumb``    ``<hash>.thumb.webp``, 320 px, for review grids.
+- ``original`` ``<hash>.orig.webp``, full resolution, only with
+  ``PHOTO_KEEP_ORIGINAL``.
+
+Storage is content-addressed: ``<hash>`` is the SHA-256 of the encoded
+display image, so re-uploading the same photo reuses the existing files.
+Files live in 256 shard directories (``uploads/<hash[:2]>/``) to keep
+directory scans cheap; uploads from before content addressing stay flat in
+``uploads/``. URLs stay flat (``/uploads/<hash>.webp``); ``photo_path``
+resolves them. Nothing deletes photos when a task instance drops its URL;
+``photo_gc`` removes unreferenced files on a schedule.
+
+JPEGs (the format phone cameras produce) are decoded with ``Image.draft``,
+which lets libjpeg scale by 1/2, 1/4 or 1/8 while decoding, so unless the
+original is archived a 12 MP photo is never materialized at full size.
+
+Transcoding is CPU-bound, so uploads run it in ``photo_transcoder``, a
+``BoundedProcessPool`` of ``PHOTO_TRANSCODE_WORKERS`` processes, instead of
+the threadpool shared with every sync endpoint. The spooled upload is
+streamed to ``uploads/.staging`` for the worker to read; with
+``PHOTO_TRANSCODE_WORKERS=0`` it is decoded in place in a thread. Uploads
+accepted with ``202`` are staged the same way and transcoded later by
+``photo_jobs``.
+"""
+import asyncio
+import functools
+import hashlib
+import io
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Dict, Literal, Optional, Tuple, Union, cast
+
+from PIL import Image
+
+from ..config import settings
+from ..process_pool import BoundedProcessPool, default_workers
+
+UPLOADS_DIR = Path(__file__).resolve().parent.parent.parent / "uploads"
+STAGING_DIR = UPLOADS_DIR / ".staging"
+
+MAX_THUMBNAIL_DIM = 1280  # px — longest edge; preserves aspect ratio
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
+
+PhotoSize = Literal["thumb", "display", "original"]
+
+# Uploaded files never change once written, so browsers may keep them for a year without asking.
+# "private": every photo sits behind authentication and must not land in shared caches.
+UPLOAD_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Variant -> (filename suffix, longest edge in px or None for full size, WebP quality)
+VARIANTS: Dict[str, Tuple[str, Optional[int], int]] = {
+    "original": (".orig", None, 90),
+    "display": ("", MAX_THUMBNAIL_DIM, 82),
+    "thumb": (".thumb", 320, 75),
+}
+
+
+def file_size(src: BinaryIO) -> int:
+    """Length of a seekable file, leaving it positioned at the start."""
+    size = src.seek(0, os.SEEK_END)
+    src.seek(0)
+    return int(size)
+
+
+def variant_filename(filename: str, size: str) -> str:
+    """``abc.webp`` -> ``abc.thumb.webp`` for ``size="thumb"``; ``display`` is the file itself."""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}{VARIANTS[size][0]}{ext}"
+
+
+def display_filename(filename: str) -> str:
+    """Inverse of ``variant_filename``: ``abc.thumb.webp`` -> ``abc.webp``."""
+    stem, ext = os.path.splitext(filename)
+    for suffix, _, _ in VARIANTS.values():
+        if suffix and stem.endswith(suffix):
+            return f"{stem[:-len(suffix)]}{ext}"
+    return filename
+
+
+def photo_path(filename: str, uploads_dir: Path = UPLOADS_DIR) -> Path:
+    """On-disk location of an upload: its shard directory, or flat for pre-hash uploads."""
+    sharded = uploads_dir / filename[:2] / filename
+    return sharded if sharded.exists() else uploads_dir / filename
+
+
+@functools.lru_cache(maxsize=4096)
+def _content_hash(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def content_etag(path: Union[str, Path]) -> str:
+    """Strong ETag from the file's SHA-256, hashed once per (path, mtime, size)."""
+    stat = os.stat(path)
+    return f'"{_content_hash(str(path), stat.st_mtime_ns, stat.st_size)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check (weak comparison, RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _write_once(path: str, data: bytes) -> None:
+    """Atomically create ``path``; an existing file already has the same content."""
+    if os.path.exists(path):
+        # Deduplicated: restart the orphan GC's grace period until the new reference commits
+        os.utime(path)
+        return
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def transcode(src: Union[str, BinaryIO], dest_dir: str, keep_original: bool = False) -> Dict[str, str]:
+    """
+    Decode ``src`` once and store every variant under ``<dest_dir>/<hash[:2]>/``.
+    Returns variant -> filename. Runs in the transcoder's worker processes.
+    """
+    if not isinstance(src, str):
+        src.seek(0)
+    with Image.open(src) as img:
+        if img.format == "JPEG" and not keep_original:
+            # Decode at the smallest DCT scale that still covers the display size
+            img.draft("RGB", (MAX_THUMBNAIL_DIM, MAX_THUMBNAIL_DIM))
+        img = img.convert("RGB")  # Normalises RGBA, palette, and CMYK to 3-channel
+
+    encoded: Dict[str, bytes] = {}
+    # Largest first: each variant is downscaled from the previous one
+    for variant, (_, max_dim, quality) in VARIANTS.items():
+        if max_dim is None and not keep_original:
+            continue
+        if max_dim is not None:
+            img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="WEBP", quality=quality, optimize=True)
+        encoded[variant] = buf.getvalue()
+
+    digest = hashlib.sha256(encoded["display"]).hexdigest()[:32]
+    shard = os.path.join(dest_dir, digest[:2])
+    os.makedirs(shard, exist_ok=True)
+    written: Dict[str, str] = {}
+    for variant, data in encoded.items():
+        filename = variant_filename(f"{digest}.webp", variant)
+        _write_once(os.path.join(shard, filename), data)
+        written[variant] = filename
+    return written
+
+
+def stage_upload(src: BinaryIO) -> str:
+    """Copy a spooled upload to the staging area in chunks; returns the path."""
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    path = str(STAGING_DIR / f"{uuid.uuid4().hex}.upload")
+    src.seek(0)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(src, out)
+    return path
+
+
+class PhotoTranscoder(BoundedProcessPool):
+    """Pillow transcoding in a lazily started, size-limited process pool."""
+
+    def __init__(self, workers: int, max_pending: int = 16, keep_original: bool = False):
+        super().__init__("Photo transcoder", workers, max_pending,
+                         busy_detail="Too many photos are being processed, please retry")
+        self.keep_original = keep_original
+
+    async def transcode_upload(self, src: BinaryIO, dest_dir: Union[str, Path]) -> Dict[str, str]:
+        """Transcode a spooled upload into ``dest_dir`` without blocking the event loop."""
+        if self.workers <= 0:
+            return cast(Dict[str, str], await self.call_async(transcode, src, str(dest_dir), self.keep_original))
+        staged = await asyncio.to_thread(stage_upload, src)
+        try:
+            return cast(Dict[str, str], await self.call_async(transcode, staged, str(dest_dir), self.keep_original))
+        finally:
+            os.remove(staged)
+
+
+photo_transcoder = PhotoTranscoder(
+    workers=default_workers(2) if settings.PHOTO_TRANSCODE_WORKERS is None else settings.PHOTO_TRANSCODE_WORKERS,
+    max_pending=settings.PHOTO_TRANSCODE_MAX_PENDING,
+    keep_original=settings.PHOTO_KEEP_ORIGINAL,
+)
@@ -1,107 +1,215 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timezone
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
 from .. import models
 from ..crud import get_system_setting, set_system_setting
+from .change_log import record_changes
 
+logger = logging.getLogger(__name__)
 
-def _generate_instances_for_task(
-        db: Session, task: models.Task, today: datetime) -> int:
-    """Shared helper to generate instances for a single task for a given day."""
-    created_count = 0
-    today_weekday = today.strftime("%A")
 
+@dataclass
+class GenerationReport:
+    """Outcome of one bulk generation pass.
+
+    ``timings`` holds wall-clock seconds per phase (``load``, ``plan``,
+    ``insert``) so the midnight reset can be profiled as the catalog grows.
+    ``conflicts`` counts rows another worker inserted first.
+    """
+    created: int = 0
+    conflicts: int = 0
+    task_count: int = 0
+    user_count: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def _due_time_for(task: models.Task, today: datetime) -> datetime:
+    """Construct today's due_time for a task based on its schedule type."""
+    if task.schedule_type == "daily":
+        try:
+            hour, minute = map(int, task.default_due_time.split(":"))
+            return today.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        except ValueError:
+            return today.replace(hour=17, minute=0, second=0, microsecond=0)
+    # weekly or recurring
+    return today.replace(hour=23, minute=59, second=0, microsecond=0)
+
+
+def _is_due_today(
+        task: models.Task, today: datetime,
+        last_completions: Dict[int, datetime]) -> bool:
+    """Apply weekly day-of-week and recurring cooldown rules."""
     # Skip weekly tasks if today is not the scheduled day
     if task.schedule_type == "weekly":
-        if task.default_due_time != today_weekday:
-            return 0
+        return bool(task.default_due_time == today.strftime("%A"))
 
     # For recurring tasks, check if cooldown period has elapsed
     if task.schedule_type == "recurring":
-        # Find the most recent completion of this task by ANY user
-        last_completion = db.query(models.TaskInstance).filter(
-            models.TaskInstance.task_id == task.id,
-            models.TaskInstance.status == "COMPLETED"
-        ).order_by(models.TaskInstance.completed_at.desc()).first()
-
-        if last_completion and last_completion.completed_at:
-            completion_date = last_completion.completed_at.date()
-            today_date = today.date()
-            days_since_completion = (today_date - completion_date).days
-            if days_since_completion < task.recurrence_min_days:
-                return 0
-
-    # Find target users
-    if task.assigned_role_id:
-        target_users = db.query(models.User).filter(
-            models.User.role_id == task.assigned_role_id).all()
+        last_completed_at = last_completions.get(int(task.id))
+        if last_completed_at:
+            days_since_completion = (today.date() - last_completed_at.date()).days
+            if days_since_completion < (task.recurrence_min_days or 0):
+                return False
+
+    return True
+
+
+def _insert_ignoring_conflicts(db: Session, rows: List[dict]) -> int:
+    """
+    Insert instance rows with ``INSERT OR IGNORE`` / ``ON CONFLICT DO NOTHING``
+    semantics on the per-day key. Returns the number of rows actually inserted.
+    Inserted ids are added to the sync change log.
+    """
+    if not rows:
+        return 0
+
+    table = models.TaskInstance.__table__
+    key = ["task_id", "user_id", "due_date"]
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table).on_conflict_do_nothing(index_elements=key)
+    elif dialect == "postgresql":
+        stmt = pg_insert(table).on_conflict_do_nothing(index_elements=key)
     else:
-        target_users = db.query(models.User).all()
+        result = db.execute(insert(table), rows)
+        return int(getattr(result, "rowcount", len(rows)))
+
+    # RETURNING yields only the rows that were not skipped as conflicts
+    inserted_ids = list(db.execute(stmt.returning(table.c.id), rows).scalars())
+    record_changes(db, "task_instances", inserted_ids)
+    return len(inserted_ids)
+
 
+def _generate_instances(
+        db: Session, tasks: Sequence[models.Task], today: datetime) -> GenerationReport:
+    """
+    Set-based generation engine shared by the daily reset and task creation.
+
+    Issues a fixed number of statements regardless of catalog size:
+    one for users, one for today's existing (task_id, user_id) pairs, one
+    for recurring cooldowns, and a single conflict-ignoring executemany
+    INSERT. The (task_id, user_id, due_date) unique index is the source of
+    truth, so concurrent or retried resets are safe.
+    Does **not** commit — caller must commit.
+    """
+    report = GenerationReport(task_count=len(tasks))
+    if not tasks:
+        return report
+
+    # Phase 1: Load everything the planner needs in bulk
+    phase_start = time.perf_counter()
+    task_ids = [int(t.id) for t in tasks]
     start_of_day = today.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    for user in target_users:
-        # Construct due_time for today
-        if task.schedule_type == "daily":
-            try:
-                hour, minute = map(int, task.default_due_time.split(":"))
-                due_time = today.replace(
-                    hour=hour, minute=minute, second=0, microsecond=0)
-            except ValueError:
-                due_time = today.replace(
-                    hour=17, minute=0, second=0, microsecond=0)
-        else:  # weekly or recurring
-            due_time = today.replace(
-                hour=23, minute=59, second=0, microsecond=0)
-
-        # Check for existing instance today (start of day to end of day)
-        # Deduplication behavior: check regardless of status so we don't duplicate
-        # if they completed it and we run a reset again.
-        existing = db.query(models.TaskInstance).filter(
-            models.TaskInstance.task_id == task.id,
-            models.TaskInstance.user_id == user.id,
-            models.TaskInstance.due_time >= start_of_day
-        ).first()
-
-        if not existing:
-            instance = models.TaskInstance(
-                task_id=task.id,
-                user_id=user.id,
-                due_time=due_time,
-                status="PENDING"
+    users = models.User.__table__
+    instances = models.TaskInstance.__table__
+    users_by_role: Dict[int, List[int]] = {}
+    all_user_ids: List[int] = []
+    for user_id, role_id in db.execute(select(users.c.id, users.c.role_id)):
+        all_user_ids.append(int(user_id))
+        users_by_role.setdefault(int(role_id), []).append(int(user_id))
+    report.user_count = len(all_user_ids)
+
+    # Deduplication behavior: check regardless of status so we don't duplicate
+    # if they completed it and we run a reset again.
+    existing: Set[Tuple[int, int]] = {
+        (int(task_id), int(user_id)) for task_id, user_id in db.execute(
+            select(instances.c.task_id, instances.c.user_id)
+            .where(instances.c.task_id.in_(task_ids), instances.c.due_time >= start_of_day)
+            .distinct()
+        )
+    }
+
+    # Most recent completion of each recurring task by ANY user
+    recurring_ids = [int(t.id) for t in tasks if t.schedule_type == "recurring"]
+    last_completions: Dict[int, datetime] = {}
+    if recurring_ids:
+        last_completions = {
+            int(task_id): last_completed_at for task_id, last_completed_at in db.execute(
+                select(instances.c.task_id, func.max(instances.c.completed_at))
+                .where(instances.c.task_id.in_(recurring_ids), instances.c.status == "COMPLETED")
+                .group_by(instances.c.task_id)
             )
-            db.add(instance)
-            created_count += 1
+        }
+    report.timings["load"] = time.perf_counter() - phase_start
 
-    return created_count
+    # Phase 2: Compute the missing (task, user) set in memory
+    phase_start = time.perf_counter()
+    rows: List[dict] = []
+    for task in tasks:
+        if not _is_due_today(task, today, last_completions):
+            continue
+
+        if task.assigned_role_id:
+            target_user_ids = users_by_role.get(int(task.assigned_role_id), [])
+        else:
+            target_user_ids = all_user_ids
+
+        due_time = _due_time_for(task, today)
+        for user_id in target_user_ids:
+            if (int(task.id), user_id) in existing:
+                continue
+            rows.append({
+                "task_id": int(task.id),
+                "user_id": user_id,
+                "due_time": due_time,
+                "due_date": today.date(),
+                "status": "PENDING",
+            })
+    report.timings["plan"] = time.perf_counter() - phase_start
+
+    # Phase 3: One executemany INSERT for the whole reset
+    phase_start = time.perf_counter()
+    report.created = _insert_ignoring_conflicts(db, rows)
+    report.conflicts = len(rows) - report.created
+    report.timings["insert"] = time.perf_counter() - phase_start
+
+    return report
+
+
+def _log_report(label: str, report: GenerationReport) -> None:
+    phases = ", ".join(f"{name}={secs * 1000:.1f}ms" for name, secs in report.timings.items())
+    logger.info(
+        f"{label}: created {report.created} instances for {report.task_count} tasks "
+        f"x {report.user_count} users ({phases})")
 
 
 def generate_instances_for_task(
         db: Session, task: models.Task, reference_time: Optional[datetime] = None) -> int:
     """Generate task instances for a single task (for today). Used when creating new tasks."""
     today = reference_time or datetime.now(timezone.utc)
-    count = _generate_instances_for_task(db, task, today)
+    report = _generate_instances(db, [task], today)
     db.commit()
-    return count
+    return report.created
 
 
-def generate_daily_instances(
-        db: Session, reference_time: Optional[datetime] = None) -> int:
-    """Generate task instances for daily, weekly, and recurring tasks."""
+def generate_daily_instances_report(
+        db: Session, reference_time: Optional[datetime] = None) -> GenerationReport:
+    """Generate instances for daily, weekly, and recurring tasks and return the full report."""
     # Get all tasks (daily, weekly, and recurring)
     tasks = db.query(models.Task).filter(
         models.Task.schedule_type.in_(["daily", "weekly", "recurring"])
     ).all()
 
-    created_count = 0
     today = reference_time or datetime.now(timezone.utc)
-
-    for task in tasks:
-        created_count += _generate_instances_for_task(db, task, today)
+    report = _generate_instances(db, tasks, today)
 
     db.commit()
-    return created_count
+    _log_report("Daily generation", report)
+    return report
+
+
+def generate_daily_instances(
+        db: Session, reference_time: Optional[datetime] = None) -> int:
+    """Generate task instances for daily, weekly, and recurring tasks."""
+    return generate_daily_instances_report(db, reference_time).created
 
 
 def get_last_reset_date(db: Session) -> date | None:
@@ -1,10 +1,11 @@
-from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime
+from dataclasses import dataclass, field
+from sqlalchemy.orm import Session, joinedload
+from typing import Dict, List, Optional, Sequence
+from datetime import datetime, timezone
 from .. import models, schemas
 from . import gamification
 from . import notifications
-from ..exceptions import InvalidStateTransitionError, TaskNotFoundError
+from ..exceptions import AuthorizationError, InvalidStateTransitionError, TaskNotFoundError
 
 
 def complete_task_instance(
@@ -23,7 +24,6 @@ def complete_task_instance(
         return schemas.TaskInstance.model_validate(instance)  # Already done
 
     if not skip_ownership_check and instance.user_id != actual_user_id:
-        from ..exceptions import AuthorizationError
         raise AuthorizationError("You can only complete tasks assigned to you")
 
     task = instance.task
@@ -42,6 +42,114 @@ def complete_task_instance(
     return gamification.award_points_for_task(db, instance, current_time)
 
 
+@dataclass
+class BatchCompletion:
+    """Outcome of ``complete_task_instances``.
+
+    ``completed`` maps each instance that earned points to the points
+    awarded; ``in_review`` lists photo tasks sent to review. Instances that
+    were already completed or in review appear in neither.
+    """
+    instance_ids: List[int] = field(default_factory=list)
+    completed: Dict[int, int] = field(default_factory=dict)
+    in_review: List[int] = field(default_factory=list)
+    notifications: List[models.Notification] = field(default_factory=list)
+
+
+def _batch_notification(
+    user_id: int, completed: List[models.TaskInstance], points: int, in_review: List[models.TaskInstance]
+) -> schemas.NotificationCreate:
+    """One notification summarising a user's share of a batch."""
+    if not completed:
+        names = ", ".join(f"'{instance.task.name}'" for instance in in_review)
+        return schemas.NotificationCreate(
+            user_id=user_id, type="SYSTEM", title="Task In Review",
+            message=f"Your photo for {names} is pending admin review." if len(in_review) == 1
+            else f"Your photos for {names} are pending admin review.")
+    if len(completed) == 1:
+        message = f"You earned {points} points for '{completed[0].task.name}'."
+    else:
+        message = f"You earned {points} points for {len(completed)} tasks."
+    if in_review:
+        message += f" {len(in_review)} photo(s) pending admin review."
+    return schemas.NotificationCreate(user_id=user_id, type="TASK_COMPLETED", title="Task Completed!", message=message)
+
+
+def complete_task_instances(
+    db: Session,
+    instance_ids: Sequence[int],
+    actual_user_id: int,
+    current_time: Optional[datetime] = None,
+    skip_ownership_check: bool = False,
+) -> BatchCompletion:
+    """
+    Complete several instances in one transaction (``POST /tasks/complete-batch``).
+
+    Same rules as ``complete_task_instance``, checked for every instance
+    before anything changes: one missing, foreign or photo-less instance
+    fails the whole batch. Completions share the in-session user rows, so a
+    user's streak advances once per day and only their first completion of
+    the day gets the daily bonus. Adds one notification per assignee and
+    commits once.
+    """
+    now_dt = current_time or datetime.now(timezone.utc)
+    ids = list(dict.fromkeys(instance_ids))
+    instances = {
+        int(instance.id): instance
+        for instance in db.query(models.TaskInstance)
+        .options(joinedload(models.TaskInstance.task),
+                 joinedload(models.TaskInstance.user).joinedload(models.User.role))
+        .filter(models.TaskInstance.id.in_(ids))
+    }
+    for instance_id in ids:
+        instance = instances.get(instance_id)
+        if instance is None:
+            raise TaskNotFoundError(f"Task instance {instance_id} not found")
+        if instance.status == "COMPLETED":
+            continue
+        if not skip_ownership_check and instance.user_id != actual_user_id:
+            raise AuthorizationError("You can only complete tasks assigned to you")
+        if instance.task.requires_photo_verification and not instance.completion_photo_url:
+            raise InvalidStateTransitionError(
+                f"Photo upload required before completing '{instance.task.name}'.")
+
+    result = BatchCompletion(instance_ids=ids)
+    completed_by_user: Dict[int, List[models.TaskInstance]] = {}
+    review_by_user: Dict[int, List[models.TaskInstance]] = {}
+    for instance_id in ids:
+        instance = instances[instance_id]
+        # Also skips recurring siblings completed earlier in this batch
+        if instance.status in ("COMPLETED", "IN_REVIEW"):
+            continue
+        if instance.task.requires_photo_verification:
+            instance.status = "IN_REVIEW"
+            result.in_review.append(instance_id)
+            review_by_user.setdefault(int(instance.user_id), []).append(instance)
+        else:
+            result.completed[instance_id] = gamification.apply_task_completion(db, instance, now_dt)
+            completed_by_user.setdefault(int(instance.user_id), []).append(instance)
+        # Later recurring-sibling queries must see this completion (sessions do not autoflush)
+        db.flush()
+
+    for user_id in sorted(completed_by_user.keys() | review_by_user.keys()):
+        completed = completed_by_user.get(user_id, [])
+        notification = models.Notification(**_batch_notification(
+            user_id, completed, sum(result.completed[int(instance.id)] for instance in completed),
+            review_by_user.get(user_id, [])).model_dump())
+        db.add(notification)
+        result.notifications.append(notification)
+
+    db.commit()
+    return result
+
+
+@dataclass
+class ReviewOutcome:
+    """Outcome of ``review_task``: the reviewed instance and, on rejection, the notice filed for the assignee."""
+    instance: schemas.TaskInstance
+    notification: Optional[models.Notification] = None
+
+
 def review_task_instance(
     db: Session,
     instance_id: int,
@@ -49,6 +157,16 @@ def review_task_instance(
     current_time: Optional[datetime] = None
 ) -> schemas.TaskInstance:
     """Admin endpoint to approve or reject a task."""
+    return review_task(db, instance_id, review, current_time).instance
+
+
+def review_task(
+    db: Session,
+    instance_id: int,
+    review: schemas.TaskReviewRequest,
+    current_time: Optional[datetime] = None
+) -> ReviewOutcome:
+    """``review_task_instance`` that also returns the rejection notification it created."""
     instance = db.query(models.TaskInstance).filter(
         models.TaskInstance.id == instance_id).first()
     if not instance:
@@ -65,7 +183,7 @@ def review_task_instance(
         db.refresh(instance)
 
         # Notify
-        notifications.create_notification(db, schemas.NotificationCreate(
+        notification = notifications.create_notification(db, schemas.NotificationCreate(
             user_id=int(instance.user_id),
             type="SYSTEM",
             title="Chore Rejected",
@@ -75,7 +193,7 @@ def review_task_instance(
             )
         ))
 
-        return schemas.TaskInstance.model_validate(instance)
+        return ReviewOutcome(schemas.TaskInstance.model_validate(instance), notification)
 
     # Approved: Award points using gamification service.
-    return gamification.award_points_for_task(db, instance, current_time)
+    return ReviewOutcome(gamification.award_points_for_task(db, instance, current_time))
@@ -9,6 +9,8 @@ Design contract:
 - Functions create/mutate Transaction records but do **NOT** commit.
 - The caller owns the DB transaction boundary (commit/rollback).
 - Read-only transaction queries remain in ``crud.py``.
+- Every record also bumps the ``daily_user_activity`` rollup in the same
+  transaction (see ``activity_rollup``).
 """
 from datetime import datetime
 from typing import List, Optional
@@ -16,6 +18,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from .. import models
+from .activity_rollup import activity_day, record_activity
 
 
 # ─── Record Factories ──────────────────────────────────────────────
@@ -47,6 +50,7 @@ def record_earn(
         timestamp=timestamp,
     )
     db.add(transaction)
+    record_activity(db, user_id, activity_day(timestamp), points_earned=awarded_points)
     return transaction
 
 
@@ -75,6 +79,7 @@ def record_redeem(
         timestamp=timestamp,
     )
     db.add(transaction)
+    record_activity(db, user_id, activity_day(timestamp), redeemed_points=cost_points)
     return transaction
 
 
@@ -102,6 +107,7 @@ def record_penalty(
         timestamp=timestamp,
     )
     db.add(transaction)
+    record_activity(db, user_id, activity_day(timestamp), penalty_points=points)
     return transaction
 
 
@@ -1,6 +1,6 @@
 import axios from 'axios';
 
-import type { LoginResponse, User } from './types';
+import type { LoginResponse, PhotoJob, User } from './types';
 
 // ── In-memory token store ───────────────────────────────────────
 // Kept in module scope (not localStorage) so XSS cannot read it.
@@ -124,6 +124,9 @@ export const completeTask = (instance_id: number, actual_user_id?: number) =>
         params: { actual_user_id }
     });
 
+export const completeTasksBatch = (instance_ids: number[]) =>
+    api.post('/tasks/complete-batch', { instance_ids });
+
 export const updateTask = (task_id: number, taskData: Partial<{
     name: string;
     description: string;
@@ -146,6 +149,32 @@ export const uploadTaskPhoto = (instance_id: number, photo_file: File) => {
     });
 };
 
+// Returns 202 with a photo job as soon as the upload has arrived; the server transcodes it later
+export const uploadTaskPhotoInBackground = (instance_id: number, photo_file: File) => {
+    const formData = new FormData();
+    formData.append('file', photo_file);
+    return api.post<PhotoJob>(`/tasks/${instance_id}/upload-photo`, formData, {
+        params: { background: true },
+        headers: {
+            'Content-Type': 'multipart/form-data'
+        }
+    });
+};
+
+export const getPhotoJob = (job_id: string) => api.get<PhotoJob>(`/tasks/photo-jobs/${job_id}`);
+
+// Resolves once the photo is attached to its task (the job is done); rejects if it failed or took too long
+export const waitForPhotoJob = async (job_id: string, intervalMs = 1000, timeoutMs = 120000): Promise<PhotoJob> => {
+    const deadline = Date.now() + timeoutMs;
+    for (;;) {
+        const { data: job } = await getPhotoJob(job_id);
+        if (job.status === 'done') return job;
+        if (job.status === 'failed') throw new Error(job.error || 'Photo processing failed');
+        if (Date.now() >= deadline) throw new Error('Photo processing timed out');
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+};
+
 export const getReviewQueue = () => api.get('/tasks/review-queue');
 
 export const reviewTask = (instance_id: number, is_approved: boolean, reject_reason?: string) =>
@@ -247,6 +276,7 @@ export interface TransactionHeader {
     start_date?: string;
     end_date?: string;
     user_id?: number;
+    cursor?: string;
 }
 
 export const getUserTransactions = (user_id: number, filters: TransactionHeader = {}) =>
@@ -81,7 +81,7 @@ export const NotificationProvider: React.FC<NotificationProviderProps> = ({ chil
         if (!currentUser) return;
 
         const token = getAuthToken() || '';
-        const eventSource = new EventSource(`${API_BASE}/events?token=${encodeURIComponent(token)}`);
+        const eventSource = new EventSource(`${API_BASE}/events?token=${encodeURIComponent(token)}&topics=user`);
 
         eventSource.onopen = () => {
             setSseConnected(true);
@@ -99,11 +99,19 @@ export const NotificationProvider: React.FC<NotificationProviderProps> = ({ chil
             // The backend broadcasts "notification" event specifically for this.
 
             if (data.type === 'notification' && data.data?.user_id === currentUser.id) {
-                refreshNotifications();
+                const created = data.data.notification as Notification | null | undefined;
+                if (created) {
+                    // Delta payload: prepend the new row instead of refetching
+                    setNotifications(prev => prev.some(n => n.id === created.id) ? prev : [created, ...prev]);
+                } else {
+                    refreshNotifications();
+                }
                 // Optional: Play sound or show toast if not already handled by other listeners
             } else if (data.type === 'task_assigned' && data.data?.user_id === currentUser.id) {
                 showToast(`New task assigned: ${data.data.task_name}`, 'info');
                 refreshNotifications();
+            } else if (data.type === 'resync') {
+                refreshNotifications();
             } else if (data.type === 'connected') {
                 setSseConnected(true);
             }
@@ -1,6 +1,6 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
 import api from '../api';
-import type { TaskInstance, User, Reward } from '../types';
+import type { TaskInstance, User, Reward, UserBalance } from '../types';
 
 const getPendingTasksPublic = () => api.get('/tasks/pending', { skipAuthRedirect: true });
 const getUsersPublic = () => api.get('/users/', { skipAuthRedirect: true });
@@ -56,6 +56,20 @@ export function useFamilyDashboardData(onTasksUpdated?: () => void, onRewardsUpd
         }
     }, []);
 
+    // Apply an instance pushed over SSE; stale versions are ignored
+    const applyInstance = useCallback((instance: TaskInstance) => {
+        setTasks(prev => {
+            const existing = prev.find(t => t.id === instance.id);
+            if (existing && (existing.version ?? 0) > (instance.version ?? 0)) return prev;
+            const others = prev.filter(t => t.id !== instance.id);
+            return instance.status === 'PENDING' ? [...others, instance] : others;
+        });
+    }, []);
+
+    const applyBalance = useCallback((balance: UserBalance) => {
+        setUsers(prev => prev.map(u => u.id === balance.id ? { ...u, ...balance } : u));
+    }, []);
+
     // Provide callbacks to refs so they don't cause useEffect re-triggers
     const onTasksRef = useRef(onTasksUpdated);
     const onRewardsRef = useRef(onRewardsUpdated);
@@ -69,7 +83,7 @@ export function useFamilyDashboardData(onTasksUpdated?: () => void, onRewardsUpd
         loadData();
 
         const token = localStorage.getItem('auth_token') || '';
-        const eventSource = new EventSource(`${API_BASE}/events?token=${encodeURIComponent(token)}`);
+        const eventSource = new EventSource(`${API_BASE}/events?token=${encodeURIComponent(token)}&topics=family-feed`);
         eventSourceRef.current = eventSource;
 
         eventSource.onopen = () => {
@@ -87,7 +101,32 @@ export function useFamilyDashboardData(onTasksUpdated?: () => void, onRewardsUpd
 
             if (data.type === 'connected') {
                 setConnected(true);
-            } else if (data.type === 'task_created' || data.type === 'task_completed' || data.type === 'task_deleted') {
+            } else if (data.type === 'resync') {
+                // Missed events could not be replayed after a reconnect
+                loadData();
+            } else if ((data.type === 'task_completed' || data.type === 'task_reviewed' || data.type === 'photo_ready') && data.data?.instance) {
+                // Delta payload: update in place instead of refetching
+                applyInstance(data.data.instance);
+                if (data.data.balance) applyBalance(data.data.balance);
+                if (onTasksRef.current) onTasksRef.current();
+            } else if (data.type === 'tasks_completed' && data.data?.instances) {
+                // Batch completion: one event for every changed instance
+                (data.data.instances as TaskInstance[]).forEach(applyInstance);
+                (data.data.balances || []).forEach(applyBalance);
+                if (onTasksRef.current) onTasksRef.current();
+            } else if (data.type === 'tasks_completed') {
+                // Batch too large to relay the instances: apply balances, refetch the tasks
+                (data.data?.balances || []).forEach(applyBalance);
+                refreshTasks();
+                if (onTasksRef.current) onTasksRef.current();
+            } else if (data.type === 'task_created' && data.data?.instances) {
+                (data.data.instances as TaskInstance[]).forEach(applyInstance);
+                if (onTasksRef.current) onTasksRef.current();
+            } else if (data.type === 'task_deleted' && data.data?.task_id) {
+                setTasks(prev => prev.filter(t => t.task_id !== data.data.task_id));
+                if (onTasksRef.current) onTasksRef.current();
+            } else if (['task_created', 'task_completed', 'task_reviewed', 'task_deleted'].includes(data.type)) {
+                // Delta too large to relay (or row gone): refetch
                 refreshTasks();
                 if (onTasksRef.current) onTasksRef.current();
             } else if (data.type === 'reward_redeemed') {
@@ -107,7 +146,7 @@ export function useFamilyDashboardData(onTasksUpdated?: () => void, onRewardsUpd
                 eventSourceRef.current.close();
             }
         };
-    }, [loadData, refreshTasks, refreshData]);
+    }, [loadData, refreshTasks, refreshData, applyInstance, applyBalance]);
 
     return {
         tasks,
@@ -3,13 +3,15 @@ import api from '../api';
 import type { Transaction } from '../types';
 
 const getAllTransactionsPublic = (params: Record<string, unknown> = {}) =>
-    api.get('/transactions', { params: { skip: 0, limit: 100, ...params }, skipAuthRedirect: true });
+    api.get('/transactions', { params: { limit: 100, ...params }, skipAuthRedirect: true });
 
 export function useTransactions() {
     const [transactions, setTransactions] = useState<Transaction[]>([]);
     const [historyPage, setHistoryPage] = useState(1);
     const [hasMoreHistory, setHasMoreHistory] = useState(true);
     const [filters, setFilters] = useState<Record<string, unknown>>({});
+    // Opaque keyset cursor for the next page (from the X-Next-Cursor header)
+    const nextCursorRef = useRef<string | null>(null);
 
     const stateRef = useRef({ filters, historyPage });
     useEffect(() => {
@@ -17,17 +19,20 @@ export function useTransactions() {
     }, [filters, historyPage]);
 
     const refreshTransactions = useCallback(async (newFilters = {}, reset = false) => {
-        const { filters: currentFilters, historyPage: currentPageState } = stateRef.current;
+        const { filters: currentFilters } = stateRef.current;
         const updatedFilters = { ...currentFilters, ...newFilters };
         setFilters(updatedFilters);
-        const currentPage = reset ? 1 : currentPageState;
-        if (reset) setHistoryPage(1);
+        if (reset) {
+            setHistoryPage(1);
+            nextCursorRef.current = null;
+        }
 
         try {
             const limit = 50;
+            const cursor = reset ? null : nextCursorRef.current;
             const transactionsRes = await getAllTransactionsPublic({
-                skip: (currentPage - 1) * limit,
                 limit,
+                ...(cursor ? { cursor } : {}),
                 ...updatedFilters
             });
 
@@ -37,15 +42,18 @@ export function useTransactions() {
                 setTransactions(prev => [...prev, ...transactionsRes.data]);
             }
 
-            setHasMoreHistory(transactionsRes.data.length === limit);
+            nextCursorRef.current = transactionsRes.headers['x-next-cursor'] ?? null;
+            setHasMoreHistory(nextCursorRef.current !== null);
         } catch (error) {
             console.error("Failed to refresh transactions", error);
         }
     }, []);
 
     const loadMoreHistory = useCallback(() => {
+        if (!nextCursorRef.current) return;
         setHistoryPage(prev => prev + 1);
-    }, []);
+        refreshTransactions({}, false);
+    }, [refreshTransactions]);
 
     return {
         transactions,
@@ -244,8 +244,13 @@ const AdminDashboard: React.FC = () => {
                                     <p className="task-description">Completed by: {getUserName(instance.user_id)}</p>
                                     <div className="task-meta-info" style={{ marginTop: '10px' }}>
                                         {instance.completion_photo_url && (
-                                            <a href={instance.completion_photo_url} target="_blank" rel="noopener noreferrer" className="btn btn-secondary">
-                                                View Photo 🖼️
+                                            <a href={instance.completion_photo_url} target="_blank" rel="noopener noreferrer">
+                                                <img
+                                                    src={`${instance.completion_photo_url}?size=thumb`}
+                                                    alt="Completion photo"
+                                                    loading="lazy"
+                                                    style={{ maxWidth: '160px', maxHeight: '160px', borderRadius: '8px', display: 'block' }}
+                                                />
                                             </a>
                                         )}
                                     </div>
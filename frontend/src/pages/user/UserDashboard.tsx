@@ -1,7 +1,7 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useUser } from '../../context/UserContext';
 import { useTranslation } from 'react-i18next';
-import { getUserDailyTasks, completeTask, getTasks, getUserTransactions, uploadTaskPhoto } from '../../api';
+import { getUserDailyTasks, completeTask, getTasks, getUserTransactions, uploadTaskPhotoInBackground, waitForPhotoJob } from '../../api';
 import type { TaskInstance, Task, Transaction, TransactionFilters } from '../../types';
 import { SkeletonLoader } from '../../components/SkeletonLoader';
 import PhotoDropzone from '../../components/PhotoDropzone';
@@ -29,6 +29,8 @@ const UserDashboard: React.FC = () => {
     const swipeHandlers = useSwipeTabs(TABS, activeTab, setActiveTab as (tab: string) => void);
     const [historyPage, setHistoryPage] = useState(1);
     const [hasMoreHistory, setHasMoreHistory] = useState(true);
+    // Opaque keyset cursor for the next history page (from the X-Next-Cursor header)
+    const nextCursorRef = useRef<string | null>(null);
     const [completingId, setCompletingId] = useState<number | null>(null);
     const [photoUrls, setPhotoUrls] = useState<Record<number, File | null>>({});
     const { showToast } = useToast();
@@ -65,13 +67,13 @@ const UserDashboard: React.FC = () => {
                 // Only show PENDING or IN_REVIEW tasks on the dashboard actively
                 setTasks(instancesWithDetails.filter(t => t.status === 'PENDING' || t.status === 'IN_REVIEW'));
             } else if (activeTab === 'history') {
-                const currentPage = resetHistory ? 1 : historyPage;
                 if (resetHistory) setHistoryPage(1);
                 const limit = 50;
+                const cursor = resetHistory ? null : nextCursorRef.current;
 
                 const transactionsRes = await getUserTransactions(currentUser.id, {
-                    skip: (currentPage - 1) * limit,
                     limit,
+                    ...(cursor ? { cursor } : {}),
                     ...filters
                 });
 
@@ -81,7 +83,8 @@ const UserDashboard: React.FC = () => {
                     setTransactions(prev => [...prev, ...transactionsRes.data]);
                 }
 
-                setHasMoreHistory(transactionsRes.data.length === limit);
+                nextCursorRef.current = transactionsRes.headers['x-next-cursor'] ?? null;
+                setHasMoreHistory(nextCursorRef.current !== null);
             }
         } catch (err) {
             console.error('Failed to fetch data', err);
@@ -89,7 +92,7 @@ const UserDashboard: React.FC = () => {
         } finally {
             setLoading(false);
         }
-    }, [currentUser.id, activeTab, filters, historyPage, showToast]);
+    }, [currentUser.id, activeTab, filters, showToast]);
 
     useEffect(() => {
         if (currentUser) {
@@ -123,8 +126,10 @@ const UserDashboard: React.FC = () => {
             }
 
             if (task?.requires_photo_verification && photoUrls[instance.id] && instance.status !== 'IN_REVIEW') {
-                // First upload photo, then call completeTask
-                await uploadTaskPhoto(instance.id, photoUrls[instance.id]!);
+                // Upload returns as soon as the file has arrived (202); completing needs the
+                // transcoded photo attached, so wait for the job before calling completeTask
+                const { data: job } = await uploadTaskPhotoInBackground(instance.id, photoUrls[instance.id]!);
+                await waitForPhotoJob(job.id);
             }
 
             const res = await completeTask(instance.id);
@@ -46,10 +46,28 @@ export interface TaskInstance {
     completed_at: string | null;
     status: string;
     completion_photo_url: string | null;
+    version?: number;
     task?: Task;
     user?: User;
 }
 
+export interface PhotoJob {
+    id: string;
+    instance_id: number;
+    status: 'pending' | 'processing' | 'done' | 'failed';
+    photo_url: string | null;
+    error: string | null;
+    created_at: string;
+    updated_at: string;
+}
+
+export interface UserBalance {
+    id: number;
+    current_points: number;
+    lifetime_points: number;
+    current_streak: number;
+}
+
 export interface Notification {
     id: number;
     user_id: number;
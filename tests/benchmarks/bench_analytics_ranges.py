@@ -0,0 +1,133 @@
+"""
+Benchmark: analytics date predicates, ``date(completed_at) >= d`` vs the shipped endpoints.
+
+Builds a throwaway SQLite database with a year of synthetic completion
+history and times the weekly, heatmap, summary and heatmap/details query
+shapes both ways. The shipped endpoints read the ``daily_user_activity``
+rollup (rebuilt after seeding) and use half-open ranges for details. Not collected by pytest; run directly:
+
+    python tests/benchmarks/bench_analytics_ranges.py [--users 8] [--per-day 25] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from statistics import median
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import Base  # noqa: E402
+from backend.routers import analytics  # noqa: E402
+from backend.services.activity_rollup import rebuild_daily_activity  # noqa: E402
+
+
+def seed(db, users: int, per_day: int, days: int = 365) -> int:
+    role = models.Role(name="Child", multiplier_value=1.0)
+    db.add(role)
+    db.flush()
+    user_ids = []
+    for i in range(users):
+        user = models.User(nickname=f"bench{i}", login_pin="x", role_id=role.id)
+        db.add(user)
+        db.flush()
+        user_ids.append(user.id)
+    task = models.Task(name="Bench", description="Synthetic", base_points=10,
+                       schedule_type="daily", default_due_time="17:00")
+    db.add(task)
+    db.flush()
+
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for day in range(days):
+        base = now - timedelta(days=day)
+        for uid in user_ids:
+            for _ in range(per_day):
+                completed = base.replace(hour=rng.randrange(24), minute=rng.randrange(60))
+                rows.append({
+                    "task_id": task.id, "user_id": uid, "due_time": completed,
+                    # A realistic mix: most history is completed, some expired/pending
+                    "status": "COMPLETED" if rng.random() < 0.8 else "PENDING",
+                    "completed_at": completed,
+                })
+    db.execute(insert(models.TaskInstance.__table__), rows)
+    db.commit()
+    rebuild_daily_activity(db)
+    return len(rows)
+
+
+def legacy_queries(db, user_id: int, day: str) -> None:
+    """The pre-range query shapes: date() wrapped around the indexed column."""
+    today = datetime.now(timezone.utc).date()
+    week_start = today - timedelta(days=6)
+    heatmap_start = today - timedelta(days=29)
+    ti = models.TaskInstance
+    db.query(func.date(ti.completed_at), models.User.nickname, func.count(ti.id)).join(
+        models.User, ti.user_id == models.User.id).filter(
+        ti.status == "COMPLETED", func.date(ti.completed_at) >= week_start).group_by(
+        func.date(ti.completed_at), models.User.nickname).all()
+    db.query(ti.user_id, func.date(ti.completed_at), func.count(ti.id)).filter(
+        ti.status == "COMPLETED", func.date(ti.completed_at) >= heatmap_start).group_by(
+        ti.user_id, func.date(ti.completed_at)).all()
+    db.query(func.count(ti.id)).filter(
+        ti.status == "COMPLETED", func.date(ti.completed_at) >= week_start).scalar()
+    db.query(models.User.nickname, func.count(ti.id)).join(ti, ti.user_id == models.User.id).filter(
+        ti.status == "COMPLETED", func.date(ti.completed_at) >= week_start).group_by(
+        models.User.nickname).all()
+    db.query(ti).join(models.Task, ti.task_id == models.Task.id).filter(
+        ti.user_id == user_id, ti.status == "COMPLETED", func.date(ti.completed_at) == day).all()
+
+
+def current_queries(db, user_id: int, day: str) -> None:
+    """The shipped router code paths."""
+    analytics.get_weekly_activity(db=db)
+    analytics.get_heatmap_data(days=30, db=db)
+    analytics.get_analytics_summary(db=db)
+    analytics.get_heatmap_day_details(user_id=user_id, date=day, db=db)
+
+
+def timed(fn, db, repeat: int, *args) -> float:
+    samples = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn(db, *args)
+        samples.append(time.perf_counter() - start)
+    return median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--per-day", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        total = seed(db, args.users, args.per_day)
+        user_id = db.query(models.User.id).first().id
+        day = (datetime.now(timezone.utc).date() - timedelta(days=3)).strftime("%Y-%m-%d")
+
+        before = timed(legacy_queries, db, args.repeat, user_id, day)
+        after = timed(current_queries, db, args.repeat, user_id, day)
+        db.close()
+        engine.dispose()
+
+    print(f"{total} task instances, {args.users} users, 365 days")
+    print(f"date() predicates : {before * 1000:8.2f} ms (median of {args.repeat})")
+    print(f"shipped endpoints : {after * 1000:8.2f} ms (median of {args.repeat})")
+    print(f"speedup           : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: photo upload transcoding, BytesIO copy + full decode vs in-place draft decode.
+
+Feeds a synthetic phone-sized JPEG (default 4000x3000, 12 MP) through the
+upload path the way ``upload_task_photo`` sees it: already spooled to a
+temporary file by the multipart parser. The legacy path copies the upload
+into a ``BytesIO`` and decodes at full resolution; the shipped path opens
+the spooled file directly and lets ``Image.draft`` decode at reduced scale.
+Each variant runs in a fresh process so peak RSS is comparable. Not
+collected by pytest; run directly:
+
+    python tests/benchmarks/bench_photo_upload.py [--width 4000] [--height 3000] [--runs 5]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from PIL import Image  # noqa: E402
+
+from backend.services import photos  # noqa: E402
+
+
+def legacy_upload(spooled, path: str) -> None:
+    buf = io.BytesIO()
+    spooled.seek(0)
+    while content := spooled.read(1024 * 1024):
+        buf.write(content)
+    buf.seek(0)
+    with Image.open(buf) as img:
+        img = img.convert("RGB")
+        img.thumbnail((photos.MAX_THUMBNAIL_DIM, photos.MAX_THUMBNAIL_DIM), Image.Resampling.LANCZOS)
+        img.save(path, format="WEBP", quality=82, optimize=True)
+
+
+def shipped_upload(spooled, path: str) -> None:
+    # Also encodes the 320 px thumbnail variant the legacy path did not produce
+    photos.transcode(spooled, os.path.dirname(path))
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(variant: str, source: str, runs: int) -> dict:
+    """Run one variant in this process and report its timing and peak RSS growth."""
+    upload = legacy_upload if variant == "legacy" else shipped_upload
+    # Same spooling threshold as Starlette's UploadFile (1 MB), so large uploads live on disk
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    with open(source, "rb") as f:
+        shutil.copyfileobj(f, spooled)
+    out = os.path.join(os.path.dirname(source), f"{variant}.webp")
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    for _ in range(runs):
+        upload(spooled, out)
+    elapsed = time.perf_counter() - start
+    return {"ms": elapsed * 1000 / runs, "peak_mb": peak_rss_mb() - baseline}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--variant", choices=["source", "legacy", "shipped"], help=argparse.SUPPRESS)
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant == "source":
+        # Noise compresses like a real photo; a flat image would decode unrealistically fast
+        Image.effect_noise((args.width, args.height), 64).convert("RGB").save(args.source, format="JPEG", quality=90)
+        return
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.source, args.runs)))
+        return
+
+    def child(variant: str) -> str:
+        # Peak RSS survives fork + exec, so this process never holds a decoded image itself
+        return subprocess.run(
+            [sys.executable, __file__, "--variant", variant, "--source", source, "--runs", str(args.runs),
+             "--width", str(args.width), "--height", str(args.height)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "photo.jpg")
+        child("source")
+        results = {variant: json.loads(child(variant).strip().splitlines()[-1]) for variant in ("legacy", "shipped")}
+        size_mb = os.path.getsize(source) / (1024 * 1024)
+
+    before, after = results["legacy"], results["shipped"]
+    print(f"{args.width}x{args.height} JPEG ({size_mb:.1f} MB), {args.runs} runs per variant")
+    print(f"BytesIO copy + full decode : {before['ms']:8.1f} ms  peak +{before['peak_mb']:6.1f} MB")
+    print(f"in place + draft decode    : {after['ms']:8.1f} ms  peak +{after['peak_mb']:6.1f} MB")
+    print(f"speedup                    : {before['ms'] / after['ms']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: per-request overhead of the shared rate-limit storage vs in-process memory.
+
+Times ``limiter.hit`` with the sliding-window-counter strategy, as slowapi
+calls it once per rate-limited request, against slowapi's ``memory://``
+storage and ``DatabaseStorage`` on a throwaway SQLite file. Hits are spread
+over many client keys; ``--limit`` controls how many of them are rejected
+(rejections skip the write).
+
+Every hit against ``DatabaseStorage`` is its own transaction, so each
+``POST /login/`` pays one extra database commit (the counter upsert) before
+the route runs; the benchmark counts those commits and reports them per
+request. slowapi calls the storage synchronously, which is why ``/login/``
+is a sync route: the commit blocks a threadpool thread, not the event loop.
+
+Not collected by pytest; run directly:
+
+    python tests/benchmarks/bench_rate_limit_storage.py [--requests 5000] [--clients 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from limits import parse  # noqa: E402
+from limits.storage import MemoryStorage  # noqa: E402
+from limits.strategies import SlidingWindowCounterRateLimiter  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.rate_limiter import DatabaseStorage  # noqa: E402
+
+
+def run(storage, requests: int, clients: int, limit: str) -> float:
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    item = parse(limit)
+    start = time.perf_counter()
+    for i in range(requests):
+        limiter.hit(item, f"10.0.{i % clients // 256}.{i % clients % 256}", "/login/")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--limit", default="10/minute")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        models.RateLimitCounter.__table__.create(engine)
+        commits = []
+        event.listen(engine, "commit", lambda conn: commits.append(1))
+        memory = run(MemoryStorage(), args.requests, args.clients, args.limit)
+        database = DatabaseStorage("database://", engine=engine)
+        shared = run(database, args.requests, args.clients, args.limit)
+        commits_per_request = len(commits) / args.requests
+        rows = database.reset()
+        engine.dispose()
+
+    print(f"{args.requests} requests from {args.clients} clients at {args.limit} ({rows} counter rows)")
+    print(f"memory://   : {memory * 1e6 / args.requests:8.1f} us/request (per worker)")
+    print(f"database:// : {shared * 1e6 / args.requests:8.1f} us/request (shared, SQLite), "
+          f"{commits_per_request:.2f} commits/request")
+
+
+if __name__ == "__main__":
+    main()
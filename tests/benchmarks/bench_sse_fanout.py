@@ -0,0 +1,61 @@
+"""
+Benchmark: SSE fan-out, per-client ``json.dumps`` vs the shared pre-encoded frame.
+
+Subscribes N clients to one broadcaster and times broadcasting an event
+and draining every client's queue into wire bytes, the way ``/events``
+writes them. The legacy path re-serializes the message for each client;
+the shipped path reuses ``EventMessage.frame``. Not collected by pytest; run directly:
+
+    python tests/benchmarks/bench_sse_fanout.py [--clients 200] [--events 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from backend.events import EventBroadcaster, orjson  # noqa: E402
+
+PAYLOAD = {"task_id": 42, "instance_id": 4242, "user_id": 3, "nickname": "Bench",
+           "points_awarded": 15, "task_name": "Empty the dishwasher", "streak": 6}
+
+
+def legacy_frame(message: dict) -> bytes:
+    return f"id: {message['id']}\ndata: {json.dumps(message)}\n\n".encode()
+
+
+def shipped_frame(message) -> bytes:
+    return message.frame
+
+
+async def run(clients: int, events: int, encode) -> float:
+    broadcaster = EventBroadcaster(max_queue_size=events + 1, replay_buffer_size=events)
+    subscriptions = [await broadcaster.subscribe() for _ in range(clients)]
+    start = time.perf_counter()
+    for i in range(events):
+        await broadcaster.broadcast("task_completed", {**PAYLOAD, "seq": i})
+        for subscription in subscriptions:
+            encode(await subscription.get())
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    before = asyncio.run(run(args.clients, args.events, legacy_frame))
+    after = asyncio.run(run(args.clients, args.events, shipped_frame))
+
+    print(f"{args.clients} clients x {args.events} events (orjson: {'yes' if orjson else 'no'})")
+    print(f"per-client json.dumps : {before * 1000:8.2f} ms")
+    print(f"shared frame          : {after * 1000:8.2f} ms")
+    print(f"speedup               : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
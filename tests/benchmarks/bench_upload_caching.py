@@ -0,0 +1,84 @@
+"""
+Benchmark: bytes served per dashboard load for /uploads, before and after conditional GET.
+
+Serves N transcoded photos through ``GET /uploads/{filename}`` and counts
+response body bytes for one cold and several warm page loads. Before this
+change the endpoint sent no ``Cache-Control`` and never answered ``304``,
+so every load re-downloaded every photo (emulated by requesting without
+validators). Now a warm load revalidates with ``If-None-Match`` and gets
+empty ``304`` responses; browsers honouring ``immutable`` skip even that.
+The review queue's thumbnails (``?size=thumb``) are shown for comparison.
+Not collected by pytest; run directly:
+
+    python tests/benchmarks/bench_upload_caching.py [--photos 30] [--loads 5]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+os.environ.setdefault("TESTING", "True")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from backend import main as backend_main, models  # noqa: E402
+from backend.dependencies import get_current_user  # noqa: E402
+from backend.services import photos  # noqa: E402
+
+
+def make_photos(directory: Path, count: int) -> list:
+    filenames = []
+    for i in range(count):
+        source = directory / f"source-{i}.png"
+        Image.effect_noise((1600, 1200), 40 + i).convert("RGB").save(source)
+        filenames.append(photos.transcode(str(source), str(directory))["display"])
+        source.unlink()
+    return filenames
+
+
+def dashboard_load(client: TestClient, urls: list, etags: dict, revalidate: bool) -> int:
+    served = 0
+    for url in urls:
+        headers = {"If-None-Match": etags[url]} if revalidate and url in etags else {}
+        resp = client.get(url, headers=headers)
+        assert resp.status_code in (200, 304)
+        if resp.status_code == 200:
+            etags[url] = resp.headers["etag"]
+        served += len(resp.content)
+    return served
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--photos", type=int, default=30)
+    parser.add_argument("--loads", type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    backend_main.app.dependency_overrides[get_current_user] = lambda: models.User(id=1, nickname="Bench")
+    client = TestClient(backend_main.app)
+    with tempfile.TemporaryDirectory() as tmp:
+        backend_main._UPLOADS_DIR = Path(tmp).resolve()
+        filenames = make_photos(backend_main._UPLOADS_DIR, args.photos)
+        display = [f"/uploads/{name}" for name in filenames]
+        thumbs = [f"{url}?size=thumb" for url in display]
+
+        before = [dashboard_load(client, display, {}, revalidate=False) for _ in range(args.loads)]
+        etags: dict = {}
+        after = [dashboard_load(client, display, etags, revalidate=True) for _ in range(args.loads)]
+        thumb_cold = dashboard_load(client, thumbs, {}, revalidate=False)
+
+    kib = 1024
+    print(f"{args.photos} photos, {args.loads} loads")
+    print(f"before: {before[0] / kib:9.1f} KiB cold, {sum(before[1:]) / (args.loads - 1) / kib:9.1f} KiB per warm load")
+    print(f"after : {after[0] / kib:9.1f} KiB cold, {sum(after[1:]) / (args.loads - 1) / kib:9.1f} KiB per warm load")
+    print(f"review grid thumbnails: {thumb_cold / kib:9.1f} KiB cold")
+    print(f"total over {args.loads} loads: {sum(before) / kib:.1f} KiB -> {sum(after) / kib:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
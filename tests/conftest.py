@@ -2,18 +2,24 @@
 Pytest configuration and shared fixtures for ChoreSpec tests.
 """
 from backend.dependencies import get_current_user, get_current_admin_user
+import os
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from backend.database import Base, get_db
+from backend.database import Base, get_db, get_async_db, to_async_database_url
 from backend.main import app
 from backend import models
+from backend.identity_cache import identity_cache
 
-# Use in-memory SQLite for testing
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
+# Use a throwaway SQLite file: the sync test session and the async request
+# path (aiosqlite) are separate connections and must see the same database.
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="chorespec-tests-")
+SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}"
 
 engine = create_engine(
     SQLALCHEMY_TEST_DATABASE_URL,
@@ -23,11 +29,19 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: each TestClient runs its own event loop, so connections must not be reused across tests
+async_engine = create_async_engine(
+    to_async_database_url(SQLALCHEMY_TEST_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test."""
     Base.metadata.create_all(bind=engine)
+    # User ids are reused across fresh databases
+    identity_cache.clear()
     session = TestingSessionLocal()
     try:
         yield session
@@ -64,6 +78,12 @@ def client(db_session, admin_user):
         finally:
             pass
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+        # Writes went through another connection; drop the sync session's cached state
+        db_session.expire_all()
+
     def override_get_current_user():
         return admin_user
 
@@ -71,6 +91,7 @@ def client(db_session, admin_user):
         return admin_user
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     app.dependency_overrides[get_current_user] = override_get_current_user
     app.dependency_overrides[get_current_admin_user] = override_get_current_admin_user
 
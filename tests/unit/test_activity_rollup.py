@@ -0,0 +1,108 @@
+"""
+Unit tests for the daily_user_activity rollup.
+"""
+from datetime import date, datetime, timezone
+
+import pytest
+
+from backend import crud, models, schemas
+from backend.services import activity_rollup
+from backend.services.gamification import award_points_for_task
+from backend.services.rewards import redeem_reward
+from backend.services.users import apply_penalty
+
+NOW = datetime(2025, 3, 10, 18, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def family(seeded_db):
+    child = models.User(nickname="RollupKid", login_pin="1111", role_id=4, current_points=500)
+    sibling = models.User(nickname="RollupSib", login_pin="2222", role_id=4)
+    task = models.Task(name="Sweep", description="Sweep floor", base_points=10,
+                       schedule_type="daily", default_due_time="17:00")
+    reward = models.Reward(name="Movie", cost_points=40)
+    seeded_db.add_all([child, sibling, task, reward])
+    seeded_db.commit()
+    return {"child": child, "sibling": sibling, "task": task, "reward": reward}
+
+
+def _rollup(db, user_id, day=NOW.date()):
+    return db.query(models.DailyUserActivity).filter(
+        models.DailyUserActivity.user_id == user_id,
+        models.DailyUserActivity.local_date == day,
+    ).first()
+
+
+def _complete(db, task, user, when=NOW):
+    instance = models.TaskInstance(task_id=task.id, user_id=user.id, status="PENDING", due_time=when)
+    db.add(instance)
+    db.commit()
+    return award_points_for_task(db, instance, current_time=when)
+
+
+def test_completion_updates_rollup(seeded_db, family):
+    first = _complete(seeded_db, family["task"], family["child"])
+    _complete(seeded_db, family["task"], family["child"])
+
+    row = _rollup(seeded_db, family["child"].id)
+    earned = seeded_db.query(models.Transaction).filter(
+        models.Transaction.user_id == family["child"].id,
+        models.Transaction.type == "EARN",
+    ).all()
+    assert first.status == "COMPLETED"
+    assert row.completed_count == 2
+    assert row.points_earned == sum(t.awarded_points for t in earned)
+
+
+def test_redeem_and_penalty_update_rollup(seeded_db, family):
+    child = family["child"]
+    redeem_reward(seeded_db, child.id, family["reward"].id, current_time=NOW)
+    apply_penalty(seeded_db, child.id, schemas.PenaltyRequest(points=15, reason="Mess"), current_time=NOW)
+
+    row = _rollup(seeded_db, child.id)
+    assert row.redeemed_points == 40
+    assert row.penalty_points == 15
+    assert row.completed_count == 0
+
+
+def test_recurring_completion_counts_for_every_closed_instance(seeded_db, family):
+    task = models.Task(name="Water plants", description="Water", base_points=5,
+                       schedule_type="recurring", default_due_time="23:59",
+                       recurrence_min_days=2, recurrence_max_days=5)
+    seeded_db.add(task)
+    seeded_db.commit()
+    seeded_db.add(models.TaskInstance(
+        task_id=task.id, user_id=family["sibling"].id, status="PENDING", due_time=NOW))
+    seeded_db.commit()
+
+    _complete(seeded_db, task, family["child"])
+
+    assert _rollup(seeded_db, family["child"].id).completed_count == 1
+    assert _rollup(seeded_db, family["sibling"].id).completed_count == 1
+
+
+def test_rebuild_matches_incremental_rollup(seeded_db, family):
+    child = family["child"]
+    _complete(seeded_db, family["task"], child)
+    _complete(seeded_db, family["task"], child, when=datetime(2025, 3, 11, 8, 0, tzinfo=timezone.utc))
+    redeem_reward(seeded_db, child.id, family["reward"].id, current_time=NOW)
+
+    def snapshot():
+        return sorted(
+            (r.user_id, r.local_date, r.completed_count, r.points_earned, r.penalty_points, r.redeemed_points)
+            for r in seeded_db.query(models.DailyUserActivity).all()
+        )
+
+    incremental = snapshot()
+    assert activity_rollup.rebuild_daily_activity(seeded_db) == 2
+    seeded_db.expire_all()
+    assert snapshot() == incremental
+    assert {row[1] for row in incremental} == {date(2025, 3, 10), date(2025, 3, 11)}
+
+
+def test_delete_user_removes_rollup_rows(seeded_db, family):
+    child = family["child"]
+    _complete(seeded_db, family["task"], child)
+
+    assert crud.delete_user(seeded_db, child.id) is True
+    assert seeded_db.query(models.DailyUserActivity).count() == 0
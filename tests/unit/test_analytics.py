@@ -4,6 +4,7 @@ Unit tests for Analytics operations.
 """
 from datetime import datetime, timedelta
 from backend import models
+from backend.services.activity_rollup import rebuild_daily_activity
 
 
 class TestAnalytics:
@@ -72,6 +73,8 @@ class TestAnalytics:
 
         seeded_db.add_all([t1, t2, t3])
         seeded_db.commit()
+        # Instances were inserted directly, bypassing the rollup write path
+        rebuild_daily_activity(seeded_db)
 
         # Act
         response = client.get("/analytics/weekly")
@@ -202,6 +205,7 @@ class TestAnalytics:
         )
         seeded_db.add_all([t1, t2, t3])
         seeded_db.commit()
+        rebuild_daily_activity(seeded_db)
 
         response = client.get("/analytics/heatmap", params={"days": 30})
         assert response.status_code == 200
@@ -290,6 +294,7 @@ class TestAnalytics:
             completed_at=datetime.utcnow(),
         ))
         seeded_db.commit()
+        rebuild_daily_activity(seeded_db)
 
         response = client.get("/analytics/summary")
         assert response.status_code == 200
@@ -407,3 +412,51 @@ def test_heatmap_details_unknown_user_returns_404(client, seeded_db):
         params={"user_id": 99999, "date": "2024-01-01"},
     )
     assert resp.status_code == 404
+
+
+def test_heatmap_details_range_is_half_open(client, seeded_db):
+    """Completions at midnight belong to the day they start, not the day before."""
+    role = seeded_db.query(models.Role).filter(models.Role.name == "Child").first()
+    user = models.User(nickname="BoundaryUser", login_pin="0000", role_id=role.id)
+    task = models.Task(name="Boundary", description="Boundary test", base_points=5, default_due_time="08:00")
+    seeded_db.add_all([user, task])
+    seeded_db.commit()
+
+    for completed in (datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 23, 59, 59), datetime(2024, 1, 2, 0, 0)):
+        seeded_db.add(models.TaskInstance(
+            task_id=task.id, user_id=user.id, status="COMPLETED",
+            due_time=completed, completed_at=completed,
+        ))
+    seeded_db.commit()
+
+    resp = client.get(
+        "/analytics/heatmap/details",
+        params={"user_id": user.id, "date": "2024-01-01"},
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()["tasks"]) == 2
+
+
+def test_summary_agrees_with_details_after_task_delete(client, seeded_db):
+    """Deleting a task removes its completions from the rollup-backed views too."""
+    from backend.services.gamification import award_points_for_task
+
+    role = seeded_db.query(models.Role).filter(models.Role.name == "Child").first()
+    user = models.User(nickname="DeleteRollupUser", login_pin="0000", role_id=role.id)
+    kept = models.Task(name="Kept", description="Stays", base_points=5, default_due_time="08:00")
+    doomed = models.Task(name="Doomed", description="Deleted", base_points=5, default_due_time="08:00")
+    seeded_db.add_all([user, kept, doomed])
+    seeded_db.commit()
+    for task in (kept, doomed, doomed):
+        instance = models.TaskInstance(task_id=task.id, user_id=user.id, status="PENDING", due_time=datetime.utcnow())
+        seeded_db.add(instance)
+        seeded_db.commit()
+        award_points_for_task(seeded_db, instance)
+
+    assert client.delete(f"/tasks/{doomed.id}").status_code == 200
+
+    today = datetime.utcnow().date().strftime("%Y-%m-%d")
+    details = client.get("/analytics/heatmap/details", params={"user_id": user.id, "date": today}).json()
+    summary = client.get("/analytics/summary").json()
+    assert [t["task_name"] for t in details["tasks"]] == ["Kept"]
+    assert summary["week_total_tasks"] == len(details["tasks"]) == 1
@@ -0,0 +1,122 @@
+"""
+Unit tests for the versioned change log behind GET /sync.
+"""
+from datetime import datetime, timedelta
+
+from backend import crud, models, schemas
+from backend.services import change_log, notifications
+
+
+def _user(db, nickname):
+    role = db.query(models.Role).filter(models.Role.name == "Child").first()
+    user = models.User(nickname=nickname, login_pin="0000", role_id=role.id)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _task(db, name="SyncTask"):
+    task = models.Task(name=name, description="D", base_points=10,
+                       schedule_type="daily", default_due_time="10:00")
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_orm_writes_append_versions(seeded_db):
+    start = change_log.current_version(seeded_db)
+    task = _task(seeded_db)
+    task.base_points = 20
+    seeded_db.commit()
+
+    entries = seeded_db.query(models.ChangeLogEntry).filter(
+        models.ChangeLogEntry.version > start).order_by(models.ChangeLogEntry.version).all()
+    assert [(e.entity, e.entity_id, e.deleted) for e in entries] == [
+        ("tasks", task.id, False), ("tasks", task.id, False)]
+    assert entries[0].version < entries[1].version
+
+
+def test_changes_collapse_to_current_state_and_deletions(seeded_db):
+    user = _user(seeded_db, "SyncKid")
+    since = change_log.current_version(seeded_db)
+
+    task = _task(seeded_db)
+    task.name = "Renamed"
+    seeded_db.commit()
+    doomed = _task(seeded_db, "Doomed")
+    instance = models.TaskInstance(task_id=doomed.id, user_id=user.id, due_time=datetime.now(), status="PENDING")
+    seeded_db.add(instance)
+    seeded_db.commit()
+    doomed_id, instance_id = doomed.id, instance.id
+    crud.delete_task(seeded_db, doomed_id)
+
+    changes = change_log.get_changes(seeded_db, user.id, since)
+    assert changes.reset is False and changes.has_more is False
+    assert changes.version == change_log.current_version(seeded_db)
+    assert [t.name for t in changes.tasks.upserted] == ["Renamed"]
+    assert changes.tasks.deleted == [doomed_id]
+    # Bulk-deleted instances are logged too
+    assert changes.task_instances.deleted == [instance_id]
+    assert changes.users.upserted == []
+
+    # Nothing new since the returned version
+    again = change_log.get_changes(seeded_db, user.id, changes.version)
+    assert again.tasks == again.task_instances == schemas.EntityChanges()
+
+
+def test_notifications_are_scoped_to_their_owner(seeded_db):
+    kid, sibling = _user(seeded_db, "Owner"), _user(seeded_db, "Sibling")
+    since = change_log.current_version(seeded_db)
+    notifications.create_notification(seeded_db, schemas.NotificationCreate(
+        user_id=kid.id, type="SYSTEM", title="Hi", message="Only for you"))
+    notifications.mark_all_notifications_read(seeded_db, kid.id)
+
+    mine = change_log.get_changes(seeded_db, kid.id, since)
+    theirs = change_log.get_changes(seeded_db, sibling.id, since)
+    assert [n.read for n in mine.notifications.upserted] == [True]
+    assert theirs.notifications.upserted == []
+    assert theirs.version == mine.version
+
+
+def test_paging_reports_has_more(seeded_db):
+    _task(seeded_db, "Before")
+    since = change_log.current_version(seeded_db)
+    for i in range(3):
+        _task(seeded_db, f"Paged{i}")
+
+    first = change_log.get_changes(seeded_db, 1, since, limit=2)
+    assert first.has_more is True
+    assert [t.name for t in first.tasks.upserted] == ["Paged0", "Paged1"]
+    rest = change_log.get_changes(seeded_db, 1, first.version, limit=2)
+    assert rest.has_more is False
+    assert [t.name for t in rest.tasks.upserted] == ["Paged2"]
+
+
+def test_pruned_history_forces_a_snapshot(seeded_db):
+    user = _user(seeded_db, "Late")
+    _task(seeded_db)
+    since = change_log.current_version(seeded_db)
+    _task(seeded_db, "After")
+
+    assert change_log.prune_change_log(seeded_db, retention_days=0, now=datetime.now() + timedelta(days=1)) > 0
+
+    snapshot = change_log.get_changes(seeded_db, user.id, since - 1)
+    assert snapshot.reset is True
+    assert {t.name for t in snapshot.tasks.upserted} == {"SyncTask", "After"}
+    assert [u.nickname for u in snapshot.users.upserted] == ["Late"]
+    # Clients that were fully caught up keep patching
+    assert change_log.get_changes(seeded_db, user.id, snapshot.version).reset is False
+
+
+def test_sync_endpoint_returns_snapshot_then_deltas(client, seeded_db):
+    first = client.get("/sync")
+    assert first.status_code == 200
+    body = first.json()
+    assert body["reset"] is True
+    assert [u["nickname"] for u in body["users"]["upserted"]] == ["TestAdmin"]
+
+    _task(seeded_db, "FromSync")
+    delta = client.get("/sync", params={"since": body["version"]}).json()
+    assert delta["reset"] is False
+    assert [t["name"] for t in delta["tasks"]["upserted"]] == ["FromSync"]
+    assert delta["version"] > body["version"]
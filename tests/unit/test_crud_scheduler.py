@@ -116,3 +116,104 @@ def test_generate_daily_instances_recurring(db_session, scheduler_setup):
 
     count = scheduler.generate_daily_instances(db_session)
     assert count == 1  # Only U1 gets a new one
+
+
+def test_generate_daily_instances_statement_count_is_flat(db_session, scheduler_setup):
+    # Many tasks x many users must not fan out into per-pair queries
+    from sqlalchemy import event
+
+    role = scheduler_setup["role"]
+    db_session.add_all([
+        models.User(nickname=f"Bulk{i}", login_pin="0000", role_id=role.id)
+        for i in range(10)
+    ])
+    db_session.add_all([
+        models.Task(name=f"Bulk{i}", description="B", base_points=10,
+                    schedule_type="daily", default_due_time="10:00")
+        for i in range(10)
+    ])
+    db_session.commit()
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        report = scheduler.generate_daily_instances_report(db_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    # 10 tasks x 12 users (U1, U2 + 10 bulk users)
+    assert report.created == 120
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    # One batch for the instances, one for their sync change-log entries
+    assert [s.split("(")[0].split()[-1] for s in inserts] == ["task_instances", "change_log"]
+    assert len(statements) <= 6
+    assert set(report.timings) == {"load", "plan", "insert"}
+
+    # Second pass finds every pair already present
+    assert scheduler.generate_daily_instances(db_session) == 0
+
+
+def test_generate_daily_instances_sets_due_date_key(db_session, scheduler_setup):
+    task = models.Task(
+        name="Keyed", description="K", base_points=10,
+        schedule_type="daily", default_due_time="10:00"
+    )
+    db_session.add(task)
+    db_session.commit()
+
+    reference = datetime(2026, 3, 2, 6, 0)
+    scheduler.generate_daily_instances(db_session, reference_time=reference)
+
+    instances = db_session.query(models.TaskInstance).filter(
+        models.TaskInstance.task_id == task.id).all()
+    assert len(instances) == 2
+    assert {i.due_date for i in instances} == {reference.date()}
+
+
+def test_concurrent_reset_conflicts_are_ignored(db_session, scheduler_setup):
+    # Simulates a second worker that planned the same rows before either committed
+    task = models.Task(
+        name="Raced", description="R", base_points=10,
+        schedule_type="daily", default_due_time="10:00"
+    )
+    db_session.add(task)
+    db_session.commit()
+
+    now = datetime.now()
+    rows = [
+        {"task_id": task.id, "user_id": u.id, "due_time": now,
+         "due_date": now.date(), "status": "PENDING"}
+        for u in (scheduler_setup["u1"], scheduler_setup["u2"])
+    ]
+    assert scheduler._insert_ignoring_conflicts(db_session, rows) == 2
+    assert scheduler._insert_ignoring_conflicts(db_session, rows) == 0
+    db_session.commit()
+
+    assert scheduler.generate_daily_instances(db_session) == 0
+    assert db_session.query(models.TaskInstance).filter(
+        models.TaskInstance.task_id == task.id).count() == 2
+
+
+def test_duplicate_day_key_rejected_by_database(db_session, scheduler_setup):
+    from sqlalchemy.exc import IntegrityError
+
+    task = models.Task(
+        name="Unique", description="U", base_points=10,
+        schedule_type="daily", default_due_time="10:00"
+    )
+    db_session.add(task)
+    db_session.commit()
+
+    now = datetime.now()
+    for _ in range(2):
+        db_session.add(models.TaskInstance(
+            task_id=task.id, user_id=scheduler_setup["u1"].id,
+            due_time=now, due_date=now.date(), status="PENDING"))
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+    db_session.rollback()
@@ -82,3 +82,44 @@ def test_get_all_transactions(db_session, seeded_db):
     txs_search = crud.get_all_transactions(db_session, search="Unique")
     assert len(txs_search) == 1
     assert txs_search[0].description == "UniqueTaskName"
+
+
+def test_search_uses_substring_full_text_index(db_session, seeded_db):
+    role = db_session.query(models.Role).first()
+    user = models.User(nickname="SearchUser", login_pin="1", role_id=role.id)
+    db_session.add(user)
+    db_session.commit()
+
+    def add(description):
+        txn = models.Transaction(
+            user_id=user.id, type="EARN", base_points_value=1, multiplier_used=1,
+            awarded_points=1, timestamp=datetime.now(), description=description
+        )
+        db_session.add(txn)
+        db_session.commit()
+        return txn
+
+    dishes = add("Completed task: Wash Dishes")
+    add("Redeemed reward: Movie Night")
+    add('Bonus for the "big" clean-up')
+
+    def search(term):
+        return {t.description for t in crud.get_user_transactions(db_session, user.id, search=term)}
+
+    # Case-insensitive substring, like the old ILIKE
+    assert search("dish") == {"Completed task: Wash Dishes"}
+    assert search("MOVIE") == {"Redeemed reward: Movie Night"}
+    # Quotes in the term are matched literally
+    assert search('"big"') == {'Bonus for the "big" clean-up'}
+    # Terms shorter than a trigram still work
+    assert search("Mo") == {"Redeemed reward: Movie Night"}
+
+    # The index follows updates and deletes
+    dishes.description = "Completed task: Vacuum"
+    db_session.commit()
+    assert search("dish") == set()
+    assert search("vacuum") == {"Completed task: Vacuum"}
+
+    db_session.delete(dishes)
+    db_session.commit()
+    assert search("vacuum") == set()
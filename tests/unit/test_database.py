@@ -0,0 +1,18 @@
+"""
+Unit tests for the async database URL mapping.
+"""
+from backend.database import to_async_database_url
+
+
+def test_sqlite_url_uses_aiosqlite():
+    assert to_async_database_url("sqlite:///./sql_app.db") == "sqlite+aiosqlite:///./sql_app.db"
+
+
+def test_postgres_urls_use_asyncpg():
+    assert to_async_database_url("postgresql://u:p@db:5432/chores") == "postgresql+asyncpg://u:p@db:5432/chores"
+    assert to_async_database_url("postgres://u:p@db/chores") == "postgresql+asyncpg://u:p@db/chores"
+    assert to_async_database_url("postgresql+psycopg2://u:p@db/chores") == "postgresql+asyncpg://u:p@db/chores"
+
+
+def test_unknown_url_is_left_untouched():
+    assert to_async_database_url("mysql://u:p@db/chores") == "mysql://u:p@db/chores"
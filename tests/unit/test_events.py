@@ -0,0 +1,254 @@
+"""
+Unit tests for the bounded SSE EventBroadcaster.
+"""
+import asyncio
+import json
+
+from backend.events import (
+    ADMIN, FAMILY_FEED, REVIEW_QUEUE, EventBroadcaster, OverflowPolicy, resolve_topics, user_topic,
+)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(await subscription.get())
+    return events
+
+
+def test_broadcast_reaches_every_client():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=5)
+        a, b = await broadcaster.subscribe(), await broadcaster.subscribe()
+        await broadcaster.broadcast("task_created", {"task_id": 1})
+        return broadcaster, await _drain(a), await _drain(b)
+
+    broadcaster, a_events, b_events = _run(scenario())
+    assert a_events == b_events == [
+        {"id": f"{broadcaster.epoch}:1", "type": "task_created", "data": {"task_id": 1}}]
+
+
+def test_drop_oldest_bounds_a_stalled_client_only():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=3, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        stalled, healthy = await broadcaster.subscribe(), await broadcaster.subscribe()
+        for i in range(5):
+            await broadcaster.broadcast("task_completed", {"instance_id": i})
+            await healthy.get()
+        return stalled, await _drain(stalled), broadcaster.stats()
+
+    stalled, events, stats = _run(scenario())
+    assert [e["data"]["instance_id"] for e in events] == [2, 3, 4]
+    assert stalled.stats.dropped == 2
+    assert stalled.stats.max_queued == 3
+    healthy_stats = [c for c in stats["clients"] if c["client_id"] != stalled.stats.client_id][0]
+    assert healthy_stats["dropped"] == 0
+    assert healthy_stats["delivered"] == 5
+
+
+def test_coalesce_collapses_duplicate_events():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=3, overflow_policy=OverflowPolicy.COALESCE)
+        client = await broadcaster.subscribe()
+        await broadcaster.broadcast("notification", {"user_id": 1})
+        await broadcaster.broadcast("task_created", {"task_id": 7})
+        await broadcaster.broadcast("notification", {"user_id": 2})
+        # Queue is full; the duplicate for user 1 collapses instead of dropping anything else
+        await broadcaster.broadcast("notification", {"user_id": 1})
+        return client, await _drain(client)
+
+    client, events = _run(scenario())
+    assert [(e["type"], e["data"]) for e in events] == [
+        ("task_created", {"task_id": 7}),
+        ("notification", {"user_id": 2}),
+        ("notification", {"user_id": 1}),
+    ]
+    # The surviving duplicate is the newest event
+    assert events[-1]["id"].endswith(":4")
+    assert client.stats.coalesced == 1
+    assert client.stats.dropped == 0
+
+
+def test_coalesce_falls_back_to_drop_oldest():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=2, overflow_policy=OverflowPolicy.COALESCE)
+        client = await broadcaster.subscribe()
+        for i in range(3):
+            await broadcaster.broadcast("task_created", {"task_id": i})
+        return client, await _drain(client)
+
+    client, events = _run(scenario())
+    assert [e["data"]["task_id"] for e in events] == [1, 2]
+    assert client.stats.dropped == 1
+
+
+def test_disconnect_policy_closes_only_the_slow_stream():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=2, overflow_policy=OverflowPolicy.DISCONNECT)
+        slow, fast = await broadcaster.subscribe(), await broadcaster.subscribe()
+        for i in range(3):
+            await broadcaster.broadcast("task_created", {"task_id": i})
+            await fast.get()
+        return broadcaster, slow, await slow.get()
+
+    broadcaster, slow, message = _run(scenario())
+    assert message is None
+    assert slow.closed is True
+    assert len(broadcaster.clients) == 1
+    assert broadcaster.stats()["disconnected_slow_clients"] == 1
+
+
+def test_sse_stats_endpoint_reports_policy(client):
+    resp = client.get("/events/stats")
+    assert resp.status_code == 200
+    assert resp.json()["overflow_policy"] in {p.value for p in OverflowPolicy}
+
+
+def test_resolve_topics_from_identity():
+    assert resolve_topics(3, is_admin=False) == {"user:3", FAMILY_FEED}
+    assert resolve_topics(1, is_admin=True) == {"user:1", FAMILY_FEED, REVIEW_QUEUE, ADMIN}
+    # Narrowing, with "user" as an alias for the caller's own topic
+    assert resolve_topics(3, is_admin=False, requested="user") == {"user:3"}
+    # Other users' topics and admin topics are never granted to a non-admin
+    assert resolve_topics(3, is_admin=False, requested="user:4,admin,review-queue") == frozenset()
+
+
+def test_events_are_routed_only_to_matching_topics():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=10)
+        kid = await broadcaster.subscribe(resolve_topics(3, is_admin=False))
+        parent = await broadcaster.subscribe(resolve_topics(1, is_admin=True))
+        tablet = await broadcaster.subscribe([FAMILY_FEED])
+
+        await broadcaster.broadcast("notification", {"user_id": 3}, topics=[user_topic(3)])
+        await broadcaster.broadcast("user_penalized", {"user_id": 4}, topics=[ADMIN, user_topic(4)])
+        # A client on several of the topics gets the event once
+        await broadcaster.broadcast("task_completed", {"user_id": 3}, topics=[FAMILY_FEED, user_topic(3)])
+        return [[e["type"] for e in await _drain(s)] for s in (kid, parent, tablet)], broadcaster
+
+    (kid, parent, tablet), broadcaster = _run(scenario())
+    assert kid == ["notification", "task_completed"]
+    assert parent == ["user_penalized", "task_completed"]
+    assert tablet == ["task_completed"]
+
+
+def test_unsubscribe_removes_topic_index_entries():
+    async def scenario():
+        broadcaster = EventBroadcaster()
+        sub = await broadcaster.subscribe([FAMILY_FEED, user_topic(9)])
+        broadcaster.unsubscribe(sub)
+        return broadcaster.stats()
+
+    stats = _run(scenario())
+    assert stats["connected_clients"] == 0
+    assert stats["topics"] == {}
+
+
+def test_sse_rejects_topics_outside_the_token(client, seeded_db):
+    from backend import models
+    from backend.security import create_access_token
+
+    role = seeded_db.query(models.Role).filter(models.Role.name == "Child").first()
+    kid = models.User(nickname="TopicKid", login_pin="1", role_id=role.id)
+    seeded_db.add(kid)
+    seeded_db.commit()
+
+    token = create_access_token({"sub": str(kid.id)})
+    resp = client.get("/events", params={"token": token, "topics": "admin,review-queue"})
+    assert resp.status_code == 403
+
+    unknown = create_access_token({"sub": "99999"})
+    assert client.get("/events", params={"token": unknown}).status_code == 401
+
+
+def test_reconnect_replays_missed_events_for_its_topics():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=10)
+        first = await broadcaster.subscribe([FAMILY_FEED])
+        await broadcaster.broadcast("task_created", {"task_id": 1}, topics=[FAMILY_FEED])
+        last_seen = (await first.get())["id"]
+        broadcaster.unsubscribe(first)
+
+        await broadcaster.broadcast("task_completed", {"task_id": 1}, topics=[FAMILY_FEED])
+        await broadcaster.broadcast("user_penalized", {"user_id": 4}, topics=[ADMIN])
+        await broadcaster.broadcast("task_deleted", {"task_id": 1}, topics=[FAMILY_FEED])
+
+        resumed = await broadcaster.subscribe([FAMILY_FEED], last_event_id=last_seen)
+        return await _drain(resumed), broadcaster.stats()["replay"]
+
+    events, replay = _run(scenario())
+    assert [e["type"] for e in events] == ["task_completed", "task_deleted"]
+    assert replay["replayed_events"] == 2
+    assert replay["resyncs"] == 0
+
+
+def test_reconnect_resyncs_when_the_gap_is_not_buffered():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=10, replay_buffer_size=3)
+        await broadcaster.broadcast("task_created", {"task_id": 0})
+        stale_id = broadcaster.last_event_id
+        for i in range(1, 5):
+            await broadcaster.broadcast("task_created", {"task_id": i})
+
+        evicted = await broadcaster.subscribe(last_event_id=stale_id)
+        other_process = await broadcaster.subscribe(last_event_id="0badc0de:2")
+        garbage = await broadcaster.subscribe(last_event_id="not-an-id")
+        current = await broadcaster.subscribe(last_event_id=broadcaster.last_event_id)
+        return ([await _drain(s) for s in (evicted, other_process, garbage, current)],
+                broadcaster.last_event_id, broadcaster.stats()["replay"])
+
+    (evicted, other_process, garbage, current), last_id, replay = _run(scenario())
+    for events in (evicted, other_process, garbage):
+        assert events == [{"id": last_id, "type": "resync", "data": None}]
+    assert current == []
+    assert replay["resyncs"] == 3
+
+
+def test_reconnect_resyncs_when_replay_exceeds_the_queue():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=2, replay_buffer_size=50)
+        start = broadcaster.last_event_id
+        for i in range(3):
+            await broadcaster.broadcast("task_created", {"task_id": i})
+        return await _drain(await broadcaster.subscribe(last_event_id=start))
+
+    assert [e["type"] for e in _run(scenario())] == ["resync"]
+
+
+def test_broadcast_encodes_one_frame_shared_by_all_clients():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=5)
+        a, b = await broadcaster.subscribe(), await broadcaster.subscribe()
+        await broadcaster.broadcast("task_created", {"task_id": 1})
+        return await a.get(), await b.get()
+
+    a_event, b_event = _run(scenario())
+    assert a_event.frame is b_event.frame
+    id_line, data_line, *_ = a_event.frame.split(b"\n")
+    assert id_line == f"id: {a_event['id']}".encode()
+    assert json.loads(data_line[len(b"data: "):]) == a_event
+
+
+def test_json_fallback_matches_orjson(monkeypatch):
+    from backend import events
+
+    message = {"type": "task_created", "data": {"task_id": 1, "name": "Zähne putzen"}}
+    encoded = events.encode_json(message)
+    monkeypatch.setattr(events, "orjson", None)
+    assert json.loads(events.encode_json(message)) == json.loads(encoded) == message
+    assert events.KEEPALIVE_FRAME == b'data: {"type":"ping"}\n\n'
+
+
+def test_bus_messages_without_a_type_are_dropped():
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue_size=5)
+        client = await broadcaster.subscribe()
+        broadcaster._deliver_remote({"data": {"task_id": 1}, "topics": None})
+        broadcaster._deliver_remote({"type": "task_deleted", "data": {"task_id": 1}, "topics": None})
+        return await _drain(client)
+
+    assert [e["type"] for e in _run(scenario())] == ["task_deleted"]
@@ -1,6 +1,8 @@
 import pytest
 from datetime import datetime, timezone
 from backend.services.gamification import award_points_for_task, reset_expired_streaks
+from backend.services.tasks import complete_task_instances
+from backend.exceptions import InvalidStateTransitionError
 from backend import models
 
 
@@ -145,6 +147,66 @@ def test_streak_missed_day(db_session, setup_test_users):
     assert _awarded_points(db_session, inst2.id) == 155  # Streak broke, so back to base + daily_bonus
 
 
+def _instances(db, user, count, photo=False):
+    instances = []
+    for i in range(count):
+        task = models.Task(name=f"{user.nickname} T{i}", description="yes", default_due_time="12:00",
+                           base_points=100, schedule_type="daily", requires_photo_verification=photo)
+        db.add(task)
+        db.commit()
+        instance = models.TaskInstance(task_id=task.id, user_id=user.id, status="PENDING",
+                                       due_time=datetime(2025, 1, 2, 12, 0, tzinfo=timezone.utc))
+        db.add(instance)
+        db.commit()
+        instances.append(instance)
+    return instances
+
+
+def test_batch_completion_matches_one_by_one(db_session, setup_test_users):
+    """Several same-day completions in one batch: streak advances once, daily bonus once"""
+    child = setup_test_users["child"]
+    twin = models.User(nickname="Twin", login_pin="4444", role_id=child.role_id)
+    db_session.add(twin)
+    for user in (child, twin):
+        user.current_streak = 2
+        user.last_task_date = datetime(2025, 1, 1).date()
+    db_session.commit()
+    now = datetime(2025, 1, 2, 18, 0, tzinfo=timezone.utc)
+
+    one_by_one = _instances(db_session, twin, 3)
+    for instance in one_by_one:
+        award_points_for_task(db_session, instance, current_time=now)
+
+    batch = _instances(db_session, child, 3)
+    result = complete_task_instances(
+        db_session, [i.id for i in batch] + [batch[0].id], actual_user_id=child.id, current_time=now)
+
+    assert result.instance_ids == [i.id for i in batch]
+    assert child.current_streak == twin.current_streak == 3
+    # Only the first completion of the day gets the daily bonus: 100 * (1.5 + 0.2) (+ 5)
+    assert [result.completed[i.id] for i in batch] == [_awarded_points(db_session, i.id) for i in one_by_one]
+    assert [result.completed[i.id] for i in batch] == [175, 170, 170]
+    assert child.current_points == twin.current_points == 515
+    [notification] = result.notifications
+    assert notification.user_id == child.id
+    assert notification.message == "You earned 515 points for 3 tasks."
+
+
+def test_batch_completion_is_all_or_nothing(db_session, setup_test_users):
+    """A photo task without a photo fails the batch before anything changes"""
+    child = setup_test_users["child"]
+    [plain] = _instances(db_session, child, 1)
+    [photo] = _instances(db_session, child, 1, photo=True)
+
+    with pytest.raises(InvalidStateTransitionError):
+        complete_task_instances(db_session, [plain.id, photo.id], actual_user_id=child.id)
+
+    db_session.refresh(plain)
+    assert plain.status == "PENDING"
+    assert child.current_streak == 0
+    assert db_session.query(models.Transaction).count() == 0
+
+
 def test_reset_expired_streaks(db_session, setup_test_users):
     """cronjob function should zero out expired streaks"""
     child = setup_test_users["child"]
@@ -0,0 +1,116 @@
+"""
+Unit tests for the authenticated-identity cache used by get_current_user.
+"""
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+from backend import crud, models, schemas
+from backend.dependencies import get_current_user, is_admin
+from backend.identity_cache import IdentityCache, identity_cache
+from backend.security import create_access_token
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _user(db, nickname, role_name="Child"):
+    role = db.query(models.Role).filter(models.Role.name == role_name).first()
+    user = models.User(nickname=nickname, login_pin="0000", role_id=role.id)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _authenticate(db, user_id):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": str(user_id)}))
+    return get_current_user(request=None, credentials=credentials, db=db)
+
+
+def _count_queries(db, fn):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return result, len(statements)
+
+
+def test_cache_hits_skip_the_database(seeded_db):
+    user_id = _user(seeded_db, "CachedKid").id
+
+    first, first_queries = _count_queries(seeded_db, lambda: _authenticate(seeded_db, user_id))
+    second, second_queries = _count_queries(seeded_db, lambda: _authenticate(seeded_db, user_id))
+
+    # Miss: one joined query for user + role; hit: none
+    assert first_queries == 1
+    assert second_queries == 0
+    assert second is first
+    assert second.role.name == "Child" and is_admin(second) is False
+    assert identity_cache.stats()["hits"] >= 1
+
+
+def test_snapshot_outlives_its_session(seeded_db):
+    user = _user(seeded_db, "Detached", role_name="Admin")
+    snapshot = _authenticate(seeded_db, user.id)
+    seeded_db.close()
+
+    assert snapshot.id == user.id
+    assert is_admin(snapshot)
+
+
+def test_role_change_invalidates_cached_identity(seeded_db):
+    user = _user(seeded_db, "Promoted")
+    assert is_admin(_authenticate(seeded_db, user.id)) is False
+
+    admin_role = seeded_db.query(models.Role).filter(models.Role.name == "Admin").first()
+    crud.update_user(seeded_db, user.id, schemas.UserUpdate(role_id=admin_role.id))
+
+    assert is_admin(_authenticate(seeded_db, user.id)) is True
+
+
+def test_multiplier_change_invalidates_role_holders(seeded_db):
+    kid, other = _user(seeded_db, "RoleKid"), _user(seeded_db, "OtherRole", role_name="Teenager")
+    _authenticate(seeded_db, kid.id)
+    _authenticate(seeded_db, other.id)
+
+    crud.update_role_multiplier(seeded_db, kid.role_id, 2.0)
+
+    assert identity_cache.get(kid.id) is None
+    assert identity_cache.get(other.id) is not None
+    assert _authenticate(seeded_db, kid.id).role.multiplier_value == 2.0
+
+
+def test_ttl_expiry_and_lru_eviction(seeded_db):
+    clock = FakeClock()
+    cache = IdentityCache(max_size=2, ttl_seconds=10, clock=clock)
+    a, b, c = (_user(seeded_db, name) for name in ("A", "B", "C"))
+
+    cache.put(a)
+    cache.put(b)
+    assert cache.get(a.id) is not None  # a is now most recently used
+    cache.put(c)
+    assert cache.get(b.id) is None
+    assert cache.stats()["evictions"] == 1
+
+    clock.now = 11
+    assert cache.get(a.id) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 1)
+
+
+def test_zero_ttl_disables_caching(seeded_db):
+    cache = IdentityCache(ttl_seconds=0)
+    user = _user(seeded_db, "Uncached")
+    cache.put(user)
+    assert cache.get(user.id) is None
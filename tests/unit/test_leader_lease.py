@@ -0,0 +1,87 @@
+"""
+Unit tests for the scheduler leader-election lease.
+"""
+from datetime import datetime, timedelta
+
+from backend.services import leader_lease
+from backend.services.leader_lease import LeaderElector, try_acquire_lease, release_lease, get_lease
+
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_first_worker_acquires_lease(db_session):
+    assert try_acquire_lease(db_session, "scheduler", "worker-a", 60, now=NOW) is True
+
+    lease = get_lease(db_session)
+    assert lease.owner_id == "worker-a"
+    assert lease.expires_at == NOW + timedelta(seconds=60)
+
+
+def test_second_worker_blocked_while_lease_is_live(db_session):
+    try_acquire_lease(db_session, "scheduler", "worker-a", 60, now=NOW)
+
+    assert try_acquire_lease(db_session, "scheduler", "worker-b", 60, now=NOW + timedelta(seconds=30)) is False
+    assert get_lease(db_session).owner_id == "worker-a"
+
+
+def test_holder_renews_heartbeat(db_session):
+    try_acquire_lease(db_session, "scheduler", "worker-a", 60, now=NOW)
+    later = NOW + timedelta(seconds=20)
+
+    assert try_acquire_lease(db_session, "scheduler", "worker-a", 60, now=later) is True
+
+    lease = get_lease(db_session)
+    db_session.refresh(lease)
+    assert lease.heartbeat_at == later
+    assert lease.acquired_at == NOW
+    assert lease.expires_at == later + timedelta(seconds=60)
+
+
+def test_expired_lease_is_taken_over(db_session):
+    try_acquire_lease(db_session, "scheduler", "worker-a", 60, now=NOW)
+    after_expiry = NOW + timedelta(seconds=61)
+
+    assert try_acquire_lease(db_session, "scheduler", "worker-b", 60, now=after_expiry) is True
+
+    lease = get_lease(db_session)
+    db_session.refresh(lease)
+    assert lease.owner_id == "worker-b"
+    assert lease.acquired_at == after_expiry
+    # The old holder can no longer renew
+    assert try_acquire_lease(db_session, "scheduler", "worker-a", 60, now=after_expiry) is False
+
+
+def test_release_lets_peer_take_over_immediately(db_session):
+    try_acquire_lease(db_session, "scheduler", "worker-a", 60, now=NOW)
+
+    assert release_lease(db_session, "scheduler", "worker-b") is False
+    assert release_lease(db_session, "scheduler", "worker-a") is True
+    assert try_acquire_lease(db_session, "scheduler", "worker-b", 60, now=NOW) is True
+
+
+def test_elector_guard_runs_job_only_on_leader(db_session):
+    from sqlalchemy.orm import sessionmaker
+
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    leader = LeaderElector(session_factory, ttl_seconds=60, owner_id="worker-a")
+    follower = LeaderElector(session_factory, ttl_seconds=60, owner_id="worker-b")
+    runs = []
+
+    def job():
+        runs.append(1)
+
+    assert leader.heartbeat() is True
+    assert follower.heartbeat() is False
+
+    leader.guard(job)()
+    follower.guard(job)()
+    assert len(runs) == 1
+
+    leader.release()
+    assert leader.is_leader is False
+    assert follower.heartbeat() is True
+
+
+def test_owner_ids_are_unique_per_elector():
+    assert leader_lease.make_owner_id() != leader_lease.make_owner_id()
@@ -0,0 +1,64 @@
+"""
+Unit tests for the bcrypt process pool behind login and PIN changes.
+"""
+import asyncio
+
+import pytest
+
+from backend.exceptions import ServiceBusyError
+from backend.password_hasher import PasswordHasher
+
+
+def test_pool_hashes_and_verifies_in_worker_processes():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        hashed = hasher.hash("1234")
+        assert hashed.startswith("$2b$")
+        assert hasher.verify("1234", hashed)
+        assert not asyncio.run(hasher.verify_async("9999", hashed))
+
+        stats = hasher.stats()
+        assert stats["started"] is True
+        assert stats["submitted"] == stats["completed"] == 3
+        assert stats["pending"] == 0
+        assert stats["peak_pending"] == 1
+    finally:
+        hasher.shutdown()
+    assert hasher.stats()["started"] is False
+
+
+def test_concurrent_async_calls_are_counted_as_pending():
+    hasher = PasswordHasher(workers=1, max_pending=8)
+
+    async def burst():
+        return await asyncio.gather(*[hasher.hash_async(f"{pin:04d}") for pin in range(3)])
+
+    try:
+        hashes = asyncio.run(burst())
+    finally:
+        hasher.shutdown()
+    assert len(set(hashes)) == 3
+    assert hasher.stats()["peak_pending"] == 3
+
+
+def test_full_queue_is_rejected_instead_of_waiting():
+    hasher = PasswordHasher(workers=0, max_pending=0)
+    with pytest.raises(ServiceBusyError) as exc:
+        hasher.hash("1234")
+    assert exc.value.status_code == 503
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["started"] is False
+
+
+def test_inline_mode_hashes_without_a_pool():
+    hasher = PasswordHasher(workers=0, max_pending=4)
+    hashed = asyncio.run(hasher.hash_async("1234"))
+    assert hasher.verify("1234", hashed)
+    assert hasher.stats()["started"] is False
+    assert hasher.stats()["completed"] == 2
+
+
+def test_stats_endpoint(client):
+    response = client.get("/password-hasher/stats")
+    assert response.status_code == 200
+    assert {"workers", "pending", "peak_pending", "rejected"} <= set(response.json())
@@ -0,0 +1,84 @@
+"""
+Unit tests for the orphan photo garbage collector.
+"""
+import os
+from datetime import datetime
+
+from backend import models
+from backend.services.photo_gc import collect_orphan_photos
+
+NOW = 1_000_000_000.0
+OLD = NOW - 2 * 86400
+
+
+def _file(path, mtime=OLD):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _reference(db, url):
+    role = db.query(models.Role).first()
+    user = models.User(nickname=f"U{url[-8:]}", login_pin="0000", role_id=role.id)
+    task = models.Task(name="T", description="D", base_points=1, assigned_role_id=role.id,
+                       schedule_type="daily", default_due_time="12:00")
+    db.add_all([user, task])
+    db.commit()
+    db.add(models.TaskInstance(task_id=task.id, user_id=user.id, due_time=datetime.now(),
+                               status="IN_REVIEW", completion_photo_url=url))
+    db.commit()
+
+
+def test_unreferenced_photos_and_variants_are_deleted(seeded_db, tmp_path):
+    kept = _file(tmp_path / "aa" / "aa11.webp")
+    kept_thumb = _file(tmp_path / "aa" / "aa11.thumb.webp")
+    orphan = _file(tmp_path / "bb" / "bb22.webp")
+    orphan_thumb = _file(tmp_path / "bb" / "bb22.thumb.webp")
+    legacy_kept = _file(tmp_path / "0123legacy.webp")
+    legacy_orphan = _file(tmp_path / "4567legacy.webp")
+    gitignore = _file(tmp_path / ".gitignore")
+    _reference(seeded_db, "/uploads/aa11.webp")
+    _reference(seeded_db, "/uploads/0123legacy.webp")
+
+    assert collect_orphan_photos(seeded_db, tmp_path, now=NOW) == 3
+
+    assert kept.exists() and kept_thumb.exists() and legacy_kept.exists() and gitignore.exists()
+    assert not orphan.exists() and not orphan_thumb.exists() and not legacy_orphan.exists()
+
+
+def test_recent_files_are_kept_during_the_grace_period(seeded_db, tmp_path):
+    fresh = _file(tmp_path / "cc" / "cc33.webp", mtime=NOW - 60)
+    assert collect_orphan_photos(seeded_db, tmp_path, now=NOW) == 0
+    assert fresh.exists()
+    assert collect_orphan_photos(seeded_db, tmp_path, grace_seconds=30, now=NOW) == 1
+
+
+def test_batches_are_bounded(seeded_db, tmp_path):
+    for i in range(5):
+        _file(tmp_path / "dd" / f"dd{i}.webp")
+    assert collect_orphan_photos(seeded_db, tmp_path, batch_size=2, now=NOW) == 2
+    assert collect_orphan_photos(seeded_db, tmp_path, batch_size=2, now=NOW) == 2
+    assert collect_orphan_photos(seeded_db, tmp_path, batch_size=2, now=NOW) == 1
+    assert list((tmp_path / "dd").iterdir()) == []
+
+
+def test_stale_staging_and_partial_writes_are_removed(seeded_db, tmp_path):
+    staged = _file(tmp_path / ".staging" / "abc.upload")
+    staged_fresh = _file(tmp_path / ".staging" / "def.upload", mtime=NOW)
+    partial = _file(tmp_path / "ee" / "ee55.webp.0f0f.tmp")
+    assert collect_orphan_photos(seeded_db, tmp_path, now=NOW) == 2
+    assert not staged.exists() and not partial.exists() and staged_fresh.exists()
+
+
+def test_staged_uploads_of_unfinished_jobs_are_kept(seeded_db, tmp_path):
+    pending = _file(tmp_path / ".staging" / "pending.upload")
+    processing = _file(tmp_path / ".staging" / "processing.upload")
+    failed = _file(tmp_path / ".staging" / "failed.upload")
+    for status, path in [("pending", pending), ("processing", processing), ("failed", failed)]:
+        seeded_db.add(models.PhotoJob(id=status, instance_id=1, user_id=1, status=status, staged_path=str(path),
+                                      created_at=datetime.now(), updated_at=datetime.now()))
+    seeded_db.commit()
+
+    assert collect_orphan_photos(seeded_db, tmp_path, now=NOW) == 1
+    assert pending.exists() and processing.exists() and not failed.exists()
@@ -0,0 +1,178 @@
+"""
+Unit tests for background photo jobs (uploads accepted with 202).
+"""
+import asyncio
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from backend import models
+from backend.database import to_async_database_url
+from backend.exceptions import ServiceBusyError
+from backend.services import photo_jobs
+from backend.services.photos import PhotoTranscoder
+
+
+@pytest.fixture
+def queue(db_session, tmp_path, monkeypatch):
+    """Queue on the test database, transcoding inline into ``tmp_path/uploads``; records broadcasts."""
+    async_engine = create_async_engine(
+        to_async_database_url(db_session.get_bind().url.render_as_string(hide_password=False)), poolclass=NullPool)
+    factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    job_queue = photo_jobs.PhotoJobQueue(
+        transcoder=PhotoTranscoder(workers=0), uploads_dir=tmp_path / "uploads", session_factory=factory)
+    (tmp_path / "uploads").mkdir()
+    job_queue.sent = []
+
+    async def record(event_type, data=None, topics=None):
+        job_queue.sent.append((event_type, data, sorted(set(topics))))
+
+    monkeypatch.setattr(photo_jobs.broadcaster, "broadcast", record)
+    return job_queue
+
+
+def _instance(db, nickname="PhotoKid"):
+    role = db.query(models.Role).first()
+    user = models.User(nickname=nickname, login_pin="0000", role_id=role.id)
+    task = models.Task(name="T", description="D", base_points=1, assigned_role_id=role.id,
+                       schedule_type="daily", default_due_time="12:00", requires_photo_verification=True)
+    db.add_all([user, task])
+    db.commit()
+    instance = models.TaskInstance(task_id=task.id, user_id=user.id, due_time=datetime.now(), status="PENDING")
+    db.add(instance)
+    db.commit()
+    return instance
+
+
+def _staged(tmp_path, data=None):
+    path = tmp_path / "upload.bin"
+    if data is None:
+        buf = io.BytesIO()
+        Image.new("RGB", (2000, 1000), (200, 30, 30)).save(buf, format="JPEG")
+        data = buf.getvalue()
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_job_sets_photo_url_and_broadcasts_photo_ready(seeded_db, queue, tmp_path):
+    instance = _instance(seeded_db)
+    staged = _staged(tmp_path)
+    job = photo_jobs.create_job(seeded_db, instance.id, instance.user_id, staged)
+
+    done = asyncio.run(queue.run_job(job.id))
+
+    assert done.status == photo_jobs.DONE and done.staged_path is None
+    seeded_db.refresh(instance)
+    assert instance.completion_photo_url == done.photo_url
+    filename = done.photo_url.rsplit("/", 1)[-1]
+    assert (tmp_path / "uploads" / filename[:2] / filename).exists()
+    assert not (tmp_path / "upload.bin").exists()
+
+    [(event_type, data, topics)] = queue.sent
+    assert event_type == "photo_ready"
+    assert data["job_id"] == job.id
+    assert data["instance"]["completion_photo_url"] == done.photo_url
+    assert data["version"] == instance.version == 2
+    assert topics == ["review-queue", f"user:{instance.user_id}"]
+    assert queue.stats()["processed"] == 1
+
+    # Already finished: nobody claims it again
+    assert asyncio.run(queue.run_job(job.id)) is None
+
+
+def test_unreadable_upload_fails_the_job(seeded_db, queue, tmp_path):
+    instance = _instance(seeded_db)
+    job = photo_jobs.create_job(seeded_db, instance.id, instance.user_id, _staged(tmp_path, b"not an image"))
+
+    failed = asyncio.run(queue.run_job(job.id))
+
+    assert failed.status == photo_jobs.FAILED
+    assert failed.error == photo_jobs.UNREADABLE_IMAGE
+    assert not (tmp_path / "upload.bin").exists()
+    seeded_db.refresh(instance)
+    assert instance.completion_photo_url is None
+    assert [event_type for event_type, _, _ in queue.sent] == ["photo_failed"]
+
+
+def test_older_job_does_not_replace_a_newer_upload(seeded_db, queue, tmp_path):
+    instance = _instance(seeded_db)
+    older = photo_jobs.create_job(seeded_db, instance.id, instance.user_id, _staged(tmp_path))
+    newer = photo_jobs.create_job(seeded_db, instance.id, instance.user_id, "/newer.upload")
+    older.created_at = newer.created_at - timedelta(seconds=1)
+    seeded_db.commit()
+
+    failed = asyncio.run(queue.run_job(older.id))
+
+    assert failed.status == photo_jobs.FAILED and failed.error == photo_jobs.SUPERSEDED
+    seeded_db.refresh(instance)
+    assert instance.completion_photo_url is None
+    [(event_type, data, _)] = queue.sent
+    assert event_type == "photo_failed" and data["error"] == photo_jobs.SUPERSEDED
+
+
+def test_job_does_not_touch_an_instance_that_is_no_longer_pending(seeded_db, queue, tmp_path):
+    instance = _instance(seeded_db)
+    job = photo_jobs.create_job(seeded_db, instance.id, instance.user_id, _staged(tmp_path))
+    instance.status = "IN_REVIEW"
+    seeded_db.commit()
+
+    assert asyncio.run(queue.run_job(job.id)).error == photo_jobs.SUPERSEDED
+    seeded_db.refresh(instance)
+    assert instance.completion_photo_url is None
+
+
+def test_direct_upload_supersedes_unfinished_jobs(seeded_db, queue, tmp_path):
+    instance = _instance(seeded_db)
+    job = photo_jobs.create_job(seeded_db, instance.id, instance.user_id, _staged(tmp_path))
+
+    assert photo_jobs.supersede_jobs(seeded_db, instance.id) == 1
+    seeded_db.commit()
+
+    assert asyncio.run(queue.run_job(job.id)) is None
+    seeded_db.refresh(job)
+    assert job.status == photo_jobs.FAILED and job.error == photo_jobs.SUPERSEDED
+
+
+def test_start_resumes_pending_and_abandoned_jobs(seeded_db, queue, tmp_path):
+    instance, other = _instance(seeded_db), _instance(seeded_db, "OtherKid")
+    pending = photo_jobs.create_job(seeded_db, instance.id, instance.user_id, _staged(tmp_path))
+    abandoned = photo_jobs.create_job(seeded_db, other.id, other.user_id, "/missing.upload")
+    running = photo_jobs.create_job(seeded_db, other.id, other.user_id, "/running.upload")
+    abandoned.status = running.status = photo_jobs.PROCESSING
+    abandoned.updated_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1)
+    seeded_db.commit()
+
+    async def run():
+        await queue.start()
+        await queue._queue.join()
+        await queue.stop()
+
+    asyncio.run(run())
+
+    seeded_db.expire_all()
+    assert seeded_db.get(models.PhotoJob, pending.id).status == photo_jobs.DONE
+    assert seeded_db.get(models.PhotoJob, abandoned.id).status == photo_jobs.FAILED
+    # Recently claimed by another worker: left alone
+    assert seeded_db.get(models.PhotoJob, running.id).status == photo_jobs.PROCESSING
+
+
+def test_full_queue_rejects_new_jobs(queue):
+    queue.max_queued = 0
+    with pytest.raises(ServiceBusyError):
+        queue.check_capacity()
+    assert queue.stats()["rejected"] == 1
+
+
+def test_prune_deletes_only_old_finished_jobs(seeded_db):
+    now = datetime.now()
+    for job_id, status, age in [("old-done", "done", 48), ("new-done", "done", 1), ("old-pending", "pending", 48)]:
+        seeded_db.add(models.PhotoJob(id=job_id, instance_id=1, user_id=1, status=status,
+                                      created_at=now - timedelta(hours=age), updated_at=now - timedelta(hours=age)))
+    seeded_db.commit()
+
+    assert photo_jobs.prune_jobs(seeded_db, 24, now=now) == 1
+    assert {job.id for job in seeded_db.query(models.PhotoJob)} == {"new-done", "old-pending"}
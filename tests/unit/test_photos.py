@@ -0,0 +1,111 @@
+"""
+Unit tests for task photo transcoding.
+"""
+import asyncio
+import io
+import os
+import tempfile
+
+from PIL import Image
+
+from backend.services import photos
+
+
+def _jpeg(size, color=(200, 80, 40)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="JPEG", quality=90)
+    return buf
+
+
+def _sizes(directory, written):
+    result = {}
+    for variant, filename in written.items():
+        with Image.open(photos.photo_path(filename, directory)) as img:
+            assert img.format == "WEBP"
+            result[variant] = img.size
+    return result
+
+
+def test_large_jpeg_is_decoded_at_reduced_scale(tmp_path, monkeypatch):
+    decoded = []
+    original_convert = Image.Image.convert
+
+    def _record_convert(img, *args, **kwargs):
+        decoded.append(img.size)
+        return original_convert(img, *args, **kwargs)
+
+    monkeypatch.setattr(Image.Image, "convert", _record_convert)
+    written = photos.transcode(_jpeg((4000, 3000)), str(tmp_path))
+
+    # draft() let libjpeg scale by 1/2: still larger than the target, far below 12 MP
+    assert decoded == [(2000, 1500)]
+    stem = written["display"][:-len(".webp")]
+    assert written == {"display": f"{stem}.webp", "thumb": f"{stem}.thumb.webp"}
+    assert _sizes(tmp_path, written) == {"display": (1280, 960), "thumb": (320, 240)}
+
+
+def test_original_is_archived_at_full_resolution(tmp_path):
+    written = photos.transcode(_jpeg((2000, 1000)), str(tmp_path), keep_original=True)
+    assert _sizes(tmp_path, written) == {"original": (2000, 1000), "display": (1280, 640), "thumb": (320, 160)}
+
+
+def test_spooled_upload_is_read_in_place(tmp_path):
+    src = tempfile.SpooledTemporaryFile(max_size=1024)
+    data = _jpeg((300, 200)).getvalue()
+    src.write(data)
+    assert src._rolled
+    assert photos.file_size(src) == len(data)
+    assert src.tell() == 0
+
+    written = photos.transcode(src, str(tmp_path))
+    assert _sizes(tmp_path, written) == {"display": (300, 200), "thumb": (300, 200)}
+
+
+def test_non_jpeg_inputs_are_converted(tmp_path):
+    buf = io.BytesIO()
+    Image.new("RGBA", (2000, 500), (0, 0, 255, 128)).save(buf, format="PNG")
+    written = photos.transcode(buf, str(tmp_path))
+    assert _sizes(tmp_path, written)["display"] == (1280, 320)
+
+
+def test_variant_filename():
+    assert photos.variant_filename("abc.webp", "thumb") == "abc.thumb.webp"
+    assert photos.variant_filename("abc.webp", "display") == "abc.webp"
+    assert photos.variant_filename("abc.webp", "original") == "abc.orig.webp"
+    assert photos.display_filename("abc.thumb.webp") == "abc.webp"
+    assert photos.display_filename("abc.orig.webp") == "abc.webp"
+    assert photos.display_filename("abc.webp") == "abc.webp"
+
+
+def test_storage_is_content_addressed_and_deduplicated(tmp_path):
+    first = photos.transcode(_jpeg((800, 600)), str(tmp_path))
+    stem = first["display"][:-len(".webp")]
+    shard = tmp_path / stem[:2]
+    assert sorted(p.name for p in shard.iterdir()) == [f"{stem}.thumb.webp", f"{stem}.webp"]
+
+    os.utime(shard / first["display"], (0, 0))
+    # Same photo again: same names, no new files, and the existing file counts as fresh
+    assert photos.transcode(_jpeg((800, 600)), str(tmp_path)) == first
+    assert len(list(shard.iterdir())) == 2
+    assert (shard / first["display"]).stat().st_mtime > 0
+
+    other = photos.transcode(_jpeg((800, 600), color=(0, 0, 0)), str(tmp_path))
+    assert other["display"] != first["display"]
+
+
+def test_photo_path_falls_back_to_flat_uploads(tmp_path):
+    (tmp_path / "legacy.webp").write_bytes(b"x")
+    assert photos.photo_path("legacy.webp", tmp_path) == tmp_path / "legacy.webp"
+
+
+def test_transcoder_pool_reads_a_staged_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(photos, "STAGING_DIR", tmp_path / ".staging")
+    transcoder = photos.PhotoTranscoder(workers=1, max_pending=2)
+    try:
+        written = asyncio.run(transcoder.transcode_upload(_jpeg((1600, 1200)), tmp_path))
+    finally:
+        transcoder.shutdown()
+    assert _sizes(tmp_path, written) == {"display": (1280, 960), "thumb": (320, 240)}
+    # The staged upload is removed once the worker is done
+    assert list((tmp_path / ".staging").iterdir()) == []
+    assert transcoder.stats()["completed"] == 1
@@ -0,0 +1,105 @@
+"""
+Unit tests asserting the hot query shapes are served by an index.
+
+Each test captures the SQL a real code path emits and runs it through
+SQLite's ``EXPLAIN QUERY PLAN``: the hot table must be reached with an
+index SEARCH rather than a full table SCAN.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import event
+
+from backend import crud
+from backend.pagination import encode_cursor
+from backend.routers import analytics
+from backend.services import notifications
+
+
+@contextmanager
+def capture_sql(db):
+    """Record (statement, parameters) for every query run on ``db``'s engine."""
+    statements = []
+    engine = db.get_bind()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def query_plan(db, statement, parameters):
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def assert_index_search(db, statements, table):
+    """Every captured SELECT touching ``table`` reaches it through an index search."""
+    selects = [(s, p) for s, p in statements if s.lstrip().upper().startswith("SELECT") and table in s]
+    assert selects, f"no query against {table} was captured"
+    for statement, parameters in selects:
+        plan = query_plan(db, statement, parameters)
+        steps = [step for step in plan if f" {table}" in step]
+        assert steps and all(step.startswith("SEARCH") and "INDEX" in step for step in steps), \
+            f"{table} not served by an index:\n{statement}\n{plan}"
+
+
+def test_daily_task_view_uses_index(db_session):
+    with capture_sql(db_session) as statements:
+        crud.get_user_daily_tasks(db_session, user_id=1)
+
+    assert_index_search(db_session, statements, "task_instances")
+
+
+def test_completion_analytics_use_index(db_session):
+    with capture_sql(db_session) as statements:
+        analytics.get_weekly_activity(db=db_session)
+        analytics.get_heatmap_data(days=30, db=db_session)
+        analytics.get_analytics_summary(db=db_session)
+
+    assert_index_search(db_session, statements, "daily_user_activity")
+
+
+def test_heatmap_day_details_use_index(admin_user, seeded_db):
+    with capture_sql(seeded_db) as statements:
+        analytics.get_heatmap_day_details(user_id=admin_user.id, date="2026-01-01", db=seeded_db)
+
+    assert_index_search(seeded_db, statements, "task_instances")
+
+
+def test_user_transaction_history_uses_index(db_session):
+    with capture_sql(db_session) as statements:
+        crud.get_user_transactions(db_session, user_id=1)
+
+    assert_index_search(db_session, statements, "transactions")
+
+
+def test_transaction_cursor_pages_use_index(db_session):
+    cursor = encode_cursor(datetime(2026, 1, 1, 12, 0), 42)
+    with capture_sql(db_session) as statements:
+        crud.get_user_transactions(db_session, user_id=1, cursor=cursor)
+        crud.get_all_transactions(db_session, cursor=cursor)
+
+    assert_index_search(db_session, statements, "transactions")
+
+
+def test_transaction_search_uses_full_text_index(db_session):
+    with capture_sql(db_session) as statements:
+        crud.get_all_transactions(db_session, search="dishes")
+
+    statement, parameters = statements[-1]
+    plan = query_plan(db_session, statement, parameters)
+    assert any("transactions_fts VIRTUAL TABLE" in step for step in plan), plan
+    assert not any(step.startswith("SCAN transactions ") or step == "SCAN transactions" for step in plan), plan
+
+
+def test_notification_inbox_uses_index(db_session):
+    with capture_sql(db_session) as statements:
+        notifications.get_user_notifications(db_session, user_id=1)
+        notifications.get_user_notifications(db_session, user_id=1, unread_only=True)
+
+    assert_index_search(db_session, statements, "notifications")
@@ -0,0 +1,98 @@
+"""
+Unit tests for the database-backed slowapi storage shared by all workers.
+"""
+import asyncio
+
+from limits import parse
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from backend import models
+from backend.rate_limiter import DatabaseStorage
+
+
+class FakeClock:
+    def __init__(self, now=6000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _storage(db, clock, **kwargs):
+    return DatabaseStorage("database://", engine=db.get_bind(), clock=clock, **kwargs)
+
+
+def test_incr_is_shared_between_instances_and_restarts_after_expiry(db_session):
+    clock = FakeClock()
+    worker_a, worker_b = _storage(db_session, clock), _storage(db_session, clock)
+
+    assert worker_a.incr("k", 60) == 1
+    assert worker_b.incr("k", 60, amount=2) == 3
+    assert worker_a.get("k") == 3
+    assert worker_b.get_expiry("k") == clock.now + 60
+
+    clock.now += 60
+    assert worker_a.get("k") == 0
+    assert worker_b.incr("k", 60) == 1
+
+
+def test_decr_never_goes_negative(db_session):
+    storage = _storage(db_session, FakeClock())
+    storage.incr("k", 60)
+    assert storage.decr("k", amount=5) == 0
+
+
+def test_sliding_window_counts_across_workers(db_session):
+    clock = FakeClock()
+    limiter_a = SlidingWindowCounterRateLimiter(_storage(db_session, clock))
+    limiter_b = SlidingWindowCounterRateLimiter(_storage(db_session, clock))
+    limit = parse("4/minute")
+
+    assert limiter_a.hit(limit, "10.0.0.5")
+    assert limiter_b.hit(limit, "10.0.0.5")
+    assert limiter_a.hit(limit, "10.0.0.5")
+    assert limiter_b.hit(limit, "10.0.0.5")
+    assert not limiter_a.hit(limit, "10.0.0.5")
+    assert limiter_b.hit(limit, "10.0.0.6")
+
+    # Halfway into the next window half of the previous 4 hits still count
+    clock.now += 90
+    assert limiter_a.hit(limit, "10.0.0.5")
+    assert limiter_b.hit(limit, "10.0.0.5")
+    assert not limiter_a.hit(limit, "10.0.0.5")
+    assert limiter_b.get_window_stats(limit, "10.0.0.5").remaining == 0
+
+    # One window later the first 4 hits are gone; half of the next 2 still count
+    clock.now += 60
+    assert limiter_a.get_window_stats(limit, "10.0.0.5").remaining == 3
+
+
+def test_expired_counters_are_swept(db_session):
+    clock = FakeClock()
+    storage = _storage(db_session, clock, sweep_interval=30)
+    storage.incr("old", 10)
+    storage.incr("fresh", 600)
+
+    clock.now += 60
+    storage.incr("new", 600)
+
+    keys = {row.key for row in db_session.query(models.RateLimitCounter).all()}
+    assert keys == {"fresh", "new"}
+    assert storage.swept == 1
+
+
+def test_clear_and_reset(db_session):
+    storage = _storage(db_session, FakeClock())
+    storage.incr("a", 60)
+    storage.incr("b", 60)
+    storage.clear("a")
+    assert storage.get("a") == 0
+    assert storage.reset() == 1
+    assert storage.check()
+
+
+def test_login_is_sync_so_storage_calls_stay_off_the_event_loop():
+    # slowapi runs the storage inline in its wrapper: an async route would block the loop on every hit
+    from backend.routers.auth import login
+
+    assert not asyncio.iscoroutinefunction(login)
@@ -206,3 +206,299 @@ def test_upload_photo_forbidden_for_other_user(client, db_session, seeded_db, ad
     app.dependency_overrides[get_current_user] = lambda: admin_user
 
     assert resp.status_code == 403
+
+
+def _photo_instance(db_session, admin_user):
+    admin_role = db_session.query(models.Role).filter(models.Role.name == "Admin").first()
+    task = models.Task(
+        name="PhotoTask", description="D", base_points=10,
+        assigned_role_id=admin_role.id, schedule_type="daily",
+        default_due_time="12:00", requires_photo_verification=True,
+    )
+    db_session.add(task)
+    db_session.commit()
+    instance = models.TaskInstance(task_id=task.id, user_id=admin_user.id, due_time=datetime.now(), status="PENDING")
+    db_session.add(instance)
+    db_session.commit()
+    return instance
+
+
+def test_upload_photo_transcodes_to_webp_variants(client, db_session, seeded_db, admin_user):
+    import io
+    from PIL import Image
+    from backend.services import photos
+
+    instance = _photo_instance(db_session, admin_user)
+    jpeg = io.BytesIO()
+    Image.new("RGB", (3000, 2000), (10, 120, 200)).save(jpeg, format="JPEG")
+    jpeg.seek(0)
+
+    resp = client.post(f"/tasks/{instance.id}/upload-photo", files={"file": ("photo.jpg", jpeg, "image/jpeg")})
+    assert resp.status_code == 200
+    url = resp.json()["completion_photo_url"]
+    display = photos.photo_path(url.rsplit("/", 1)[-1])
+    thumb = display.with_name(display.stem + ".thumb.webp")
+    assert display.parent.name == display.name[:2]
+    try:
+        with Image.open(display) as img:
+            assert img.format == "WEBP"
+            assert img.size == (1280, 853)
+        with Image.open(thumb) as img:
+            assert img.size == (320, 213)
+
+        assert client.get(url).content == display.read_bytes()
+        assert client.get(f"{url}?size=thumb").content == thumb.read_bytes()
+        # No archived original: falls back to the display image
+        assert client.get(f"{url}?size=original").content == display.read_bytes()
+        assert client.get(f"{url}?size=huge").status_code == 422
+    finally:
+        display.unlink()
+        thumb.unlink()
+        if not any(display.parent.iterdir()):
+            display.parent.rmdir()
+
+
+def test_upload_photo_rejects_oversized_file(client, db_session, seeded_db, admin_user, monkeypatch):
+    import io
+    from backend.services import photos
+
+    instance = _photo_instance(db_session, admin_user)
+    monkeypatch.setattr(photos, "MAX_UPLOAD_SIZE", 1024)
+    resp = client.post(
+        f"/tasks/{instance.id}/upload-photo",
+        files={"file": ("photo.jpg", io.BytesIO(b"\xff" * 2048), "image/jpeg")},
+    )
+    assert resp.status_code == 413
+
+
+def test_upload_photo_in_background_returns_202_with_job(client, db_session, seeded_db, admin_user):
+    import io
+    import os
+    from PIL import Image
+    from backend.services import photos
+
+    instance = _photo_instance(db_session, admin_user)
+    jpeg = io.BytesIO()
+    Image.new("RGB", (64, 64)).save(jpeg, format="JPEG")
+    jpeg.seek(0)
+
+    resp = client.post(f"/tasks/{instance.id}/upload-photo?background=true",
+                       files={"file": ("photo.jpg", jpeg, "image/jpeg")})
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["status"] == "pending" and job["instance_id"] == instance.id
+    assert resp.headers["location"] == f"/tasks/photo-jobs/{job['id']}"
+
+    staged = db_session.get(models.PhotoJob, job["id"]).staged_path
+    try:
+        with open(staged, "rb") as f:
+            assert f.read() == jpeg.getvalue()
+        # Not processed yet: the instance has no photo
+        db_session.refresh(instance)
+        assert instance.completion_photo_url is None
+        assert client.get(f"/tasks/photo-jobs/{job['id']}").json()["status"] == "pending"
+        assert client.get("/tasks/photo-jobs/unknown").status_code == 404
+
+        # A direct upload wins over the still queued job
+        jpeg.seek(0)
+        url = client.post(f"/tasks/{instance.id}/upload-photo",
+                          files={"file": ("photo.jpg", jpeg, "image/jpeg")}).json()["completion_photo_url"]
+        display = photos.photo_path(url.rsplit("/", 1)[-1])
+        for variant in (display, display.with_name(display.stem + ".thumb.webp")):
+            variant.unlink()
+        if not any(display.parent.iterdir()):
+            display.parent.rmdir()
+        superseded = client.get(f"/tasks/photo-jobs/{job['id']}").json()
+        assert superseded["status"] == "failed" and superseded["error"] == "superseded"
+    finally:
+        os.remove(staged)
+
+
+def _record_broadcasts(monkeypatch):
+    from backend.routers import tasks as tasks_router
+
+    sent = []
+
+    async def record(event_type, data=None, topics=None):
+        sent.append((event_type, data))
+
+    monkeypatch.setattr(tasks_router.broadcaster, "broadcast", record)
+    return sent
+
+
+def test_complete_task_pushes_delta_payloads(client, db_session, seeded_db, monkeypatch):
+    role = db_session.query(models.Role).first()
+    task = models.Task(name="DeltaTask", description="D", base_points=10,
+                       assigned_role_id=role.id, schedule_type="daily", default_due_time="12:00")
+    user = models.User(nickname="DeltaUser", login_pin="1111", role_id=role.id)
+    db_session.add_all([task, user])
+    db_session.commit()
+    instance = models.TaskInstance(
+        task_id=task.id, user_id=user.id, due_time=datetime.now(), status="PENDING")
+    db_session.add(instance)
+    db_session.commit()
+    assert instance.version == 1
+    sent = _record_broadcasts(monkeypatch)
+
+    resp = client.post(f"/tasks/{instance.id}/complete")
+    assert resp.status_code == 200
+
+    events = dict(sent)
+    completed = events["task_completed"]
+    db_session.refresh(user)
+    assert completed["instance"]["status"] == "COMPLETED"
+    assert completed["instance"]["task"]["name"] == "DeltaTask"
+    assert completed["version"] == completed["instance"]["version"] == resp.json()["version"] == 2
+    assert completed["balance"] == {
+        "id": user.id, "current_points": user.current_points,
+        "lifetime_points": user.lifetime_points, "current_streak": user.current_streak,
+    }
+    assert user.current_points > 0
+    notification = events["notification"]["notification"]
+    assert notification["type"] == "TASK_COMPLETED"
+    assert notification["user_id"] == user.id
+
+
+def test_task_created_drops_instances_above_the_relay_budget(client, db_session, seeded_db, monkeypatch):
+    from backend import events
+
+    role = db_session.query(models.Role).filter(models.Role.name == "Child").first()
+    db_session.add_all([models.User(nickname=f"Kid{i}", login_pin="1111", role_id=role.id) for i in range(3)])
+    db_session.commit()
+    sent = _record_broadcasts(monkeypatch)
+    body = {"name": "Budget", "description": "D", "base_points": 5, "assigned_role_id": role.id,
+            "schedule_type": "daily", "default_due_time": "23:59"}
+
+    assert client.post("/tasks/", json=body).status_code == 200
+    assert len(dict(sent)["task_created"]["instances"]) == 3
+
+    sent.clear()
+    monkeypatch.setattr(events, "MAX_DELTA_BYTES", 500)
+    assert client.post("/tasks/", json={**body, "name": "Budget2"}).status_code == 200
+    created = dict(sent)["task_created"]
+    assert created["name"] == "Budget2" and "instances" not in created
+
+
+def test_instance_delta_for_a_deleted_instance_is_id_only(db_session):
+    import asyncio
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from backend.database import to_async_database_url
+    from backend.routers.tasks import _instance_delta
+
+    async def delta():
+        engine = create_async_engine(
+            to_async_database_url(db_session.get_bind().url.render_as_string(hide_password=False)),
+            poolclass=NullPool)
+        async with AsyncSession(engine) as db:
+            result = await _instance_delta(db, 999999)
+        await engine.dispose()
+        return result
+
+    assert asyncio.run(delta()) == {"instance_id": 999999}
+
+
+def test_reject_pushes_the_notification_the_review_created(client, db_session, seeded_db, admin_user, monkeypatch):
+    from backend.routers import tasks as tasks_router
+
+    instance = _photo_instance(db_session, admin_user)
+    instance.status, instance.completion_photo_url = "IN_REVIEW", "/uploads/photo.webp"
+    db_session.commit()
+    review_task = tasks_router.tasks_service.review_task
+
+    def review_then_notify(db, **kwargs):
+        outcome = review_task(db, **kwargs)
+        # Another notification for the same user lands before the review's events go out
+        db.add(models.Notification(user_id=admin_user.id, type="SYSTEM", title="Other", message="Unrelated"))
+        db.commit()
+        return outcome
+
+    monkeypatch.setattr(tasks_router.tasks_service, "review_task", review_then_notify)
+    sent = _record_broadcasts(monkeypatch)
+
+    resp = client.post(f"/tasks/{instance.id}/review", json={"is_approved": False, "reject_reason": "Blurry"})
+    assert resp.status_code == 200
+    notification = dict(sent)["notification"]["notification"]
+    assert notification["title"] == "Chore Rejected" and "Blurry" in notification["message"]
+
+
+def test_complete_batch_sends_one_event_and_one_notification_per_user(client, db_session, seeded_db, monkeypatch):
+    role = db_session.query(models.Role).first()
+    users = [models.User(nickname=f"BatchUser{i}", login_pin="1111", role_id=role.id) for i in range(2)]
+    tasks = [models.Task(name=f"BatchTask{i}", description="D", base_points=10, assigned_role_id=role.id,
+                         schedule_type="daily", default_due_time="12:00") for i in range(3)]
+    db_session.add_all(users + tasks)
+    db_session.commit()
+    instances = [
+        models.TaskInstance(task_id=task.id, user_id=user.id, due_time=datetime.now(), status="PENDING")
+        for task, user in zip(tasks, [users[0], users[0], users[1]])
+    ]
+    db_session.add_all(instances)
+    db_session.commit()
+    sent = _record_broadcasts(monkeypatch)
+
+    resp = client.post("/tasks/complete-batch", json={"instance_ids": [i.id for i in instances]})
+    assert resp.status_code == 200
+    assert [row["id"] for row in resp.json()] == [i.id for i in instances]
+    assert {row["status"] for row in resp.json()} == {"COMPLETED"}
+
+    assert [event_type for event_type, _ in sent] == ["tasks_completed", "notification", "notification"]
+    batch = sent[0][1]
+    assert batch["instance_ids"] == [i.id for i in instances]
+    assert [row["id"] for row in batch["instances"]] == [i.id for i in instances]
+    assert {balance["id"] for balance in batch["balances"]} == {users[0].id, users[1].id}
+    assert sorted(data["user_id"] for _, data in sent[1:]) == sorted([users[0].id, users[1].id])
+    assert db_session.query(models.Notification).filter(
+        models.Notification.user_id == users[0].id).count() == 1
+
+    # Nothing left to complete: no events
+    sent.clear()
+    assert client.post("/tasks/complete-batch", json={"instance_ids": [instances[0].id]}).status_code == 200
+    assert sent == []
+    assert client.post("/tasks/complete-batch", json={"instance_ids": [999999]}).status_code == 404
+    assert client.post("/tasks/complete-batch", json={"instance_ids": []}).status_code == 422
+
+
+def test_complete_batch_event_fits_the_notify_limit(client, db_session, seeded_db, monkeypatch):
+    from backend.event_bus import PostgresNotifyEventBus
+    from backend.events import encode_json
+
+    role = db_session.query(models.Role).first()
+    user = models.User(nickname="BigBatchUser", login_pin="1111", role_id=role.id)
+    tasks = [models.Task(name=f"BigBatchTask{i}", description="D", base_points=10, assigned_role_id=role.id,
+                         schedule_type="daily", default_due_time="12:00") for i in range(20)]
+    db_session.add_all([user, *tasks])
+    db_session.commit()
+    instances = [models.TaskInstance(task_id=task.id, user_id=user.id, due_time=datetime.now(), status="PENDING")
+                 for task in tasks]
+    db_session.add_all(instances)
+    db_session.commit()
+    sent = _record_broadcasts(monkeypatch)
+
+    assert client.post("/tasks/complete-batch", json={"instance_ids": [i.id for i in instances]}).status_code == 200
+
+    batch = dict(sent)["tasks_completed"]
+    # Too many instances to relay: ids and balances only, clients refetch the rest
+    assert "instances" not in batch
+    assert batch["instance_ids"] == [i.id for i in instances]
+    assert [balance["id"] for balance in batch["balances"]] == [user.id]
+    assert len(encode_json(batch)) < PostgresNotifyEventBus.MAX_PAYLOAD_BYTES
+
+
+def test_create_task_pushes_generated_instances(client, db_session, seeded_db, monkeypatch):
+    role = db_session.query(models.Role).filter(models.Role.name == "Contributor").first()
+    db_session.add(models.User(nickname="DeltaCreator", login_pin="1111", role_id=role.id))
+    db_session.commit()
+    sent = _record_broadcasts(monkeypatch)
+
+    resp = client.post("/tasks/", json={
+        "name": "DeltaCreated", "description": "Desc", "base_points": 5, "assigned_role_id": role.id,
+        "schedule_type": "daily", "default_due_time": "23:59"
+    })
+    assert resp.status_code == 200
+
+    (event_type, payload), = sent
+    assert event_type == "task_created"
+    assert payload["task"]["name"] == "DeltaCreated"
+    assert payload["instances"]
+    assert {i["task_id"] for i in payload["instances"]} == {resp.json()["id"]}
@@ -57,3 +57,64 @@ def test_get_all_transactions_api(client, db_session, seeded_db):
 
     resp_user = client.get(f"/transactions?user_id={u.id}")
     assert len(resp_user.json()) == 1
+
+
+def _seed_history(db_session, nickname, count):
+    role = db_session.query(models.Role).first()
+    u = models.User(nickname=nickname, login_pin="1", role_id=role.id)
+    db_session.add(u)
+    db_session.commit()
+    # Several rows share a timestamp so the id tiebreaker is exercised
+    for i in range(count):
+        db_session.add(models.Transaction(
+            user_id=u.id, type="EARN", base_points_value=i, multiplier_used=1, awarded_points=i,
+            timestamp=datetime(2026, 1, 1, 12, i // 3),
+        ))
+    db_session.commit()
+    return u
+
+
+def _walk_pages(client, url, limit):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        resp = client.get(url, params=params)
+        assert resp.status_code == 200
+        seen.extend(t["id"] for t in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+def test_user_transactions_cursor_pages_cover_history_once(client, db_session, seeded_db):
+    u = _seed_history(db_session, "CursorUser", 10)
+
+    ids = _walk_pages(client, f"/users/{u.id}/transactions", limit=4)
+
+    full = [t["id"] for t in client.get(f"/users/{u.id}/transactions").json()]
+    assert ids == full
+    assert len(ids) == len(set(ids)) == 10
+
+
+def test_all_transactions_cursor_matches_offset_pages(client, db_session, seeded_db):
+    _seed_history(db_session, "CursorGlobal", 7)
+
+    ids = _walk_pages(client, "/transactions", limit=3)
+    offset_ids = []
+    for skip in range(0, 9, 3):
+        offset_ids.extend(t["id"] for t in client.get("/transactions", params={"skip": skip, "limit": 3}).json())
+
+    assert ids == offset_ids
+
+
+def test_last_page_has_no_next_cursor(client, db_session, seeded_db):
+    u = _seed_history(db_session, "CursorShort", 2)
+
+    resp = client.get(f"/users/{u.id}/transactions", params={"limit": 5})
+    assert len(resp.json()) == 2
+    assert "X-Next-Cursor" not in resp.headers
+
+
+def test_invalid_cursor_returns_400(client, seeded_db):
+    resp = client.get("/transactions", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
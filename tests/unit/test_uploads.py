@@ -0,0 +1,61 @@
+"""
+Tests for serving uploaded photos: variants, conditional GET and ranges.
+"""
+import hashlib
+
+import pytest
+
+from backend import main
+
+
+@pytest.fixture
+def uploads_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "_UPLOADS_DIR", tmp_path)
+    (tmp_path / "photo.webp").write_bytes(b"display-bytes" * 100)
+    (tmp_path / "photo.thumb.webp").write_bytes(b"thumb")
+    return tmp_path
+
+
+def test_upload_has_content_etag_and_immutable_caching(client, uploads_dir):
+    resp = client.get("/uploads/photo.webp")
+    assert resp.status_code == 200
+    expected = hashlib.sha256((uploads_dir / "photo.webp").read_bytes()).hexdigest()[:32]
+    assert resp.headers["etag"] == f'"{expected}"'
+    assert resp.headers["cache-control"] == "private, max-age=31536000, immutable"
+    assert resp.headers["accept-ranges"] == "bytes"
+
+
+def test_matching_if_none_match_returns_304(client, uploads_dir):
+    etag = client.get("/uploads/photo.webp").headers["etag"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        resp = client.get("/uploads/photo.webp", headers={"If-None-Match": header})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    assert client.get("/uploads/photo.webp", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_variants_have_their_own_etag(client, uploads_dir):
+    display = client.get("/uploads/photo.webp").headers["etag"]
+    thumb = client.get("/uploads/photo.webp?size=thumb")
+    assert thumb.content == b"thumb"
+    assert thumb.headers["etag"] != display
+    assert client.get("/uploads/photo.webp?size=thumb", headers={"If-None-Match": display}).status_code == 200
+
+
+def test_range_requests(client, uploads_dir):
+    resp = client.get("/uploads/photo.webp", headers={"Range": "bytes=0-12"})
+    assert resp.status_code == 206
+    assert resp.content == b"display-bytes"
+    assert resp.headers["content-range"] == "bytes 0-12/1300"
+
+    # If-Range with a stale validator falls back to the full file
+    resp = client.get("/uploads/photo.webp", headers={"Range": "bytes=0-12", "If-Range": '"stale"'})
+    assert resp.status_code == 200
+    assert len(resp.content) == 1300
+
+
+def test_missing_upload_is_404(client, uploads_dir):
+    assert client.get("/uploads/nope.webp").status_code == 404